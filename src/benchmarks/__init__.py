@@ -0,0 +1,13 @@
+"""Benchmarks for DynaTable"""
+
+import os
+
+import django
+
+
+def setup():
+    """
+    Configures Django so that benchmarks can use the backend outside of a running server.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dynatable.settings")
+    django.setup()
@@ -0,0 +1,127 @@
+"""
+Benchmark of the row renderers.
+
+Compares DRF's default JSONRenderer with the orjson and MessagePack renderers on
+generated tables of two shapes: tall (many rows, few columns) and wide (fewer rows,
+many columns). Both the regular and the streaming rendering paths are measured.
+
+Usage:
+    $ PYTHONPATH=src poetry run python -m benchmarks.renderers --rows 100000
+"""
+
+import argparse
+import time
+
+from benchmarks import setup
+
+setup()
+
+from dynatablebackend.renderers import (  # noqa: E402
+    MessagePackRenderer,
+    ORJSONRenderer,
+)
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from tests.generator import GeneratedModelFields, generator  # noqa: E402
+
+
+def _table(columns: int, rows: int):
+    """
+    Generates rows of a table with the given number of columns.
+
+    Args:
+        columns (int): The number of columns of the table.
+        rows (int): The number of rows to generate.
+
+    Returns:
+        list of dict: The generated rows, each with an 'id' key.
+    """
+    fields_generator = generator.model_fields_generator
+    fields = GeneratedModelFields(
+        [
+            {
+                "name": f"{fields_generator.random('field_name')}_{i}",
+                "type": fields_generator.random("field_type"),
+            }
+            for i in range(columns)
+        ]
+    )
+
+    return [
+        {"id": i, **row} for i, row in enumerate(fields.row_generator.many(rows), 1)
+    ]
+
+
+def _best_of(repeat: int, func):
+    """
+    Returns the fastest of 'repeat' runs of 'func' in seconds and the size of its output.
+    """
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(func())
+        best = min(best, time.perf_counter() - start)
+
+    return best, size
+
+
+def run(name: str, rows: list, repeat: int):
+    """
+    Renders the given rows with every renderer and prints a result table.
+
+    Args:
+        name (str): The label of the table shape.
+        rows (list of dict): The rows to render.
+        repeat (int): The number of runs per renderer, the best one is reported.
+    """
+    data = {"table_id": name, "rows": rows}
+    orjson_renderer = ORJSONRenderer()
+    msgpack_renderer = MessagePackRenderer()
+
+    cases = {
+        "JSONRenderer (DRF)": lambda: JSONRenderer().render(data),
+        "ORJSONRenderer": lambda: orjson_renderer.render(data),
+        "ORJSONRenderer (stream)": lambda: b"".join(
+            orjson_renderer.render_stream(name, iter(rows))
+        ),
+        "MessagePackRenderer": lambda: msgpack_renderer.render(data),
+        "MessagePackRenderer (stream)": lambda: b"".join(
+            msgpack_renderer.render_stream(name, iter(rows))
+        ),
+    }
+
+    print(f"{'=' * 72}\n{name}: {len(rows)} rows x {len(rows[0]) - 1} columns")
+
+    baseline = None
+    for case, func in cases.items():
+        seconds, size = _best_of(repeat, func)
+        baseline = baseline or seconds
+        print(
+            f"  {case:<30} {seconds * 1000:>9.1f} ms {size / 1024:>10.0f} KiB "
+            f"{baseline / seconds:>6.1f}x"
+        )
+
+
+def main():
+    """
+    The main function that parses command-line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of the row renderers.")
+
+    parser.add_argument(
+        "--rows", type=int, default=100_000, help="Number of rows of the tall table."
+    )
+    parser.add_argument(
+        "--columns", type=int, default=200, help="Number of columns of the wide table."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Number of runs per renderer."
+    )
+
+    args = parser.parse_args()
+
+    run("tall", _table(5, args.rows), args.repeat)
+    run("wide", _table(args.columns, max(args.rows // 50, 1)), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark of the on-disk size of column types.
+
+Creates tables from schemas of the test generator twice: once with the default types
+('number' as an 8-byte double, 'string' as an unbounded varchar) and once with compact
+types fitting the generated data ('number' as smallint, 'string' as a bounded varchar).
+Both are filled with the same rows and indexed on every column, then the table and
+index sizes reported by Postgres are compared.
+
+Requires a configured database.
+
+Usage:
+    $ PYTHONPATH=src poetry run python -m benchmarks.storage --rows 100000
+"""
+
+import argparse
+
+from benchmarks import setup
+
+setup()
+
+from django.db import connection  # noqa: E402
+from dynatablebackend.db import tables  # noqa: E402
+from dynatablebackend.db.util import get_dynamic_model  # noqa: E402
+from tests.generator import BulkRowGenerator, generator  # noqa: E402
+
+# Compact counterparts of the generated types, the generator draws numbers from 1-100
+COMPACT_TYPES = {
+    "number": {"type": "smallint"},
+    "string": {"type": "varchar", "max_length": 64},
+    "boolean": {"type": "boolean"},
+}
+
+
+def _sizes(table_id: str, rows: BulkRowGenerator, n: int):
+    """
+    Fills a table with rows, indexes every column and measures it.
+
+    Args:
+        table_id (str): The identifier of the table.
+        rows (BulkRowGenerator): The generator of the rows to insert.
+        n (int): The number of rows to insert.
+
+    Returns:
+        tuple: The table size and the total size of its indexes, in bytes.
+    """
+    DynamicModel = get_dynamic_model(table_id)
+    rows.copy_to_table(table_id, n)
+
+    db_table = connection.ops.quote_name(DynamicModel._meta.db_table)
+    with connection.cursor() as cursor:
+        for field in DynamicModel._meta.concrete_fields:
+            if not field.primary_key:
+                cursor.execute(
+                    f"CREATE INDEX ON {db_table} ({connection.ops.quote_name(field.column)})"
+                )
+
+        cursor.execute(f"VACUUM ANALYZE {db_table}")
+        cursor.execute(
+            "SELECT pg_table_size(%s), pg_indexes_size(%s)",
+            [DynamicModel._meta.db_table, DynamicModel._meta.db_table],
+        )
+        sizes = cursor.fetchone()
+
+    with connection.schema_editor() as schema_editor:
+        schema_editor.delete_model(DynamicModel)
+
+    return sizes
+
+
+def run(rows: int, seed: int):
+    """
+    Compares default and compact types on one generated schema and prints the result.
+
+    Args:
+        rows (int): The number of rows to insert into each table.
+        seed (int): The seed of the generated rows, the same for both tables.
+    """
+    fields = generator.model_fields_generator.one()
+    data = fields.bulk_row_generator(seed)
+
+    compact_fields = [
+        {"name": field["name"], **COMPACT_TYPES[field["type"]]} for field in fields
+    ]
+
+    default_table, default_indexes = _sizes(tables.create_table(fields), data, rows)
+    compact_table, compact_indexes = _sizes(
+        tables.create_table(compact_fields), data, rows
+    )
+
+    types = ", ".join(field["type"] for field in fields)
+    print(f"{'=' * 72}\n{rows} rows x ({types})")
+
+    for label, default, compact in (
+        ("table", default_table, compact_table),
+        ("indexes", default_indexes, compact_indexes),
+        ("total", default_table + default_indexes, compact_table + compact_indexes),
+    ):
+        print(
+            f"  {label:<8} default {default / 1024**2:>8.2f} MiB   "
+            f"compact {compact / 1024**2:>8.2f} MiB   "
+            f"{(1 - compact / default) * 100:>5.1f}% smaller"
+        )
+
+
+def main():
+    """
+    The main function that parses command-line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the on-disk size of column types."
+    )
+
+    parser.add_argument(
+        "--rows", type=int, default=100_000, help="Number of rows per table."
+    )
+    parser.add_argument(
+        "--schemas", type=int, default=3, help="Number of generated schemas."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the generated rows."
+    )
+
+    args = parser.parse_args()
+
+    for _ in range(args.schemas):
+        run(args.rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
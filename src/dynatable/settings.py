@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "dynatablebackend.middleware.TrafficRecorderMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -51,6 +52,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "dynatablebackend.middleware.ReplicaPinMiddleware",
+    "dynatablebackend.middleware.AdmissionMiddleware",
 ]
 
 ROOT_URLCONF = "dynatable.urls"
@@ -73,6 +76,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "dynatable.wsgi.application"
 
+ASGI_APPLICATION = "dynatable.asgi.application"
+
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
@@ -89,6 +94,55 @@ DATABASES = {
     }
 }
 
+# Shards
+# Comma separated 'host[:port][/name]' addresses of further databases to place tables
+# on, e.g. DATABASE_SHARDS=shard1,shard2:5433/dynatable. Each new table is placed on
+# one of 'default' and these databases by a hash of its table_id, and recorded in the
+# shard map, which tells where tables are after shards are added or tables are moved.
+# Each worker caches its lookups for DYNATABLE_SHARD_MAP_TTL seconds
+
+DATABASE_SHARDS = ["default"]
+
+for number, address in enumerate(
+    filter(None, os.getenv("DATABASE_SHARDS", "").split(",")), start=1
+):
+    address, _, name = address.strip().partition("/")
+    host, _, port = address.partition(":")
+    DATABASES[f"shard{number}"] = {
+        **DATABASES["default"],
+        "NAME": name or DATABASES["default"]["NAME"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"NAME": f"test_{DATABASES['default']['NAME']}_shard{number}"},
+    }
+    DATABASE_SHARDS.append(f"shard{number}")
+
+DYNATABLE_SHARD_MAP_TTL = int(os.getenv("DYNATABLE_SHARD_MAP_TTL", 5))
+
+# Read replicas
+# Comma separated 'host[:port]' addresses of streaming replicas of the default
+# database (the 'default' shard), e.g. DATABASE_REPLICAS=replica1,replica2:5433. Reads of dynamic tables are
+# spread over them, except for clients that wrote within the last
+# DYNATABLE_REPLICA_PIN_SECONDS, which read from the primary
+
+DATABASE_REPLICAS = []
+
+for number, address in enumerate(
+    filter(None, os.getenv("DATABASE_REPLICAS", "").split(",")), start=1
+):
+    host, _, port = address.strip().partition(":")
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{number}")
+
+DATABASE_ROUTERS = ["dynatablebackend.routers.ReplicaRouter"]
+
+DYNATABLE_REPLICA_PIN_SECONDS = int(os.getenv("DYNATABLE_REPLICA_PIN_SECONDS", 5))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -125,6 +179,77 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Counting
+# Tables estimated to hold at least this many rows are counted from planner
+# statistics rather than with COUNT(*) when the count mode is 'auto'
+
+DYNATABLE_COUNT_ESTIMATE_THRESHOLD = int(
+    os.getenv("DYNATABLE_COUNT_ESTIMATE_THRESHOLD", 1_000_000)
+)
+
+# Change feeds
+# Changes are kept in the change log of a table for DYNATABLE_CHANGE_FEED_RETENTION
+# seconds; clients following a feed get a keep-alive every DYNATABLE_CHANGE_FEED_HEARTBEAT
+# seconds, and clients of a WSGI server reconnect after DYNATABLE_CHANGE_FEED_RETRY ms
+
+DYNATABLE_CHANGE_FEED_RETENTION = int(
+    os.getenv("DYNATABLE_CHANGE_FEED_RETENTION", 24 * 60 * 60)
+)
+
+DYNATABLE_CHANGE_FEED_HEARTBEAT = int(os.getenv("DYNATABLE_CHANGE_FEED_HEARTBEAT", 15))
+
+DYNATABLE_CHANGE_FEED_RETRY = int(os.getenv("DYNATABLE_CHANGE_FEED_RETRY", 1000))
+
+# Traffic recording
+# Path of the log the API traffic to the tables is recorded to for replay with the
+# simulation package, recording is off when unset
+
+DYNATABLE_TRAFFIC_LOG = os.getenv("DYNATABLE_TRAFFIC_LOG")
+
+# Admission control
+# Limits of the requests to each table, per kind of operation, within each worker:
+# 'concurrency' requests served at once, further ones waiting up to
+# DYNATABLE_ADMISSION_QUEUE_TIMEOUT seconds for a slot, and 'rate' requests per second
+# with bursts of up to 'burst' requests; a limit of 0 is no limit
+
+DYNATABLE_ADMISSION_LIMITS = {
+    kind: {
+        "concurrency": int(os.getenv(f"DYNATABLE_{kind.upper()}_CONCURRENCY", 0)),
+        "rate": float(os.getenv(f"DYNATABLE_{kind.upper()}_RATE", 0)),
+        "burst": int(os.getenv(f"DYNATABLE_{kind.upper()}_BURST", 0)),
+    }
+    for kind in ("read", "write")
+}
+
+DYNATABLE_ADMISSION_QUEUE_TIMEOUT = float(
+    os.getenv("DYNATABLE_ADMISSION_QUEUE_TIMEOUT", 1)
+)
+
+# Number of per table gates a worker keeps, the least recently used idle ones beyond it
+# are dropped and made again on the next request to their table
+
+DYNATABLE_ADMISSION_MAX_GATES = int(os.getenv("DYNATABLE_ADMISSION_MAX_GATES", 1000))
+
+# Group commit
+# Single rows added to a table are gathered into batches of up to
+# DYNATABLE_GROUP_COMMIT_ROWS rows, inserted and committed together once full or
+# DYNATABLE_GROUP_COMMIT_WAIT_MS ms after their first row; 0 commits every row alone
+
+DYNATABLE_GROUP_COMMIT_ROWS = int(os.getenv("DYNATABLE_GROUP_COMMIT_ROWS", 0))
+
+DYNATABLE_GROUP_COMMIT_WAIT_MS = int(os.getenv("DYNATABLE_GROUP_COMMIT_WAIT_MS", 5))
+
+# Background jobs
+# Number of threads of each worker process running the jobs it queued
+
+DYNATABLE_JOB_WORKERS = int(os.getenv("DYNATABLE_JOB_WORKERS", 4))
+
+# Dynamic models
+# Number of dynamic model classes each worker keeps in memory, least recently used
+# models beyond it are dropped and rebuilt from the database on their next use
+
+DYNATABLE_MAX_RESIDENT_MODELS = int(os.getenv("DYNATABLE_MAX_RESIDENT_MODELS", 1000))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -18,6 +18,7 @@ Including another URLconf
 from django.urls import include, path, re_path
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
+from dynatablebackend.schema import CachedSchemaGenerator
 from rest_framework import permissions
 
 from dynatable import views
@@ -30,6 +31,7 @@ schema_view = get_schema_view(
     ),
     public=True,
     permission_classes=(permissions.AllowAny,),
+    generator_class=CachedSchemaGenerator,
 )
 
 
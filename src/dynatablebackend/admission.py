@@ -0,0 +1,255 @@
+"""Admission control of the requests to dynamic tables."""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from dynatable.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Request methods that only read, any other method is a write
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Gates of the tables and operations this worker has served, least recently used first
+_gates: "OrderedDict[Tuple[str, str], Gate]" = OrderedDict()
+_gates_lock = threading.Lock()
+
+# Counters of the gates forgotten since, so that the reported totals never go down
+_retired = {"admitted": 0, "rejected": {"rate": 0, "concurrency": 0}}
+
+
+class Rejected(Exception):
+    """
+    Raised when a request is not admitted to a table.
+
+    Attributes:
+        reason (str): 'rate' when the table's token bucket is empty, 'concurrency' when
+                      no slot freed up in time.
+        retry_after (int): The number of seconds the client should wait before retrying.
+    """
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket holding up to 'burst' tokens, refilled with 'rate' tokens per second.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst or max(math.ceil(rate), 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """
+        Takes a token if there is one.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the number of seconds until the
+                   next token.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+
+        return (1 - self.tokens) / self.rate
+
+
+class Gate:
+    """
+    Admits the requests of one kind of operation to one table.
+
+    A request first takes a token from the gate's bucket, if the operation is rate
+    limited, and then a slot, if its concurrency is limited. Requests finding every slot
+    taken queue for up to DYNATABLE_ADMISSION_QUEUE_TIMEOUT seconds.
+
+    Attributes:
+        in_flight (int): The number of requests being served.
+        queued (int): The number of requests waiting for a slot.
+        admitted (int): The number of requests admitted so far.
+        rejected (Dict[str, int]): The number of requests rejected so far, by reason.
+    """
+
+    def __init__(self, concurrency: int, rate: float, burst: int):
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = {"rate": 0, "concurrency": 0}
+
+    @property
+    def idle(self) -> bool:
+        return self.in_flight == 0 and self.queued == 0
+
+    def enter(self, timeout: float):
+        with self.condition:
+            if self.bucket is not None:
+                wait = self.bucket.take()
+                if wait:
+                    self.rejected["rate"] += 1
+                    raise Rejected("rate", max(math.ceil(wait), 1))
+
+            if self.concurrency and self.in_flight >= self.concurrency:
+                self.queued += 1
+                try:
+                    free = self.condition.wait_for(
+                        lambda: self.in_flight < self.concurrency, timeout
+                    )
+                finally:
+                    self.queued -= 1
+
+                if not free:
+                    self.rejected["concurrency"] += 1
+                    raise Rejected("concurrency", max(math.ceil(timeout), 1))
+
+            self.in_flight += 1
+            self.admitted += 1
+
+    def leave(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+        }
+
+
+def operation(method: str) -> str:
+    """
+    Returns the kind of operation of a request method, 'read' or 'write'.
+    """
+    return "read" if method in READ_METHODS else "write"
+
+
+def _retire(gate: Gate):
+    _retired["admitted"] += gate.admitted
+    for reason, count in gate.rejected.items():
+        _retired["rejected"][reason] += count
+
+
+def _get_gate(table_id: str, kind: str) -> Optional[Gate]:
+    limits = settings.DYNATABLE_ADMISSION_LIMITS.get(kind, {})
+    if not (limits.get("concurrency") or limits.get("rate")):
+        return None
+
+    with _gates_lock:
+        gate = _gates.get((table_id, kind))
+        if gate is None:
+            gate = _gates[(table_id, kind)] = Gate(
+                limits.get("concurrency", 0),
+                limits.get("rate", 0),
+                limits.get("burst", 0),
+            )
+
+            # Forget the least recently used gates with no request in them, so that a
+            # worker does not keep one for every table
+            for key in list(_gates):
+                if len(_gates) <= settings.DYNATABLE_ADMISSION_MAX_GATES:
+                    break
+                if _gates[key].idle:
+                    _retire(_gates.pop(key))
+
+        _gates.move_to_end((table_id, kind))
+
+    return gate
+
+
+def admit(table_id: str, kind: str) -> Optional[Gate]:
+    """
+    Admits a request to a table, or rejects it.
+
+    The limits of each kind of operation are configured in DYNATABLE_ADMISSION_LIMITS
+    and apply to every table separately, within each worker process, so one client
+    flooding a table with writes is held back without slowing down the other tables.
+
+    Args:
+        table_id (str): The identifier of the table the request is for.
+        kind (str): The kind of operation, see `operation`.
+
+    Returns:
+        Optional[Gate]: The gate the request went through, to leave once the request is
+                        served; None if the operation is not limited.
+
+    Raises:
+        Rejected: If the table's bucket is empty or no slot freed up in time.
+
+    Example:
+        gate = admit("Person", "write")
+        try:
+            ...  # Serve the request
+        finally:
+            if gate is not None:
+                gate.leave()
+    """
+    gate = _get_gate(table_id, kind)
+    if gate is None:
+        return None
+
+    try:
+        gate.enter(settings.DYNATABLE_ADMISSION_QUEUE_TIMEOUT)
+    except Rejected as rejection:
+        logger.warning(
+            f"Rejected {kind} of table '{table_id}' - {rejection.reason} limit reached"
+        )
+        raise
+
+    return gate
+
+
+def admission_report() -> Dict[str, Any]:
+    """
+    Reports the admission of requests to the tables this worker has served.
+
+    Returns:
+        dict: The configured 'limits', and per table and kind of operation the number of
+              requests in flight, queued for a slot, admitted and rejected by reason,
+              along with the totals of all tables. The admitted and rejected totals
+              only ever grow, they include the tables whose gates were forgotten.
+
+    Example:
+        admission_report()
+        # {"limits": {...}, "queued": 3, "rejected": {"rate": 12, "concurrency": 0},
+        #  "tables": {"Person": {"write": {"in_flight": 8, "queued": 3, ...}}}}
+    """
+    tables: Dict[str, Dict[str, Any]] = {}
+
+    with _gates_lock:
+        gates = list(_gates.items())
+        totals = {"in_flight": 0, "queued": 0, "admitted": _retired["admitted"]}
+        rejected = dict(_retired["rejected"])
+
+    for (table_id, kind), gate in gates:
+        report = gate.report()
+        tables.setdefault(table_id, {})[kind] = report
+
+        for name in totals:
+            totals[name] += report[name]
+        for reason, count in report["rejected"].items():
+            rejected[reason] += count
+
+    return {
+        "limits": settings.DYNATABLE_ADMISSION_LIMITS,
+        **totals,
+        "rejected": rejected,
+        "tables": tables,
+    }
@@ -0,0 +1,378 @@
+"""Change feeds of dynamic tables, pushed to clients through LISTEN/NOTIFY."""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from dynatable.logger import get_logger
+
+from dynatablebackend.db import shards
+
+logger = get_logger(__name__)
+
+# Operations recorded in a change log, named after the statements that made them
+FEED_OPERATIONS = {"INSERT": "insert", "UPDATE": "update", "DELETE": "delete"}
+
+# Operation of the marker left in a change log where older changes were pruned
+PRUNED = "pruned"
+
+# Number of changes read from a change log at once
+FEED_BATCH_SIZE = 1000
+
+# Global set of tables with a change feed
+feed_tables: Set[str] = set()
+
+
+def register(table_id: str):
+    feed_tables.add(table_id)
+
+
+def unregister(table_id: str):
+    feed_tables.discard(table_id)
+
+
+def has_feed(table_id: str) -> bool:
+    return table_id in feed_tables
+
+
+def _feed_table(DynamicModel) -> str:
+    return f"{DynamicModel._meta.db_table}_feed"
+
+
+def channel(DynamicModel) -> str:
+    """
+    Returns the LISTEN/NOTIFY channel announcing new changes of a table.
+    """
+    return DynamicModel._meta.db_table
+
+
+def create_feed(schema_editor, table_id: str, DynamicModel):
+    """
+    Creates the change log of a table and installs the triggers filling it.
+
+    The change log holds one entry per written row: a sequence number, the operation and
+    the row's id. Statement-level triggers append the rows each INSERT, UPDATE or DELETE
+    statement changed, available as transition tables, and notify the table's channel.
+    Appends are serialized per table until the writing transaction commits, so sequence
+    numbers become visible in order and a reader that has seen a change has also seen
+    every change before it. Tables without a change feed are left as-is.
+
+    An existing change log is kept, so the feed survives `update_table` recreating the
+    table.
+
+    Args:
+        schema_editor (BaseDatabaseSchemaEditor): The schema editor to run the DDL with.
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+    """
+    if not has_feed(table_id):
+        return
+
+    quote_name = schema_editor.quote_name
+    db_table = quote_name(DynamicModel._meta.db_table)
+    feed = quote_name(_feed_table(DynamicModel))
+
+    schema_editor.execute(
+        f"CREATE TABLE IF NOT EXISTS {feed} (seq bigserial PRIMARY KEY, "
+        "op text NOT NULL, row_id bigint, changed_at timestamptz NOT NULL DEFAULT now())"
+    )
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {quote_name(f'{_feed_table(DynamicModel)}_at')} "
+        f"ON {feed} USING BRIN (changed_at)"
+    )
+
+    function = quote_name(f"{_feed_table(DynamicModel)}_fn")
+    schema_editor.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_advisory_xact_lock(TG_RELID::bigint);
+            IF TG_OP = 'DELETE' THEN
+                INSERT INTO {feed} (op, row_id)
+                SELECT '{FEED_OPERATIONS["DELETE"]}', id FROM old_rows ORDER BY id;
+            ELSIF TG_OP = 'UPDATE' THEN
+                INSERT INTO {feed} (op, row_id)
+                SELECT '{FEED_OPERATIONS["UPDATE"]}', id FROM new_rows ORDER BY id;
+            ELSE
+                INSERT INTO {feed} (op, row_id)
+                SELECT '{FEED_OPERATIONS["INSERT"]}', id FROM new_rows ORDER BY id;
+            END IF;
+            IF FOUND THEN
+                PERFORM pg_notify('{channel(DynamicModel)}', '');
+            END IF;
+            RETURN NULL;
+        END $$
+        """
+    )
+
+    transitions = {
+        "INSERT": "NEW TABLE AS new_rows",
+        "UPDATE": "NEW TABLE AS new_rows",
+        "DELETE": "OLD TABLE AS old_rows",
+    }
+    for event, referencing in transitions.items():
+        schema_editor.execute(
+            f"CREATE TRIGGER {quote_name(f'feed_{event.lower()}')} "
+            f"AFTER {event} ON {db_table} REFERENCING {referencing} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        )
+
+
+def drop_feed(schema_editor, table_id: str, DynamicModel):
+    """
+    Drops the change log and the trigger function of a table's change feed.
+    """
+    if not has_feed(table_id):
+        return
+
+    quote_name = schema_editor.quote_name
+    schema_editor.execute(
+        f"DROP TABLE IF EXISTS {quote_name(_feed_table(DynamicModel))}"
+    )
+    schema_editor.execute(
+        f"DROP FUNCTION IF EXISTS {quote_name(f'{_feed_table(DynamicModel)}_fn')}() "
+        "CASCADE"
+    )
+
+
+def copy_feed(table_id: str, DynamicModel, source: str, target: str):
+    """
+    Creates the change feed of a table on another database with the retained changes.
+
+    Used when moving a table to another shard, with writes to the source table blocked,
+    so the cursors of clients following the feed stay valid on the target.
+
+    Args:
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+        source (str): The database alias to copy the change log from.
+        target (str): The database alias to create the change feed on.
+    """
+    if not has_feed(table_id):
+        return
+
+    with connections[target].schema_editor() as schema_editor:
+        create_feed(schema_editor, table_id, DynamicModel)
+
+    feed = connections[source].ops.quote_name(_feed_table(DynamicModel))
+    with connections[source].cursor() as cursor:
+        cursor.execute(f"SELECT seq, op, row_id, changed_at FROM {feed} ORDER BY seq")
+        entries = cursor.fetchall()
+        cursor.execute(
+            "SELECT pg_sequence_last_value(pg_get_serial_sequence(%s, 'seq'))",
+            [_feed_table(DynamicModel)],
+        )
+        last_value = cursor.fetchone()[0]
+
+    with connections[target].cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {feed} (seq, op, row_id, changed_at) VALUES (%s, %s, %s, %s)",
+            entries,
+        )
+        if last_value is not None:
+            cursor.execute(
+                "SELECT setval(pg_get_serial_sequence(%s, 'seq'), %s)",
+                [_feed_table(DynamicModel), last_value],
+            )
+
+
+def prune(table_id: str, DynamicModel):
+    """
+    Removes changes older than DYNATABLE_CHANGE_FEED_RETENTION seconds from a change log.
+
+    The newest removed change is kept as a 'pruned' marker, so readers whose cursor
+    points before it learn that they missed changes.
+    """
+    connection = connections[shards.get_shard(table_id)]
+    feed = connection.ops.quote_name(_feed_table(DynamicModel))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT max(seq) FROM {feed} "
+            "WHERE changed_at < now() - make_interval(secs => %s)",
+            [settings.DYNATABLE_CHANGE_FEED_RETENTION],
+        )
+        (horizon,) = cursor.fetchone()
+        if horizon is None:
+            return
+
+        cursor.execute(f"DELETE FROM {feed} WHERE seq < %s", [horizon])
+        cursor.execute(
+            f"UPDATE {feed} SET op = %s, row_id = NULL WHERE seq = %s",
+            [PRUNED, horizon],
+        )
+
+    logger.info(f"Pruned change log of table '{table_id}' up to change {horizon}")
+
+
+def last_seq(table_id: str, DynamicModel) -> int:
+    """
+    Returns the sequence number of the latest change of a table, 0 if there is none.
+    """
+    connection = connections[shards.get_shard(table_id)]
+    feed = connection.ops.quote_name(_feed_table(DynamicModel))
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT coalesce(max(seq), 0) FROM {feed}")
+        return cursor.fetchone()[0]
+
+
+def read_changes(
+    table_id: str, DynamicModel, cursor: int, limit: int = FEED_BATCH_SIZE
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Reads the changes of a table made after a cursor.
+
+    Inserted and updated rows are read from the table as they are now, so a change
+    carries the latest state of its row, and changes of rows deleted since are skipped.
+    A deleted row is reduced to its 'id'. Both the log and the rows are read from the
+    primary of the table's shard, which has every change the notifications announce.
+
+    Args:
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+        cursor (int): The sequence number of the last change the reader has seen.
+        limit (int): The maximum number of changes read. Defaults to FEED_BATCH_SIZE.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: The changes, each with its 'seq', 'op' and
+                                          'row', and the cursor after them. A 'reset'
+                                          change comes first when changes after the
+                                          cursor were pruned.
+
+    Example:
+        changes, cursor = read_changes("Person", DynamicModel, 41)
+        # [{"seq": 42, "op": "update", "row": {"id": 7, "name": "Matt", "age": 113}}], 42
+    """
+    shard = shards.get_shard(table_id)
+    connection = connections[shard]
+    feed = connection.ops.quote_name(_feed_table(DynamicModel))
+
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(
+            f"SELECT seq, op, row_id FROM {feed} WHERE seq > %s ORDER BY seq LIMIT %s",
+            [cursor, limit],
+        )
+        entries = db_cursor.fetchall()
+
+    changed = {
+        row_id
+        for _, op, row_id in entries
+        if op in (FEED_OPERATIONS["INSERT"], FEED_OPERATIONS["UPDATE"])
+    }
+    # Keyed by field names, values() would key reference columns by their attname
+    names = [field.name for field in DynamicModel._meta.concrete_fields]
+    rows = {
+        row["id"]: row
+        for row in DynamicModel.objects.using(shard)
+        .filter(id__in=changed)
+        .values(*names)
+    }
+
+    changes = []
+    for seq, op, row_id in entries:
+        if op == PRUNED:
+            changes.append({"seq": seq, "op": "reset", "row": None})
+        elif op == FEED_OPERATIONS["DELETE"]:
+            changes.append({"seq": seq, "op": op, "row": {"id": row_id}})
+        elif row_id in rows:
+            changes.append({"seq": seq, "op": op, "row": rows[row_id]})
+
+    return changes, entries[-1][0] if entries else cursor
+
+
+def iter_changes(table_id: str, DynamicModel, cursor: int) -> Iterator[Dict[str, Any]]:
+    """
+    Iterates over the changes of a table made after a cursor, up to the latest one.
+    """
+    while True:
+        changes, next_cursor = read_changes(table_id, DynamicModel, cursor)
+        yield from changes
+
+        if next_cursor == cursor:
+            break
+
+        cursor = next_cursor
+
+
+def _listen(alias: str, name: str):
+    wrapper = connections[alias]
+    connection = wrapper.get_new_connection(wrapper.get_connection_params())
+    connection.autocommit = True
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {wrapper.ops.quote_name(name)}")
+
+    return connection
+
+
+async def stream_changes(
+    table_id: str, DynamicModel, cursor: int
+) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Follows the changes of a table, pushed by Postgres as they are committed.
+
+    A dedicated connection LISTENs to the table's channel before the changes after
+    'cursor' are caught up on, so no change committed in between is missed. The stream
+    then waits for notifications without polling the database, waking up every
+    DYNATABLE_CHANGE_FEED_HEARTBEAT seconds to let the client know it is alive and to
+    follow the table when it was moved to another shard. Must be consumed by an ASGI
+    server; it never ends on its own.
+
+    Args:
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+        cursor (int): The sequence number of the last change the client has seen.
+
+    Yields:
+        Optional[Dict[str, Any]]: Consecutive changes as returned by `read_changes`, or
+                                  None when a heartbeat is due.
+    """
+    loop = asyncio.get_running_loop()
+    notified = asyncio.Event()
+    listener, shard = None, None
+
+    try:
+        while True:
+            # The lookup may read the shard map, which cannot be done in the event loop
+            current = await sync_to_async(shards.get_shard)(table_id)
+            if shard != current:
+                if listener is not None:
+                    loop.remove_reader(listener.fileno())
+                    listener.close()
+
+                shard = current
+                listener = await sync_to_async(_listen, thread_sensitive=False)(
+                    shard, channel(DynamicModel)
+                )
+                loop.add_reader(listener.fileno(), notified.set)
+                logger.info(f"Following changes of table '{table_id}' on '{shard}'")
+
+            while True:
+                changes, next_cursor = await sync_to_async(read_changes)(
+                    table_id, DynamicModel, cursor
+                )
+                for change in changes:
+                    yield change
+
+                if next_cursor == cursor:
+                    break
+
+                cursor = next_cursor
+
+            try:
+                await asyncio.wait_for(
+                    notified.wait(), settings.DYNATABLE_CHANGE_FEED_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                yield None
+
+            notified.clear()
+            listener.poll()
+            listener.notifies.clear()
+    finally:
+        if listener is not None:
+            loop.remove_reader(listener.fileno())
+            listener.close()
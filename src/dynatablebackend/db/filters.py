@@ -0,0 +1,63 @@
+"""Row filters for dynamic tables."""
+
+from typing import Any, Dict
+
+# Only allowed lookups in row filters
+FILTER_LOOKUPS = {
+    "exact",
+    "iexact",
+    "gt",
+    "gte",
+    "lt",
+    "lte",
+    "in",
+    "range",
+    "isnull",
+    "contains",
+    "icontains",
+    "startswith",
+    "istartswith",
+    "endswith",
+    "iendswith",
+}
+
+
+def to_filter_kwargs(DynamicModel, predicate: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validates a row filter predicate and converts it to QuerySet.filter() arguments.
+
+    The predicate maps column names, optionally followed by a lookup separated with '__',
+    to values, e.g. {"age__gte": 18, "city": "Warsaw"}. All conditions are combined
+    with AND. Only columns of the dynamic model and lookups listed in FILTER_LOOKUPS are
+    accepted, so a predicate cannot reach beyond the table.
+
+    Args:
+        DynamicModel (class): The dynamic model the predicate applies to.
+        predicate (Dict[str, Any]): The filter predicate.
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for QuerySet.filter().
+
+    Raises:
+        ValueError: If the predicate is not a dictionary, refers to an unknown column or
+                    uses an unsupported lookup.
+
+    Example:
+        to_filter_kwargs(DynamicModel, {"age__gte": 18})
+        # Returns {"age__gte": 18}, ready for DynamicModel.objects.filter(**kwargs).
+    """
+    if not isinstance(predicate, dict):
+        raise ValueError("Filter must be an object of column lookups")
+
+    columns = {field.name for field in DynamicModel._meta.concrete_fields}
+
+    for key in predicate:
+        column, _, lookup = key.partition("__")
+
+        if column not in columns:
+            raise ValueError(f"Unknown column '{column}'")
+
+        if lookup and lookup not in FILTER_LOOKUPS:
+            raise ValueError(f"Unsupported lookup '{lookup}'")
+
+    return dict(predicate)
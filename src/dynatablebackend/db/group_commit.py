@@ -0,0 +1,141 @@
+"""Group commit of the single rows added to a table."""
+
+import threading
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.utils import Error as DjangoError
+from dynatable.logger import get_logger
+
+from dynatablebackend.db import partitions
+
+logger = get_logger(__name__)
+
+# Batches being gathered, by table and model class, the rows of a superseded class
+# are not mixed with those of the current one
+_batches: Dict[Tuple[str, type], "_Batch"] = {}
+_batches_lock = threading.Lock()
+
+
+class _Batch:
+    """
+    Rows gathered to be inserted and committed together.
+
+    The first caller adding a row to a batch leads it: it waits for the batch to fill up
+    or for its time to run out, inserts the rows and hands out the results. The other
+    callers wait until then.
+    """
+
+    def __init__(self):
+        self.rows: List[Dict[str, Any]] = []
+        self.records: List[Any] = []
+        self.results: List[bool] = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+
+def enabled(DynamicModel) -> bool:
+    """
+    Tells whether the rows added to a table are group committed.
+
+    Rows are only gathered when DYNATABLE_GROUP_COMMIT_ROWS is set and the caller is
+    not in a transaction of its own, whose commit the batch could not wait for.
+    """
+    if settings.DYNATABLE_GROUP_COMMIT_ROWS <= 1:
+        return False
+
+    using = router.db_for_write(DynamicModel)
+    return not transaction.get_connection(using).in_atomic_block
+
+
+def _insert(table_id: str, DynamicModel, batch: _Batch) -> List[bool]:
+    using = router.db_for_write(DynamicModel)
+
+    try:
+        with transaction.atomic(using=using):
+            partitions.ensure_partitions(table_id, DynamicModel, batch.rows)
+            DynamicModel.objects.using(using).bulk_create(batch.records)
+
+        logger.info(f"Committed {len(batch.records)} rows to table '{table_id}'")
+        return [True] * len(batch.records)
+
+    except DjangoError as err:
+        logger.warning(
+            f"Batch of {len(batch.records)} rows to table '{table_id}' failed, "
+            f"inserting them one by one: {err}"
+        )
+
+    # Keep the rows of a failed batch apart, so that only the bad ones fail
+    results = []
+    for row, record in zip(batch.rows, batch.records):
+        try:
+            with transaction.atomic(using=using):
+                partitions.ensure_partitions(table_id, DynamicModel, [row])
+                record.save(using=using)
+            results.append(True)
+        except DjangoError as err:
+            logger.error(f"Failed to add a new row to table '{table_id}': {err}")
+            results.append(False)
+
+    return results
+
+
+def add(table_id: str, DynamicModel, row: Dict[str, Any], record) -> bool:
+    """
+    Adds a row to a table together with the rows added concurrently by other callers.
+
+    Rows are gathered per table into batches of up to DYNATABLE_GROUP_COMMIT_ROWS rows,
+    each inserted with a single `bulk_create` and committed in one transaction, once full
+    or DYNATABLE_GROUP_COMMIT_WAIT_MS milliseconds after its first row arrived. Callers
+    return only once their batch has committed, so a successful add is as durable as a
+    row saved on its own, while the database commits, and flushes its log, once per
+    batch. If a batch fails, its rows are inserted one by one, so only bad rows fail.
+
+    Args:
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+        row (Dict[str, Any]): The values of the row.
+        record: The model instance of the row.
+
+    Returns:
+        bool: True if the row was committed, False otherwise.
+
+    Example:
+        add("Person", DynamicModel, row, DynamicModel(**row))
+        # Returns True once the batch holding the row has committed.
+    """
+    key = (table_id, DynamicModel)
+
+    with _batches_lock:
+        batch = _batches.get(key)
+        leader = batch is None
+        if leader:
+            batch = _batches[key] = _Batch()
+
+        index = len(batch.records)
+        batch.rows.append(row)
+        batch.records.append(record)
+
+        if len(batch.records) >= settings.DYNATABLE_GROUP_COMMIT_ROWS:
+            del _batches[key]
+            batch.full.set()
+
+    if not leader:
+        batch.done.wait()
+        return batch.results[index]
+
+    batch.full.wait(settings.DYNATABLE_GROUP_COMMIT_WAIT_MS / 1000)
+
+    with _batches_lock:
+        if _batches.get(key) is batch:
+            del _batches[key]
+
+    try:
+        batch.results = _insert(table_id, DynamicModel, batch)
+    finally:
+        if len(batch.results) < len(batch.records):
+            batch.results = [False] * len(batch.records)
+        batch.done.set()
+
+    return batch.results[index]
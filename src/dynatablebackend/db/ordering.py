@@ -0,0 +1,237 @@
+"""Sorted reads and keyset pagination over the rows of dynamic tables."""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections, models
+from django.db.models import Q
+from dynatable.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Column breaking the ties of the sort keys, so that every row has its own position
+TIE_BREAKER = "id"
+
+# Types of fields whose columns have no meaningful order
+UNSORTABLE_FIELDS = (models.JSONField,)
+
+
+def sort_keys(DynamicModel, order_by: Optional[List[str]]) -> List[Tuple[str, bool]]:
+    """
+    Turns the names of an 'order_by' parameter into the sort keys of a dynamic model.
+
+    A name prefixed with '-' sorts in descending order. Unless the names include it,
+    'id' is added last, in the direction of the last key, so that the order is total
+    and a page ends at a single row.
+
+    Args:
+        DynamicModel (class): The dynamic model of the table.
+        order_by (Optional[List[str]]): The column names, e.g. ['name', '-age'].
+
+    Returns:
+        List[Tuple[str, bool]]: The column names and whether they sort descending.
+
+    Raises:
+        ValueError: If a name is not a sortable column of the table or is repeated.
+
+    Example:
+        sort_keys(DynamicModel, ["name", "-age"])
+        # Returns [("name", False), ("age", True), ("id", True)]
+    """
+    keys = []
+    for item in order_by or []:
+        name = item.lstrip("-")
+
+        try:
+            field = DynamicModel._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ValueError(f"Column '{name}' does not exist")
+
+        if not field.concrete or isinstance(field, UNSORTABLE_FIELDS):
+            raise ValueError(f"Column '{name}' cannot be sorted")
+
+        if name in (key for key, _ in keys):
+            raise ValueError(f"Column '{name}' is sorted more than once")
+
+        keys.append((name, item.startswith("-")))
+
+    if TIE_BREAKER not in (name for name, _ in keys):
+        keys.append((TIE_BREAKER, keys[-1][1] if keys else False))
+
+    return keys
+
+
+def _names(keys: List[Tuple[str, bool]]) -> List[str]:
+    return [f"-{name}" if descending else name for name, descending in keys]
+
+
+def _attname(DynamicModel, name: str) -> str:
+    # Reference columns are compared by the id they hold, without joining their table
+    return DynamicModel._meta.get_field(name).attname
+
+
+def encode_cursor(DynamicModel, order_by: Optional[List[str]], row: Dict[str, Any]):
+    """
+    Encodes the position of a row in a sort order as an opaque cursor.
+
+    Args:
+        DynamicModel (class): The dynamic model of the table.
+        order_by (Optional[List[str]]): The column names of the sort order.
+        row (Dict[str, Any]): The row, as returned by `get_table_rows`.
+
+    Returns:
+        str: The URL safe cursor, holding the sort order and the row's sort key values.
+    """
+    keys = sort_keys(DynamicModel, order_by)
+    values = []
+
+    for name, _ in keys:
+        value = row[name]
+        # Expanded reference columns hold the referenced row instead of its id
+        values.append(value["id"] if isinstance(value, dict) else value)
+
+    cursor = {"order_by": _names(keys), "values": values}
+
+    # str() keeps the full precision of timestamps and decimals, and parses back
+    payload = json.dumps(cursor, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(
+    DynamicModel, order_by: Optional[List[str]], cursor: str
+) -> List[Any]:
+    """
+    Decodes a cursor of `encode_cursor` into the sort key values of its row.
+
+    Raises:
+        ValueError: If the cursor is malformed or was made for another sort order.
+    """
+    keys = sort_keys(DynamicModel, order_by)
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        names, values = payload["order_by"], payload["values"]
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+
+    if names != _names(keys) or len(values) != len(keys):
+        raise ValueError("Cursor does not match the sort order")
+
+    try:
+        return [
+            DynamicModel._meta.get_field(name).to_python(value)
+            for (name, _), value in zip(keys, values)
+        ]
+    except ValidationError:
+        raise ValueError("Invalid cursor")
+
+
+def paginate(queryset, order_by: Optional[List[str]], after: Optional[str] = None):
+    """
+    Sorts a queryset of a dynamic model and starts it after the row of a cursor.
+
+    The rows after the cursor are selected with a keyset condition on the sort keys
+    rather than an OFFSET, so a page costs the same however deep it is: the rows
+    whose first keys equal the cursor's and whose next key is past it. The condition
+    on the first key alone is repeated as a range, which an index on it can seek to.
+
+    Args:
+        queryset (QuerySet): The queryset of the table's dynamic model.
+        order_by (Optional[List[str]]): The column names of the sort order, by default
+                                        the rows are sorted by 'id'.
+        after (Optional[str]): A cursor from `encode_cursor`. Defaults to None, in which
+                               case the rows are selected from the first.
+
+    Returns:
+        QuerySet: The sorted queryset.
+
+    Raises:
+        ValueError: If a column is not sortable or the cursor is invalid.
+
+    Example:
+        paginate(DynamicModel.objects.all(), ["-age"], cursor)[:100]
+        # SELECT ... WHERE age <= 30 AND (age < 30 OR (age = 30 AND id < 7))
+        # ORDER BY age DESC, id DESC LIMIT 100
+    """
+    DynamicModel = queryset.model
+    keys = sort_keys(DynamicModel, order_by)
+    attnames = [_attname(DynamicModel, name) for name, _ in keys]
+
+    if after is not None:
+        values = decode_cursor(DynamicModel, order_by, after)
+
+        condition = Q()
+        for index, (attname, (_, descending)) in enumerate(zip(attnames, keys)):
+            lookup = "lt" if descending else "gt"
+            condition |= Q(
+                *(Q(**{name: value}) for name, value in zip(attnames, values[:index])),
+                **{f"{attname}__{lookup}": values[index]},
+            )
+
+        leading = "lte" if keys[0][1] else "gte"
+        queryset = queryset.filter(
+            Q(**{f"{attnames[0]}__{leading}": values[0]}), condition
+        )
+
+    return queryset.order_by(
+        *(f"-{attname}" if d else attname for attname, (_, d) in zip(attnames, keys))
+    )
+
+
+def is_indexed(DynamicModel, order_by: Optional[List[str]], using: str) -> bool:
+    """
+    Tells whether a B-tree index of a table serves a sort order.
+
+    The index must start with the columns of the sort keys, up to the unique 'id' or
+    the columns of a unique index, in the same directions or all reversed, which
+    Postgres scans backwards. Without one, every page sorts all the rows matching
+    the query.
+
+    Args:
+        DynamicModel (class): The dynamic model of the table.
+        order_by (Optional[List[str]]): The column names of the sort order.
+        using (str): The alias of the database holding the table.
+
+    Returns:
+        bool: Whether the rows can be read from an index in the sort order.
+    """
+    keys = []
+    for name, descending in sort_keys(DynamicModel, order_by):
+        if name == TIE_BREAKER:
+            break
+        keys.append((DynamicModel._meta.get_field(name).column, descending))
+
+    if not keys:
+        return True
+
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, DynamicModel._meta.db_table
+        )
+
+    columns = [column for column, _ in keys]
+    for constraint in constraints.values():
+        btree = constraint.get("type") in (models.Index.suffix, "btree")
+        if not (btree or constraint["primary_key"] or constraint["unique"]):
+            continue
+
+        indexed = constraint["columns"]
+        # Rows never tie on the columns of a unique index, the keys after them are moot
+        unique_prefix = constraint["unique"] and columns[: len(indexed)] == indexed
+        if not unique_prefix and indexed[: len(columns)] != columns:
+            continue
+
+        # Constraints do not report the orders of their index, which is ascending
+        orders = constraint.get("orders") or ["ASC"] * len(indexed)
+        reversed_keys = {
+            (order == "DESC") != descending
+            for order, (_, descending) in zip(orders, keys)
+        }
+        if len(reversed_keys) == 1:
+            return True
+
+    return False
@@ -0,0 +1,220 @@
+"""Range partitioning of dynamic tables."""
+
+import math
+from typing import Any, Dict, Iterable, Set
+
+from django.core.exceptions import ValidationError
+from django.db import connection, connections, transaction
+from django.db.utils import Error as DjangoError
+from dynatable.logger import get_logger
+
+from dynatablebackend.db import shards
+
+logger = get_logger(__name__)
+
+# Global dictionary of partitioned tables: key column, partition size and known partitions
+partitioned_tables: Dict[str, Dict[str, Any]] = {}
+
+
+def register(table_id: str, key: str, size: int):
+    """
+    Marks a table as range partitioned on the given key.
+
+    Args:
+        table_id (str): The identifier of the table.
+        key (str): The numeric column the table is partitioned on, usually 'id'.
+        size (int): The width of the key range covered by each partition.
+    """
+    partitioned_tables[table_id] = {"key": key, "size": size, "buckets": set()}
+
+
+def unregister(table_id: str):
+    partitioned_tables.pop(table_id, None)
+
+
+def is_partitioned(table_id: str) -> bool:
+    return table_id in partitioned_tables
+
+
+def create_model(schema_editor, table_id: str, DynamicModel):
+    """
+    Creates the table of a dynamic model, partitioned if the table is registered as such.
+
+    Partitioned tables are created as Postgres declaratively partitioned tables,
+    `PARTITION BY RANGE (key)`, together with the partitions for the first two ranges.
+    Postgres requires the primary key to include the partition key, so for keys other
+    than 'id' the primary key becomes ('id', key).
+
+    Args:
+        schema_editor (BaseDatabaseSchemaEditor): The schema editor to run the DDL with.
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model whose table is created.
+    """
+    if not is_partitioned(table_id):
+        schema_editor.create_model(DynamicModel)
+        return
+
+    partitioning = partitioned_tables[table_id]
+    quote_name = schema_editor.quote_name
+    key = quote_name(DynamicModel._meta.get_field(partitioning["key"]).column)
+
+    sql, params = schema_editor.table_sql(DynamicModel)
+    if partitioning["key"] != DynamicModel._meta.pk.name:
+        # Move the inline primary key of 'id' into a table constraint with the key
+        sql = sql.replace(" PRIMARY KEY", "", 1)
+        sql = f"{sql[:-1]}, PRIMARY KEY ({quote_name(DynamicModel._meta.pk.column)}, {key}))"
+
+    schema_editor.execute(f"{sql} PARTITION BY RANGE ({key})", params or None)
+    schema_editor.deferred_sql.extend(schema_editor._model_indexes_sql(DynamicModel))
+
+    partitioning["buckets"] = set()
+    for bucket in (0, 1):
+        _create_partition(schema_editor.execute, DynamicModel, partitioning, bucket)
+
+
+def _partition_name(DynamicModel, bucket: int) -> str:
+    suffix = f"p{bucket}" if bucket >= 0 else f"m{-bucket}"
+    return f"{DynamicModel._meta.db_table}_{suffix}"
+
+
+def _create_partition(execute, DynamicModel, partitioning: Dict[str, Any], bucket: int):
+    size = partitioning["size"]
+    quote_name = connection.ops.quote_name
+
+    execute(
+        f"CREATE TABLE IF NOT EXISTS {quote_name(_partition_name(DynamicModel, bucket))} "
+        f"PARTITION OF {quote_name(DynamicModel._meta.db_table)} "
+        f"FOR VALUES FROM ({bucket * size}) TO ({(bucket + 1) * size})"
+    )
+    partitioning["buckets"].add(bucket)
+
+
+def ensure_partitions(table_id: str, DynamicModel, rows: Iterable[Dict[str, Any]]):
+    """
+    Creates the partitions that the given rows are about to be inserted into.
+
+    For tables partitioned on 'id' the key is not known before the insert, so the
+    partitions up to the current value of the id sequence plus the number of rows are
+    created, with one spare partition ahead. For other keys the partitions of the keys
+    present in the rows are created. Partitions already known in this process are
+    skipped, so inserts into existing ranges do not run any DDL.
+
+    Args:
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+        rows (Iterable[Dict[str, Any]]): The rows that are about to be inserted.
+    """
+    partitioning = partitioned_tables.get(table_id)
+    if partitioning is None:
+        return
+
+    key, size = partitioning["key"], partitioning["size"]
+    using = shards.get_shard(table_id)
+
+    if key == DynamicModel._meta.pk.name:
+        rows = list(rows)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_sequence_last_value(pg_get_serial_sequence(%s, %s)::regclass)",
+                [DynamicModel._meta.db_table, DynamicModel._meta.pk.column],
+            )
+            last_id = cursor.fetchone()[0] or 0
+
+        last_bucket = math.floor((last_id + len(rows)) / size) + 1
+        buckets = set(range(math.floor(last_id / size), last_bucket + 1))
+    else:
+        field = DynamicModel._meta.get_field(key)
+        buckets = set()
+        for row in rows:
+            # Keys may come as strings, e.g. decimals, which the insert converts too
+            try:
+                value = field.to_python(row.get(key))
+            except ValidationError:
+                continue
+
+            if value is not None:
+                buckets.add(math.floor(value / size))
+
+    missing = buckets - partitioning["buckets"]
+    if not missing:
+        return
+
+    with connections[using].cursor() as cursor:
+        for bucket in sorted(missing):
+            logger.info(f"Creating partition {bucket} of table '{table_id}'")
+
+            try:
+                with transaction.atomic(using=using):
+                    _create_partition(
+                        cursor.execute, DynamicModel, partitioning, bucket
+                    )
+            except DjangoError as err:
+                logger.error(
+                    f"Failed to create partition {bucket} of table '{table_id}': {err}"
+                )
+
+
+def copy_partitions(table_id: str, DynamicModel, source: str, target: str):
+    """
+    Creates on the target database the partitions a table has on the source database.
+
+    Used while moving a partitioned table between shards, so that every row copied from
+    the source finds its partition on the target.
+
+    Args:
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+        source (str): The database alias the table is copied from.
+        target (str): The database alias the table is copied to.
+    """
+    partitioning = partitioned_tables.get(table_id)
+    if partitioning is None:
+        return
+
+    buckets = _read_buckets(source, DynamicModel)
+
+    with connections[target].cursor() as cursor:
+        for bucket in sorted(buckets):
+            _create_partition(cursor.execute, DynamicModel, partitioning, bucket)
+
+
+def clone_partitions(table_id: str, DynamicModel, SourceModel, using: str):
+    """
+    Creates the partitions another table has for a table partitioned the same way.
+
+    Used while cloning a partitioned table, so that every row copied from the source
+    table finds its partition in the clone.
+
+    Args:
+        table_id (str): The identifier of the clone.
+        DynamicModel (class): The dynamic model of the clone.
+        SourceModel (class): The dynamic model of the cloned table.
+        using (str): The database alias holding both tables.
+    """
+    partitioning = partitioned_tables.get(table_id)
+    if partitioning is None:
+        return
+
+    buckets = _read_buckets(using, SourceModel) - partitioning["buckets"]
+
+    with connections[using].cursor() as cursor:
+        for bucket in sorted(buckets):
+            _create_partition(cursor.execute, DynamicModel, partitioning, bucket)
+
+
+def _read_buckets(using: str, DynamicModel) -> Set[int]:
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [DynamicModel._meta.db_table],
+        )
+        names = {row[0] for row in cursor.fetchall()}
+
+    prefix = f"{DynamicModel._meta.db_table}_"
+    buckets = set()
+    for name in names:
+        suffix = name[len(prefix) :]
+        buckets.add(int(suffix[1:]) if suffix[0] == "p" else -int(suffix[1:]))
+
+    return buckets
@@ -0,0 +1,318 @@
+"""Incrementally maintained aggregate rollups of dynamic tables."""
+
+import re
+from typing import Any, Dict, List
+
+from django.db import connections, router
+from django.db.backends.utils import truncate_name
+from dynatable.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Aggregate functions a rollup can maintain for a numeric column
+ROLLUP_FUNCTIONS = ["sum", "count", "min", "max"]
+
+# Rollup names are part of database object names, so they are kept short and plain
+ROLLUP_NAME = re.compile(r"^[a-z][a-z0-9_]{0,11}$")
+
+# Internal types of the fields a rollup can aggregate
+NUMERIC_FIELDS = {
+    "FloatField",
+    "SmallIntegerField",
+    "IntegerField",
+    "BigIntegerField",
+    "DecimalField",
+}
+
+# Global dictionary of rollups per table: group by columns and aggregates per rollup name
+rollups: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+
+def register(table_id: str, name: str, group_by: List[str], aggregates: Dict):
+    """
+    Adds a rollup to a table's rollups.
+
+    Args:
+        table_id (str): The identifier of the table.
+        name (str): The name of the rollup.
+        group_by (List[str]): The columns the rows are grouped by.
+        aggregates (Dict[str, List[str]]): The functions of ROLLUP_FUNCTIONS to maintain
+                                           per numeric column.
+    """
+    rollups.setdefault(table_id, {})[name] = {
+        "group_by": list(group_by),
+        "aggregates": {
+            column: list(functions) for column, functions in aggregates.items()
+        },
+    }
+
+
+def unregister(table_id: str, name: str = None):
+    if name is None:
+        rollups.pop(table_id, None)
+    else:
+        rollups.get(table_id, {}).pop(name, None)
+
+
+def has_rollup(table_id: str, name: str) -> bool:
+    return name in rollups.get(table_id, {})
+
+
+def validate(DynamicModel, name: str, group_by: List[str], aggregates: Dict):
+    """
+    Checks that a rollup can be maintained on the table of a dynamic model.
+
+    Raises:
+        ValueError: If the name is invalid, no or unknown columns are grouped by, or the
+                    aggregates do not apply known functions to numeric columns.
+    """
+    fields = {field.name: field for field in DynamicModel._meta.concrete_fields}
+    numeric = {
+        name
+        for name, field in fields.items()
+        if field.get_internal_type() in NUMERIC_FIELDS
+    }
+
+    if not ROLLUP_NAME.match(name):
+        raise ValueError(
+            "Rollup name must start with a letter and have at most 12 lowercase "
+            "letters, digits or underscores"
+        )
+
+    if not group_by:
+        raise ValueError("Rollup must group by at least one column")
+
+    for column in group_by:
+        if column not in fields or column in {"count", DynamicModel._meta.pk.name}:
+            raise ValueError(f"Cannot group by column '{column}'")
+
+    if not aggregates:
+        raise ValueError("Rollup must aggregate at least one column")
+
+    for column, functions in aggregates.items():
+        if column not in numeric:
+            raise ValueError(f"Column '{column}' is not a numeric column")
+
+        for function in functions:
+            if function not in ROLLUP_FUNCTIONS:
+                raise ValueError(f"Unsupported aggregate function '{function}'")
+
+
+def _truncate(connection, name: str) -> str:
+    return truncate_name(name, connection.ops.max_name_length())
+
+
+def _rollup_table(DynamicModel, name: str, connection) -> str:
+    return _truncate(connection, f"{DynamicModel._meta.db_table}_rollup_{name}")
+
+
+def _aggregate_sql(quote_name, rollup, source: str) -> str:
+    columns = ['count(*) AS "count"']
+    for column, functions in rollup["aggregates"].items():
+        for function in functions:
+            value = quote_name(column) + ("::numeric" if function == "sum" else "")
+            alias = quote_name(f"{column}__{function}")
+            columns.append(f"{function}({value}) AS {alias}")
+
+    group_by = ", ".join(quote_name(column) for column in rollup["group_by"])
+    return f"SELECT {group_by}, {', '.join(columns)} FROM {source} GROUP BY {group_by}"
+
+
+def create_rollup(schema_editor, table_id: str, DynamicModel, name: str):
+    """
+    Creates the side table of a rollup, fills it and installs the triggers maintaining it.
+
+    The side table holds one row per group with the number of rows in the group and the
+    aggregates of the rollup. Statement-level triggers on the table fold the rows each
+    INSERT, UPDATE or DELETE statement changed, available as transition tables, into the
+    groups they belong to, so every write path keeps the rollup up to date at a cost
+    proportional to the changed rows. Sums and counts are adjusted in place; a 'min' or
+    'max' is recomputed from the table, through an index on the grouped columns, only
+    when a statement removes the group's current extreme. Groups left empty are dropped.
+
+    The table is locked against writes while the side table is filled, so no write is
+    counted twice or missed.
+
+    Args:
+        schema_editor (BaseDatabaseSchemaEditor): The schema editor to run the DDL with.
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+        name (str): The name of a rollup registered for the table.
+    """
+    rollup = rollups[table_id][name]
+    connection = schema_editor.connection
+    quote_name = schema_editor.quote_name
+
+    db_table = quote_name(DynamicModel._meta.db_table)
+    side_table = _rollup_table(DynamicModel, name, connection)
+    side = quote_name(side_table)
+    group_by = [quote_name(column) for column in rollup["group_by"]]
+    matches = " AND ".join(f"s.{column} = d.{column}" for column in group_by)
+
+    definitions = [
+        f"{quote_name(column)} {DynamicModel._meta.get_field(column).db_type(connection)} NOT NULL"
+        for column in rollup["group_by"]
+    ]
+    definitions.append('"count" bigint NOT NULL')
+
+    additive, extremes = [], []
+    for column, functions in rollup["aggregates"].items():
+        db_type = DynamicModel._meta.get_field(column).db_type(connection)
+        for function in functions:
+            aggregate = quote_name(f"{column}__{function}")
+
+            if function in ("sum", "count"):
+                aggregate_type = "numeric" if function == "sum" else "bigint"
+                additive.append(aggregate)
+            else:
+                aggregate_type = db_type
+                extremes.append((aggregate, function, quote_name(column)))
+
+            definitions.append(f"{aggregate} {aggregate_type}")
+
+    schema_editor.execute(f"CREATE TABLE {side} ({', '.join(definitions)})")
+    schema_editor.execute(
+        f"CREATE UNIQUE INDEX {quote_name(_truncate(connection, f'{side_table}_key'))} "
+        f"ON {side} ({', '.join(group_by)})"
+    )
+    if extremes:
+        schema_editor.execute(
+            f"CREATE INDEX {quote_name(_truncate(connection, f'{side_table}_idx'))} "
+            f"ON {db_table} ({', '.join(group_by)})"
+        )
+
+    subtract = ", ".join(
+        f"{column} = s.{column} - d.{column}" for column in ['"count"'] + additive
+    )
+    add = ", ".join(
+        [
+            f"{column} = s.{column} + EXCLUDED.{column}"
+            for column in ['"count"'] + additive
+        ]
+        + [
+            f"{aggregate} = {'LEAST' if function == 'min' else 'GREATEST'}"
+            f"(s.{aggregate}, EXCLUDED.{aggregate})"
+            for aggregate, function, _ in extremes
+        ]
+    )
+
+    recompute = ""
+    if extremes:
+        removed = " OR ".join(
+            f"d.{aggregate} {'<=' if function == 'min' else '>='} s.{aggregate}"
+            for aggregate, function, _ in extremes
+        )
+        recomputed = ", ".join(
+            f"{function}(b.{column}) AS {aggregate}"
+            for aggregate, function, column in extremes
+        )
+        joined = " AND ".join(f"b.{column} = k.{column}" for column in group_by)
+        recompute = f"""
+            WITH d AS ({_aggregate_sql(quote_name, rollup, "old_rows")}),
+                 k AS (SELECT {', '.join(f'd.{column}' for column in group_by)}
+                       FROM d JOIN {side} s ON {matches} WHERE {removed}),
+                 m AS (SELECT {', '.join(f'b.{column}' for column in group_by)}, {recomputed}
+                       FROM {db_table} b JOIN k ON {joined}
+                       GROUP BY {', '.join(f'b.{column}' for column in group_by)})
+            UPDATE {side} s SET {', '.join(f'{aggregate} = d.{aggregate}' for aggregate, _, _ in extremes)}
+            FROM m d WHERE {matches};
+        """
+
+    function = quote_name(_truncate(connection, f"{side_table}_fn"))
+    schema_editor.execute(
+        f"""
+        CREATE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE {side} s SET {subtract}
+                FROM ({_aggregate_sql(quote_name, rollup, "old_rows")}) d WHERE {matches};
+                {recompute}
+                DELETE FROM {side} WHERE "count" = 0;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {side} AS s {_aggregate_sql(quote_name, rollup, "new_rows")}
+                ON CONFLICT ({', '.join(group_by)}) DO UPDATE SET {add};
+            END IF;
+            RETURN NULL;
+        END $$
+        """
+    )
+
+    transitions = {
+        "INSERT": "NEW TABLE AS new_rows",
+        "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+        "DELETE": "OLD TABLE AS old_rows",
+    }
+    for event, referencing in transitions.items():
+        schema_editor.execute(
+            f"CREATE TRIGGER {quote_name(f'rollup_{name}_{event.lower()}')} "
+            f"AFTER {event} ON {db_table} REFERENCING {referencing} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        )
+
+    schema_editor.execute(f"LOCK TABLE {db_table} IN SHARE MODE")
+    schema_editor.execute(
+        f"INSERT INTO {side} {_aggregate_sql(quote_name, rollup, db_table)}"
+    )
+
+
+def create_rollups(schema_editor, table_id: str, DynamicModel):
+    """
+    Creates all rollups registered for a table, see `create_rollup`.
+    """
+    for name in rollups.get(table_id, {}):
+        create_rollup(schema_editor, table_id, DynamicModel, name)
+
+
+def drop_rollups(schema_editor, table_id: str, DynamicModel):
+    """
+    Drops the side tables and trigger functions of all rollups of a table.
+
+    The triggers themselves go away with the table, so this is called whenever the
+    table is dropped.
+    """
+    connection = schema_editor.connection
+    quote_name = schema_editor.quote_name
+
+    for name in rollups.get(table_id, {}):
+        side_table = _rollup_table(DynamicModel, name, connection)
+        function = _truncate(connection, f"{side_table}_fn")
+
+        schema_editor.execute(f"DROP TABLE IF EXISTS {quote_name(side_table)}")
+        schema_editor.execute(
+            f"DROP FUNCTION IF EXISTS {quote_name(function)}() CASCADE"
+        )
+
+
+def read_rollup(table_id: str, DynamicModel, name: str) -> List[Dict[str, Any]]:
+    """
+    Reads the groups of a rollup.
+
+    Only the side table is read, so the cost depends on the number of groups and not on
+    the number of rows in the table.
+
+    Args:
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+        name (str): The name of a rollup registered for the table.
+
+    Returns:
+        List[Dict[str, Any]]: A dictionary per group with the grouped columns, the
+                              number of rows as 'count' and '<column>__<function>'
+                              aggregates, ordered by the grouped columns.
+
+    Example:
+        read_rollup("Person", DynamicModel, "by_city")
+        # [{"city": "Warsaw", "count": 2, "age__sum": Decimal("61"), "age__max": 31}]
+    """
+    rollup = rollups[table_id][name]
+    connection = connections[router.db_for_read(DynamicModel)]
+    quote_name = connection.ops.quote_name
+
+    side = quote_name(_rollup_table(DynamicModel, name, connection))
+    order_by = ", ".join(quote_name(column) for column in rollup["group_by"])
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT * FROM {side} ORDER BY {order_by}")
+        columns = [column.name for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
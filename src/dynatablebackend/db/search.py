@@ -0,0 +1,110 @@
+"""Full-text search over string columns of dynamic tables."""
+
+from typing import Dict, List
+
+from django.db import connections
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from dynatable.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Text search configuration, 'simple' does not stem so it suits any language
+SEARCH_CONFIG = "simple"
+
+# Name of the generated tsvector column maintained in searchable tables
+SEARCH_COLUMN = "_search"
+
+# Global dictionary of searchable tables and their searched string columns
+searchable_tables: Dict[str, List[str]] = {}
+
+
+def register(table_id: str, columns: List[str]):
+    """
+    Marks a table as searchable over the given string columns.
+
+    Args:
+        table_id (str): The identifier of the table.
+        columns (List[str]): The names of the string columns to search.
+    """
+    searchable_tables[table_id] = list(columns)
+
+
+def unregister(table_id: str):
+    searchable_tables.pop(table_id, None)
+
+
+def is_searchable(table_id: str) -> bool:
+    return table_id in searchable_tables
+
+
+def create_search_index(schema_editor, table_id: str, DynamicModel):
+    """
+    Adds the full-text search column and its GIN index to a searchable table.
+
+    The column is a stored generated `tsvector` over the searched columns, so Postgres
+    keeps it up to date on every insert and update without any work from the
+    application. The column is not a field of the dynamic model, so it never shows
+    up in the rows returned by the API. Tables that are not searchable are left as-is.
+
+    Args:
+        schema_editor (BaseDatabaseSchemaEditor): The schema editor to run the DDL with.
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+    """
+    if not is_searchable(table_id):
+        return
+
+    quote_name = schema_editor.quote_name
+    db_table = DynamicModel._meta.db_table
+    document = " || ' ' || ".join(
+        f"coalesce({quote_name(DynamicModel._meta.get_field(name).column)}, '')"
+        for name in searchable_tables[table_id]
+    )
+
+    schema_editor.execute(
+        f"ALTER TABLE {quote_name(db_table)} ADD COLUMN {quote_name(SEARCH_COLUMN)} "
+        f"tsvector GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', {document})) STORED"
+    )
+    schema_editor.execute(
+        f"CREATE INDEX {quote_name(f'{db_table}_search_idx')} "
+        f"ON {quote_name(db_table)} USING GIN ({quote_name(SEARCH_COLUMN)})"
+    )
+
+
+def search(table_id: str, queryset, query: str):
+    """
+    Narrows a queryset of a searchable table down to the rows matching a text query.
+
+    The query uses web search syntax (`websearch_to_tsquery`): words, "quoted phrases",
+    'or' and '-excluded' words. Matching rows are ordered by `ts_rank`, best first,
+    and the lookup is served by the GIN index.
+
+    Args:
+        table_id (str): The identifier of the table.
+        queryset (QuerySet): The queryset of the table's dynamic model.
+        query (str): The text query.
+
+    Returns:
+        QuerySet: The matching rows, ordered by relevance.
+
+    Raises:
+        ValueError: If the table is not searchable.
+
+    Example:
+        rows = search("Person", DynamicModel.objects.all(), "anna -nowak")
+        # Returns people whose searched columns contain 'anna' but not 'nowak'.
+    """
+    if not is_searchable(table_id):
+        raise ValueError(f"Table '{table_id}' is not searchable")
+
+    db_table = queryset.model._meta.db_table
+    quote_name = connections[queryset.db].ops.quote_name
+    column = f"{quote_name(db_table)}.{quote_name(SEARCH_COLUMN)}"
+    tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+
+    matches = RawSQL(f"{column} @@ {tsquery}", [query], output_field=BooleanField())
+
+    return queryset.filter(matches).order_by(
+        RawSQL(f"ts_rank({column}, {tsquery})", [query]).desc(), "id"
+    )
@@ -0,0 +1,148 @@
+"""Placement of dynamic tables on sharded databases."""
+
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from dynatable.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Table in the 'default' database recording the shard of every table
+SHARD_MAP_TABLE = "dynatable_shard_map"
+
+# Prefix of the names of the tables of dynamic models, '<app label>_'
+TABLE_PREFIX = "dynatablebackend_"
+
+# Global dictionary of looked up shards and the time their lookup expires at
+shard_map: Dict[str, Tuple[str, float]] = {}
+
+
+def hash_shard(table_id: str) -> str:
+    """
+    Returns the shard a new table is placed on by the hash of its table_id.
+
+    CRC32 is used rather than `hash()`, which is randomized per process, so every
+    worker places a table on the same shard. The hash depends on the number of shards,
+    so it only places tables; where a table is afterwards is told by the shard map.
+
+    Args:
+        table_id (str): The identifier of the table.
+
+    Returns:
+        str: The database alias of the shard, one of `settings.DATABASE_SHARDS`.
+    """
+    shards = settings.DATABASE_SHARDS
+    return shards[zlib.crc32(table_id.encode("utf-8")) % len(shards)]
+
+
+def get_shard(table_id: str) -> str:
+    """
+    Returns the database alias of the shard owning the specified table.
+
+    The shard map in the 'default' database records the shard of every table when it
+    is created or moved, so tables stay where they are when shards are added. Tables
+    missing from the map, created before it recorded every table, are looked for on
+    each shard and recorded once found. Lookups are cached for
+    `settings.DYNATABLE_SHARD_MAP_TTL` seconds, and with a single database no lookup is
+    made at all.
+
+    Args:
+        table_id (str): The identifier of the table.
+
+    Returns:
+        str: The database alias of the shard, one of `settings.DATABASE_SHARDS`.
+
+    Example:
+        DynamicModel.objects.using(get_shard("Person")).count()
+    """
+    shards = settings.DATABASE_SHARDS
+    if len(shards) == 1:
+        return shards[0]
+
+    cached = shard_map.get(table_id)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+
+    shard = _read_shard_map(table_id)
+    if shard is None:
+        shard = _find_shard(table_id)
+
+        if shard is None:
+            # Not created yet or dropped, a table is only looked up on the first shard
+            shard = shards[0]
+        else:
+            set_shard(table_id, shard)
+
+    shard_map[table_id] = (shard, time.monotonic() + settings.DYNATABLE_SHARD_MAP_TTL)
+
+    return shard
+
+
+def _find_shard(table_id: str) -> Optional[str]:
+    for shard in settings.DATABASE_SHARDS:
+        with connections[shard].cursor() as cursor:
+            cursor.execute(
+                "SELECT to_regclass(%s)", [f"{TABLE_PREFIX}{table_id.lower()}"]
+            )
+            if cursor.fetchone()[0] is not None:
+                return shard
+
+    return None
+
+
+def _read_shard_map(table_id: str) -> Optional[str]:
+    with connections["default"].cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [SHARD_MAP_TABLE])
+        if cursor.fetchone()[0] is None:
+            return None
+
+        cursor.execute(
+            f"SELECT shard FROM {SHARD_MAP_TABLE} WHERE table_id = %s", [table_id]
+        )
+        row = cursor.fetchone()
+
+    return row[0] if row else None
+
+
+def set_shard(table_id: str, shard: str):
+    """
+    Records in the shard map that the specified table is owned by the given shard.
+
+    Args:
+        table_id (str): The identifier of the table.
+        shard (str): The database alias of the shard now owning the table.
+    """
+    logger.info(f"Assigning table '{table_id}' to shard '{shard}'")
+
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {SHARD_MAP_TABLE} "
+            "(table_id varchar PRIMARY KEY, shard varchar NOT NULL)"
+        )
+        cursor.execute(
+            f"INSERT INTO {SHARD_MAP_TABLE} (table_id, shard) VALUES (%s, %s) "
+            "ON CONFLICT (table_id) DO UPDATE SET shard = EXCLUDED.shard",
+            [table_id, shard],
+        )
+
+    shard_map[table_id] = (shard, time.monotonic() + settings.DYNATABLE_SHARD_MAP_TTL)
+
+
+def unset_shard(table_id: str):
+    """
+    Removes the specified table from the shard map, for a table that does not exist.
+
+    Args:
+        table_id (str): The identifier of the table.
+    """
+    shard_map.pop(table_id, None)
+
+    with connections["default"].cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [SHARD_MAP_TABLE])
+        if cursor.fetchone()[0] is None:
+            return
+
+        cursor.execute(f"DELETE FROM {SHARD_MAP_TABLE} WHERE table_id = %s", [table_id])
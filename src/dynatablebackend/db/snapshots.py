@@ -0,0 +1,113 @@
+"""Read-only point-in-time snapshots of dynamic tables."""
+
+from typing import Any, Dict, List
+
+from django.db import connections
+from dynatable.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Table in the 'default' database recording the snapshots taken of the tables
+SNAPSHOTS_TABLE = "dynatable_snapshots"
+
+# Trigger function rejecting any change to the rows of a snapshot
+READ_ONLY_FUNCTION = "dynatable_read_only"
+
+
+def protect(cursor, DynamicModel):
+    """
+    Makes the rows of a snapshot table read-only.
+
+    A statement trigger rejects every INSERT, UPDATE and DELETE of the table, so a
+    snapshot keeps the rows it was taken with whichever path writes to it.
+
+    Args:
+        cursor: A cursor of the database holding the table.
+        DynamicModel (class): The dynamic model of the snapshot table.
+    """
+    quote_name = cursor.db.ops.quote_name
+    db_table = DynamicModel._meta.db_table
+
+    cursor.execute(
+        f"CREATE OR REPLACE FUNCTION {READ_ONLY_FUNCTION}() RETURNS trigger "
+        "LANGUAGE plpgsql AS $$ BEGIN "
+        "RAISE EXCEPTION 'Table \"%%\" is a read-only snapshot', TG_TABLE_NAME; "
+        "END $$",
+        [],
+    )
+    cursor.execute(
+        f"CREATE TRIGGER {quote_name(f'{db_table}_read_only')} "
+        f"BEFORE INSERT OR UPDATE OR DELETE ON {quote_name(db_table)} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION {READ_ONLY_FUNCTION}()"
+    )
+
+
+def _table_exists(cursor) -> bool:
+    cursor.execute("SELECT to_regclass(%s)", [SNAPSHOTS_TABLE])
+    return cursor.fetchone()[0] is not None
+
+
+def record(table_id: str, source_id: str, taken_at, rows: int):
+    """
+    Records that a table is a snapshot of another.
+
+    Args:
+        table_id (str): The identifier of the snapshot table.
+        source_id (str): The identifier of the table the snapshot was taken of.
+        taken_at (datetime): The time the rows of the snapshot were read at.
+        rows (int): The number of rows of the snapshot.
+    """
+    logger.info(f"Recording table '{table_id}' as a snapshot of '{source_id}'")
+
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {SNAPSHOTS_TABLE} ("
+            "table_id varchar PRIMARY KEY, source_id varchar NOT NULL, "
+            "taken_at timestamptz NOT NULL, rows bigint NOT NULL)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {SNAPSHOTS_TABLE}_source "
+            f"ON {SNAPSHOTS_TABLE} (source_id, taken_at)"
+        )
+        cursor.execute(
+            f"INSERT INTO {SNAPSHOTS_TABLE} (table_id, source_id, taken_at, rows) "
+            "VALUES (%s, %s, %s, %s)",
+            [table_id, source_id, taken_at, rows],
+        )
+
+
+def is_snapshot(table_id: str) -> bool:
+    with connections["default"].cursor() as cursor:
+        if not _table_exists(cursor):
+            return False
+
+        cursor.execute(
+            f"SELECT 1 FROM {SNAPSHOTS_TABLE} WHERE table_id = %s", [table_id]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_snapshots(source_id: str) -> List[Dict[str, Any]]:
+    """
+    Lists the snapshots taken of a table, oldest first.
+
+    Args:
+        source_id (str): The identifier of the table.
+
+    Returns:
+        List[Dict[str, Any]]: The 'table_id', 'taken_at' time and number of 'rows' of
+                              each snapshot.
+    """
+    with connections["default"].cursor() as cursor:
+        if not _table_exists(cursor):
+            return []
+
+        cursor.execute(
+            f"SELECT table_id, taken_at, rows FROM {SNAPSHOTS_TABLE} "
+            "WHERE source_id = %s ORDER BY taken_at, table_id",
+            [source_id],
+        )
+        return [
+            {"table_id": table_id, "taken_at": taken_at, "rows": rows}
+            for table_id, taken_at, rows in cursor.fetchall()
+        ]
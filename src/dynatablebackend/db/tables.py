@@ -1,23 +1,200 @@
-from typing import Any, Dict, List, Optional
+import json
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 import shortuuid
-from django.db import connection
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
 from django.db.utils import Error as DjangoError
 from dynatable.logger import get_logger
 
+from dynatablebackend.db import (
+    feeds,
+    filters,
+    group_commit,
+    ordering,
+    partitions,
+    rollups,
+    search,
+    shards,
+    snapshots,
+)
 from dynatablebackend.db.util import (
+    APP_LABEL,
+    NUMERIC_TYPES,
+    TEXT_TYPES,
     create_dynamic_model,
+    dynamic_models,
+    field_names,
     get_combined_fields,
     get_dynamic_model,
+    get_references,
+    get_unique_keys,
     obj_to_dict,
+    to_columns,
     to_model_types,
+    to_record,
+    unregister_dynamic_model,
 )
 
 logger = get_logger(__name__)
 
 
+def _table_exists(table_id: str) -> bool:
+    # Looked up in the catalog, models of dropped tables may still be resident
+    with connections[shards.get_shard(table_id)].cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [f"{APP_LABEL}_{table_id.lower()}"])
+        return cursor.fetchone()[0] is not None
+
+
+def _get_search_columns(columns: List[Dict[str, str]]) -> List[str]:
+    """
+    Returns the names of the columns marked for full-text search.
+
+    Raises:
+        ValueError: If a column other than a text column is marked for search.
+    """
+    search_columns = [column for column in columns if column.get("search")]
+
+    for column in search_columns:
+        if column["type"] not in TEXT_TYPES:
+            raise ValueError(f"Column '{column['name']}' is not a text column")
+
+    return [column["name"] for column in search_columns]
+
+
+def _get_reference_shard(table_id: str, columns: List[Dict[str, str]]) -> Optional[str]:
+    """
+    Returns the shard of the tables referenced by the reference columns, if any.
+
+    Raises:
+        ValueError: If a referenced table does not exist, is the table itself or references
+                    it, or if the referenced tables are on different shards.
+    """
+    shard = None
+
+    for column in columns:
+        if column["type"] != "reference":
+            continue
+
+        target = column["table"]
+        if target == table_id:
+            raise ValueError(f"Column '{column['name']}' references its own table")
+
+        TargetModel = get_dynamic_model(target)
+        if TargetModel is None:
+            raise ValueError(
+                f"Column '{column['name']}' references unknown table '{target}'"
+            )
+
+        # Referenced models are rebuilt along with the model, so they cannot form a cycle
+        pending, seen = [TargetModel], {target}
+        while pending:
+            for referenced in get_references(pending.pop()).values():
+                if referenced == table_id:
+                    raise ValueError(f"Table '{target}' references table '{table_id}'")
+                if referenced not in seen:
+                    seen.add(referenced)
+                    pending.append(get_dynamic_model(referenced))
+
+        target_shard = shards.get_shard(target)
+        if shard not in (None, target_shard):
+            raise ValueError("Referenced tables must be on the same shard")
+        shard = target_shard
+
+    return shard
+
+
+def _create_references(schema_editor, DynamicModel):
+    """
+    Creates the foreign key constraints of the reference columns of a dynamic model.
+
+    Django would create them deferred to the end of the transaction, these are checked by
+    every statement, so a row referencing a missing row fails on its own.
+    """
+    quote_name = schema_editor.quote_name
+    db_table = DynamicModel._meta.db_table
+
+    for field in DynamicModel._meta.concrete_fields:
+        if not field.is_relation:
+            continue
+
+        name = schema_editor._create_index_name(db_table, [field.column], suffix="_fk")
+        schema_editor.execute(
+            f"ALTER TABLE {quote_name(db_table)} ADD CONSTRAINT {quote_name(name)} "
+            f"FOREIGN KEY ({quote_name(field.column)}) REFERENCES "
+            f"{quote_name(field.related_model._meta.db_table)} "
+            f"({quote_name(field.target_field.column)})"
+        )
+
+
+def _referencing_constraints(schema_editor, DynamicModel) -> List[str]:
+    """
+    Returns the statements creating the foreign keys of the tables referencing a table.
+
+    Dropping the table drops these constraints along, so a table recreated by a schema
+    update creates them again.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) "
+            "FROM pg_constraint WHERE contype = 'f' AND confrelid = %s::regclass",
+            [DynamicModel._meta.db_table],
+        )
+        constraints = cursor.fetchall()
+
+    return [
+        f"ALTER TABLE {table} ADD CONSTRAINT {schema_editor.quote_name(name)} {definition}"
+        for table, name, definition in constraints
+    ]
+
+
+def _save_table_options(schema_editor, table_id: str, DynamicModel):
+    """
+    Keeps the partitioning, search, rollup, change feed and reference options of a table in its comment.
+
+    The registries of `partitions`, `search`, `rollups` and `feeds` live in the memory of each worker, so
+    the options are also stored with the table, where `get_dynamic_model` finds them
+    when it rebuilds the model in another worker or after a restart.
+    """
+    options = {}
+
+    if partitions.is_partitioned(table_id):
+        partitioning = partitions.partitioned_tables[table_id]
+        options["partition"] = {
+            "key": partitioning["key"],
+            "size": partitioning["size"],
+        }
+
+    if search.is_searchable(table_id):
+        options["search"] = search.searchable_tables[table_id]
+
+    if rollups.rollups.get(table_id):
+        options["rollups"] = rollups.rollups[table_id]
+
+    if feeds.has_feed(table_id):
+        options["feed"] = True
+
+    # Tables are named after the lowercased table_id, the referenced ones are kept here
+    references = get_references(DynamicModel)
+    if references:
+        options["references"] = references
+
+    if options:
+        schema_editor.execute(
+            f"COMMENT ON TABLE {schema_editor.quote_name(DynamicModel._meta.db_table)} "
+            "IS %s",
+            [json.dumps(options)],
+        )
+
+
 def create_table(
-    columns: List[Dict[str, str]], table_id: Optional[str] = None
+    columns: List[Dict[str, str]],
+    table_id: Optional[str] = None,
+    partition_size: Optional[int] = None,
+    partition_key: str = "id",
+    shard: Optional[str] = None,
 ) -> Optional[str]:
     """
     Creates a new table in the database with the specified columns and a table identifier.
@@ -25,7 +202,18 @@ def create_table(
     This function converts the provided column definitions to Django model field types and
     dynamically creates a new Django model with these fields. It then creates a corresponding
     table in the database using Django's schema editor. A unique table identifier is generated
-    if not provided.
+    if not provided. With several databases configured, the table is created on the shard
+    its identifier hashes to, or on the given 'shard', and the shard map records it, see
+    `shards.get_shard`.
+
+    When 'partition_size' is given, the table is created as a range partitioned table on
+    'partition_key', with each partition covering 'partition_size' consecutive key values.
+    New partitions are created automatically as inserts cross partition boundaries, and
+    queries filtering on the key benefit from partition pruning.
+
+    'reference' columns hold the id of a row of the table named by their 'table' option,
+    checked by an indexed foreign key, so the table is created on the shard of the
+    tables it references.
 
     Args:
         columns (List[Dict[str, str]]): A list of dictionaries representing the columns to be created,
@@ -33,6 +221,11 @@ def create_table(
                                         (field data type).
         table_id (Optional[str]): An optional unique identifier for the table. Defaults to None,
                                   in which case a random UUID is generated.
+        partition_size (Optional[int]): An optional width of the key range of each partition.
+                                        Defaults to None, in which case the table is not partitioned.
+        partition_key (str): The column to partition on, 'id' or a numeric column. Defaults to 'id'.
+        shard (Optional[str]): An optional database alias of the shard to create the table on.
+                               Defaults to None, in which case the table is placed by hash.
 
     Returns:
         Optional[str]: The table identifier of the newly created table. Returns None if table creation fails.
@@ -45,17 +238,60 @@ def create_table(
     if table_id is None:
         logger.info("Generating a new table ID.")
         table_id = shortuuid.uuid()
+    elif _table_exists(table_id):
+        logger.error(f"Cannot create table '{table_id}', it already exists.")
+        return None
 
     logger.info(f"Creating new table '{table_id}' with {len(columns)} columns.")
 
+    if partition_size is not None:
+        key_types = {column["name"]: column["type"] for column in columns}
+        if partition_key != "id" and key_types.get(partition_key) not in NUMERIC_TYPES:
+            logger.error(
+                f"Cannot partition table '{table_id}' on '{partition_key}', "
+                "it is neither 'id' nor a numeric column."
+            )
+            return None
+
+    try:
+        search_columns = _get_search_columns(columns)
+        reference_shard = _get_reference_shard(table_id, columns)
+    except ValueError as err:
+        logger.error(f"Cannot create table '{table_id}': {err}")
+        return None
+
+    shard = shard or reference_shard or shards.hash_shard(table_id)
+    if reference_shard not in (None, shard):
+        logger.error(
+            f"Cannot create table '{table_id}' on shard '{shard}', "
+            f"the tables it references are on shard '{reference_shard}'"
+        )
+        return None
+
+    if partition_size is not None:
+        partitions.register(table_id, partition_key, partition_size)
+
+    if search_columns:
+        search.register(table_id, search_columns)
+
+    shards.set_shard(table_id, shard)
+
     model_types = to_model_types(columns)
-    DynamicModel = create_dynamic_model(table_id, model_types)
+    unique_keys = [column["name"] for column in columns if column.get("key")]
+    DynamicModel = create_dynamic_model(table_id, model_types, unique_keys)
 
     try:
-        with connection.schema_editor() as schema_editor:
-            schema_editor.create_model(DynamicModel)
+        with connections[shard].schema_editor() as schema_editor:
+            partitions.create_model(schema_editor, table_id, DynamicModel)
+            _create_references(schema_editor, DynamicModel)
+            search.create_search_index(schema_editor, table_id, DynamicModel)
+            _save_table_options(schema_editor, table_id, DynamicModel)
     except DjangoError as err:
         logger.error(f"Error creating table '{table_id}': {err}")
+        unregister_dynamic_model(table_id)
+        partitions.unregister(table_id)
+        search.unregister(table_id)
+        shards.unset_shard(table_id)
         return None
 
     logger.info(f"Table '{table_id}' successfully created.")
@@ -94,17 +330,63 @@ def update_table(table_id: str, columns: List[Dict[str, str]]) -> Optional[str]:
         logger.error(f"Table '{table_id}' does not exist.")
         return None
 
+    if snapshots.is_snapshot(table_id):
+        logger.error(f"Table '{table_id}' is a read-only snapshot.")
+        return None
+
+    try:
+        search_columns = _get_search_columns(columns)
+        if _get_reference_shard(table_id, columns) not in (
+            None,
+            shards.get_shard(table_id),
+        ):
+            raise ValueError("Referenced tables must be on the same shard")
+    except ValueError as err:
+        logger.error(f"Cannot update table '{table_id}': {err}")
+        return None
+
     combined_fields = get_combined_fields(table_id, columns)
 
+    searched = search.searchable_tables.get(table_id, [])
+    if search_columns:
+        search.register(
+            table_id,
+            searched + [name for name in search_columns if name not in searched],
+        )
+
     try:
-        with connection.schema_editor() as schema_editor:
+        with connections[shards.get_shard(table_id)].schema_editor() as schema_editor:
+            rollups.drop_rollups(schema_editor, table_id, DynamicModel)
+            referencing = _referencing_constraints(schema_editor, DynamicModel)
             schema_editor.delete_model(DynamicModel)
 
-            NewDynamicModel = create_dynamic_model(table_id, combined_fields)
-            schema_editor.create_model(NewDynamicModel)
+            unique_keys = [
+                column["name"] for column in columns if column.get("key")
+            ] or get_unique_keys(DynamicModel)
+            NewDynamicModel = create_dynamic_model(
+                table_id, combined_fields, unique_keys
+            )
+            partitions.create_model(schema_editor, table_id, NewDynamicModel)
+            _create_references(schema_editor, NewDynamicModel)
+            for statement in referencing:
+                schema_editor.execute(statement)
+            search.create_search_index(schema_editor, table_id, NewDynamicModel)
 
-    except DjangoError as err:
+            for name, rollup in rollups.rollups.get(table_id, {}).items():
+                rollups.validate(NewDynamicModel, name, **rollup)
+            rollups.create_rollups(schema_editor, table_id, NewDynamicModel)
+            feeds.create_feed(schema_editor, table_id, NewDynamicModel)
+
+            _save_table_options(schema_editor, table_id, NewDynamicModel)
+
+    except (DjangoError, ValueError) as err:
         logger.error(f"Error updating table '{table_id}': {err}")
+        # The DDL was rolled back, the model is rebuilt from the table as it was
+        unregister_dynamic_model(table_id)
+        if searched:
+            search.register(table_id, searched)
+        else:
+            search.unregister(table_id)
         return None
 
     logger.info(
@@ -120,7 +402,9 @@ def add_table_row(table_id: str, row: List[Dict[str, Any]]):
     This function retrieves the dynamic model associated with the given table_id and
     creates a new record for this model using the provided row data. It attempts to save
     the new record to the database. If an exception occurs during the save operation,
-    the function returns False indicating failure.
+    the function returns False indicating failure. With DYNATABLE_GROUP_COMMIT_ROWS set,
+    rows added concurrently are inserted and committed in batches, see
+    `group_commit.add`; the function still returns only once the row is committed.
 
     Args:
         table_id (str): The identifier of the table to which the row will be added.
@@ -140,9 +424,13 @@ def add_table_row(table_id: str, row: List[Dict[str, Any]]):
 
     DynamicModel = get_dynamic_model(table_id)
 
-    new_model_record = DynamicModel(**row)
+    new_model_record = to_record(DynamicModel, row)
+
+    if group_commit.enabled(DynamicModel):
+        return group_commit.add(table_id, DynamicModel, row, new_model_record)
 
     try:
+        partitions.ensure_partitions(table_id, DynamicModel, [row])
         new_model_record.save()
         logger.info(f"New row added to table '{table_id}'")
     except DjangoError as err:
@@ -153,16 +441,434 @@ def add_table_row(table_id: str, row: List[Dict[str, Any]]):
     return True
 
 
-def get_table_rows(table_id: str):
+def get_rows_queryset(
+    table_id: str,
+    query: Optional[str] = None,
+    expand: Optional[List[str]] = None,
+    order_by: Optional[List[str]] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """
+    Builds the queryset selecting the rows of the specified table.
+
+    This is the single place where the read parameters of the rows endpoint are turned
+    into a query, so every read path runs the same SQL. The queryset is bound to the
+    database chosen by the database routers when it is built, a read replica if any.
+
+    Args:
+        table_id (str): The identifier of the table.
+        query (Optional[str]): An optional full-text search query. Defaults to None, in which
+                               case all rows are selected. Matching rows are ordered by relevance.
+        expand (Optional[List[str]]): Reference columns whose referenced rows are fetched
+                                      along, joined in the same query. Defaults to None.
+        order_by (Optional[List[str]]): Columns to sort the rows by, '-' prefixed for a
+                                        descending order, see `ordering.paginate`.
+        after (Optional[str]): A cursor of the row the selected rows follow in the sort order.
+        limit (Optional[int]): The maximum number of rows to select.
+
+    Returns:
+        QuerySet: The queryset of the table's dynamic model. Given any of 'order_by',
+                  'after' or 'limit', the rows are sorted, by 'id' unless 'order_by' says
+                  otherwise, instead of by relevance for a search.
+
+    Raises:
+        ValueError: If a query is given for a table that is not searchable, a column to
+                    expand is not a reference column of the table, a column to sort by is
+                    not sortable or the cursor is invalid.
+    """
+    DynamicModel = get_dynamic_model(table_id)
+
+    queryset = DynamicModel.objects.using(router.db_for_read(DynamicModel))
+    if query is not None:
+        queryset = search.search(table_id, queryset, query)
+
+    if expand:
+        references = get_references(DynamicModel)
+        for name in expand:
+            if name not in references:
+                raise ValueError(f"Column '{name}' is not a reference column")
+
+        queryset = queryset.select_related(*expand)
+
+    if order_by or after is not None or limit is not None:
+        queryset = ordering.paginate(queryset, order_by, after)
+
+    if limit is not None:
+        queryset = queryset[:limit]
+
+    return queryset
+
+
+# Modes of counting rows
+COUNT_MODES = ["exact", "estimate", "auto"]
+
+
+def _estimate_count(queryset) -> int:
+    """
+    Estimates the number of rows selected by a queryset without scanning the table.
+
+    Unfiltered querysets are estimated from `pg_class.reltuples` of the table, or of its
+    partitions for partitioned tables, as maintained by VACUUM and ANALYZE. If the table
+    was never analyzed, or the queryset is filtered, the row estimate of the planner
+    for the query is used instead.
+    """
+    db_table = queryset.model._meta.db_table
+
+    if not queryset.query.where:
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT SUM(reltuples), bool_and(reltuples >= 0)
+                FROM pg_class
+                WHERE relkind = 'r'
+                  AND (oid = %s::regclass
+                       OR oid IN (SELECT inhrelid FROM pg_inherits
+                                  WHERE inhparent = %s::regclass))
+                """,
+                [db_table, db_table],
+            )
+            reltuples, analyzed = cursor.fetchone()
+
+        if analyzed:
+            return int(reltuples)
+
+    plan = json.loads(queryset.explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_table_rows(
+    table_id: str, mode: str = "auto", query: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Counts the rows of the specified table, exactly or from planner statistics.
+
+    An exact count runs `COUNT(*)`, which scans the whole table. An estimate reads the
+    statistics Postgres keeps for the planner and costs the same for any table size.
+    The 'auto' mode estimates first and only counts exactly when the estimate is below
+    `settings.DYNATABLE_COUNT_ESTIMATE_THRESHOLD`, where a scan is cheap.
+
+    Args:
+        table_id (str): The identifier of the table to count the rows of.
+        mode (str): One of COUNT_MODES, 'exact', 'estimate' or 'auto'. Defaults to 'auto'.
+        query (Optional[str]): An optional full-text search query restricting the rows.
+
+    Returns:
+        Dict[str, Any]: The 'count' of rows and whether it is 'exact'.
+
+    Raises:
+        ValueError: If the mode is not one of COUNT_MODES.
+
+    Example:
+        count_table_rows("Person", mode="estimate")
+        # Returns e.g. {"count": 10250000, "exact": False} without scanning the table.
+    """
+    if mode not in COUNT_MODES:
+        raise ValueError(f"Count mode must be one of: {', '.join(COUNT_MODES)}")
+
+    logger.info(f"Counting rows of table '{table_id}' in '{mode}' mode")
+
+    queryset = get_rows_queryset(table_id, query)
+
+    if mode != "exact":
+        estimate = _estimate_count(queryset)
+
+        if (
+            mode == "estimate"
+            or estimate >= settings.DYNATABLE_COUNT_ESTIMATE_THRESHOLD
+        ):
+            return {"count": estimate, "exact": False}
+
+    return {"count": queryset.count(), "exact": True}
+
+
+def explain_table_rows(
+    table_id: str,
+    query: Optional[str] = None,
+    analyze: bool = True,
+    expand: Optional[List[str]] = None,
+    order_by: Optional[List[str]] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Explains how Postgres runs the query of the rows of the specified table.
+
+    The query is the one the rows endpoint runs for the same parameters, built by
+    `get_rows_queryset` and sent to the same database. With 'analyze', the query is
+    run to report actual timings, row counts and buffer usage next to the estimates,
+    as with `EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`.
+
+    Args:
+        table_id (str): The identifier of the table.
+        query (Optional[str]): An optional full-text search query. Defaults to None.
+        analyze (bool): Whether to run the query. Defaults to True.
+        expand (Optional[List[str]]): Reference columns to join. Defaults to None.
+        order_by (Optional[List[str]]): Columns to sort the rows by. Defaults to None.
+        after (Optional[str]): A cursor of the row to start after. Defaults to None.
+        limit (Optional[int]): The maximum number of rows. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: The 'database' the query runs on, its 'sql' and the 'plan'.
+
+    Raises:
+        ValueError: If the parameters are invalid, as for `get_rows_queryset`.
+
+    Example:
+        explain_table_rows("Person", "matt")
+        # {"database": "default", "sql": "SELECT ...", "plan": [{"Plan": {"Node Type":
+        #  "Sort", ...}, "Planning Time": 0.1, "Execution Time": 2.4}]}
+    """
+    logger.info(f"Explaining rows query of table '{table_id}'")
+
+    queryset = get_rows_queryset(table_id, query, expand, order_by, after, limit)
+    options = {"analyze": True, "buffers": True} if analyze else {}
+
+    return {
+        "database": queryset.db,
+        "sql": str(queryset.query),
+        "plan": json.loads(queryset.explain(format="json", **options)),
+    }
+
+
+# Statistics the tables can be ordered by in `list_table_stats`
+TABLE_STATS_ORDERINGS = [
+    "total_bytes",
+    "heap_bytes",
+    "index_bytes",
+    "toast_bytes",
+    "rows",
+    "seq_scan",
+    "idx_scan",
+    "n_dead_tup",
+    "dead_ratio",
+]
+
+# Storage and usage of the dynamic tables matching a name pattern, summed over the
+# partitions of partitioned tables. The heap includes its free space and visibility
+# maps, so the heap, index and TOAST sizes add up to the total. The counters of pg_stat_user_tables are kept by
+# each database since its statistics were last reset
+TABLE_STATS_SQL = """
+    WITH tables AS (
+        SELECT c.oid AS table_oid, c.relname AS table_name
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema()
+          AND c.relkind IN ('r', 'p')
+          AND NOT c.relispartition
+          AND c.relname ~ %s
+    ), relations AS (
+        SELECT table_oid, table_name, table_oid AS oid FROM tables
+        UNION ALL
+        SELECT t.table_oid, t.table_name, i.inhrelid
+        FROM tables t
+        JOIN pg_inherits i ON i.inhparent = t.table_oid
+    )
+    SELECT r.table_name,
+           SUM(CASE WHEN c.reltuples >= 0 THEN c.reltuples
+                    ELSE COALESCE(s.n_live_tup, 0) END)::bigint AS rows,
+           SUM(pg_table_size(c.oid) - toast.bytes)::bigint AS heap_bytes,
+           SUM(pg_indexes_size(c.oid))::bigint AS index_bytes,
+           SUM(toast.bytes)::bigint AS toast_bytes,
+           SUM(pg_total_relation_size(c.oid))::bigint AS total_bytes,
+           COALESCE(SUM(s.seq_scan), 0)::bigint AS seq_scan,
+           COALESCE(SUM(s.seq_tup_read), 0)::bigint AS seq_tup_read,
+           COALESCE(SUM(s.idx_scan), 0)::bigint AS idx_scan,
+           COALESCE(SUM(s.idx_tup_fetch), 0)::bigint AS idx_tup_fetch,
+           COALESCE(SUM(s.n_tup_ins), 0)::bigint AS n_tup_ins,
+           COALESCE(SUM(s.n_tup_upd), 0)::bigint AS n_tup_upd,
+           COALESCE(SUM(s.n_tup_del), 0)::bigint AS n_tup_del,
+           COALESCE(SUM(s.n_live_tup), 0)::bigint AS n_live_tup,
+           COALESCE(SUM(s.n_dead_tup), 0)::bigint AS n_dead_tup,
+           MAX(s.last_vacuum) AS last_vacuum,
+           MAX(s.last_autovacuum) AS last_autovacuum,
+           MAX(s.last_analyze) AS last_analyze,
+           MAX(s.last_autoanalyze) AS last_autoanalyze
+    FROM relations r
+    JOIN pg_class c ON c.oid = r.oid
+    CROSS JOIN LATERAL (
+        SELECT CASE WHEN c.reltoastrelid <> 0
+                    THEN pg_total_relation_size(c.reltoastrelid)
+                    ELSE 0 END AS bytes
+    ) toast
+    LEFT JOIN pg_stat_user_tables s ON s.relid = r.oid
+    GROUP BY r.table_name
+"""
+
+# Usage of the indexes of a table and of its partitions
+INDEX_STATS_SQL = """
+    SELECT s.indexrelname AS name,
+           s.relname AS table_name,
+           pg_relation_size(s.indexrelid) AS bytes,
+           s.idx_scan,
+           s.idx_tup_read,
+           s.idx_tup_fetch
+    FROM pg_stat_user_indexes s
+    WHERE s.relid = %s::regclass
+       OR s.relid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)
+    ORDER BY s.relname, s.indexrelname
+"""
+
+
+def _fetch_dicts(cursor) -> List[Dict[str, Any]]:
+    names = [column.name for column in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def _read_table_stats(shard: str, pattern: str) -> List[Dict[str, Any]]:
+    with connections[shard].cursor() as cursor:
+        # Statistics are read from a snapshot taken once per transaction, drop it
+        cursor.execute("SELECT pg_stat_clear_snapshot()")
+        cursor.execute(TABLE_STATS_SQL, [pattern])
+        stats = _fetch_dicts(cursor)
+
+    for table in stats:
+        tuples = table["n_live_tup"] + table["n_dead_tup"]
+        table["dead_ratio"] = round(table["n_dead_tup"] / tuples, 4) if tuples else 0.0
+
+    return stats
+
+
+def get_table_stats(table_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Reports the storage and usage statistics of the specified table.
+
+    The statistics are read from the Postgres catalog of the table's shard: the planner's
+    row estimate, the sizes of the heap, indexes and TOAST storage from
+    `pg_total_relation_size` and friends, the scan and tuple counters and the last
+    (auto)vacuum and (auto)analyze times of `pg_stat_user_tables`, and the usage of each
+    index from `pg_stat_user_indexes`. Partitioned tables report the sums over their
+    partitions. Statistics are maintained by Postgres in the background, so the counters
+    may lag the latest queries by a moment and the row estimate by the last ANALYZE.
+
+    Args:
+        table_id (str): The identifier of the table.
+
+    Returns:
+        Optional[Dict[str, Any]]: The 'database' and 'table' names, the statistics named
+                                  after the catalog columns they come from, the
+                                  'indexes' and the registered 'columns' of the table,
+                                  or None if the table does not exist.
+
+    Example:
+        get_table_stats("Person")
+        # {"database": "default", "table": "dynatablebackend_person", "rows": 10250000,
+        #  "heap_bytes": 1073741824, ..., "seq_scan": 12, "idx_scan": 5310,
+        #  "n_dead_tup": 1200, "dead_ratio": 0.0001, "last_autovacuum": ..., "indexes":
+        #  [{"name": "dynatablebackend_person_pkey", "bytes": ..., "idx_scan": 5310, ...}],
+        #  "columns": [{"name": "name", "type": "string"}, ...]}
+    """
+    logger.info(f"Reading statistics of table '{table_id}'")
+
+    DynamicModel = get_dynamic_model(table_id)
+    if DynamicModel is None:
+        return None
+
+    shard = shards.get_shard(table_id)
+    db_table = DynamicModel._meta.db_table
+
+    stats = _read_table_stats(shard, f"^{db_table}$")
+    if not stats:
+        return None
+
+    with connections[shard].cursor() as cursor:
+        cursor.execute(INDEX_STATS_SQL, [db_table, db_table])
+        indexes = _fetch_dicts(cursor)
+
+    stats = stats[0]
+    return {
+        "database": shard,
+        "table": stats.pop("table_name"),
+        **stats,
+        "indexes": indexes,
+        "columns": to_columns(DynamicModel),
+    }
+
+
+def list_table_stats(
+    order_by: str = "total_bytes", limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Lists the storage and usage statistics of all dynamic tables on every shard.
+
+    Each shard's catalog is read once for all of its tables, with the statistics of
+    `get_table_stats` but the indexes and columns. Tables are named after the lowercased
+    table_id, which is why only the tables resident in this worker are reported with
+    their 'table_id'; the others have it set to None.
+
+    Args:
+        order_by (str): One of TABLE_STATS_ORDERINGS to order the tables by, largest
+                        first. Defaults to 'total_bytes'.
+        limit (Optional[int]): The number of tables to report. Defaults to None, in which
+                               case all tables are reported.
+
+    Returns:
+        List[Dict[str, Any]]: The statistics of the tables, each with its 'table_id',
+                              'database' and 'table' names.
+
+    Raises:
+        ValueError: If order_by is not one of TABLE_STATS_ORDERINGS.
+
+    Example:
+        list_table_stats(order_by="n_dead_tup", limit=10)
+        # Returns the 10 tables with the most dead tuples, the first vacuum candidates.
+    """
+    if order_by not in TABLE_STATS_ORDERINGS:
+        raise ValueError(
+            f"Tables can only be ordered by: {', '.join(TABLE_STATS_ORDERINGS)}"
+        )
+
+    logger.info(f"Listing statistics of all tables ordered by '{order_by}'")
+
+    resident = {
+        DynamicModel._meta.db_table: table_id
+        for table_id, DynamicModel in list(dynamic_models.items())
+    }
+
+    listing = []
+    for shard in settings.DATABASE_SHARDS:
+        for stats in _read_table_stats(shard, rf"^{APP_LABEL}_[a-z0-9]+$"):
+            table = stats.pop("table_name")
+            listing.append(
+                {
+                    "table_id": resident.get(table),
+                    "database": shard,
+                    "table": table,
+                    **stats,
+                }
+            )
+
+    listing.sort(key=lambda stats: stats[order_by], reverse=True)
+    return listing[:limit]
+
+
+def get_table_rows(
+    table_id: str,
+    query: Optional[str] = None,
+    expand: Optional[List[str]] = None,
+    order_by: Optional[List[str]] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+):
     """
     Retrieves all rows from the specified table in the database.
 
     This function fetches the dynamic model associated with the given table_id and
     queries all records present in the corresponding table. It converts each record
-    into a dictionary format and returns a list of these dictionaries.
+    into a dictionary format and returns a list of these dictionaries. With a full-text
+    search 'query', only the matching rows are returned, best matches first. Reference
+    columns hold the id of the referenced row, or the row itself for the columns to
+    'expand', fetched with a join in the same query. Rows are read a page at a time by
+    sorting them with 'order_by' and passing the cursor of the last row of a page, from
+    `ordering.encode_cursor`, as 'after' for the next one.
 
     Args:
         table_id (str): The identifier of the table from which the rows are to be retrieved.
+        query (Optional[str]): An optional full-text search query. Defaults to None.
+        expand (Optional[List[str]]): Reference columns to expand. Defaults to None.
+        order_by (Optional[List[str]]): Columns to sort the rows by, e.g. ['name', '-age'].
+        after (Optional[str]): A cursor of the row to start after. Defaults to None.
+        limit (Optional[int]): The maximum number of rows. Defaults to None.
 
     Returns:
         list of dict: A list of dictionaries, where each dictionary represents a row from the table.
@@ -178,10 +884,731 @@ def get_table_rows(table_id: str):
     """
     logger.info(f"Fetching rows from table '{table_id}'")
 
+    items = get_rows_queryset(table_id, query, expand, order_by, after, limit)
+
+    logger.info(f"Rows from table '{table_id}' successfully retrieved")
+
+    return list(map(lambda x: obj_to_dict(x, expand or ()), items))
+
+
+def iter_table_rows(
+    table_id: str,
+    chunk_size: int = 2000,
+    query: Optional[str] = None,
+    expand: Optional[List[str]] = None,
+    order_by: Optional[List[str]] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily iterates over all rows of the specified table.
+
+    Unlike `get_table_rows`, this function never materializes the whole table. Rows are
+    fetched from a server-side cursor in chunks of 'chunk_size' and yielded as dictionaries
+    straight from `QuerySet.values()`, skipping model instantiation altogether.
+
+    Args:
+        table_id (str): The identifier of the table from which the rows are to be retrieved.
+        chunk_size (int): The number of rows fetched from the database at once. Defaults to 2000.
+        query (Optional[str]): An optional full-text search query. Defaults to None.
+        expand (Optional[List[str]]): Reference columns to expand, their referenced rows
+                                      are selected with a join. Defaults to None.
+        order_by (Optional[List[str]]): Columns to sort the rows by. Defaults to None.
+        after (Optional[str]): A cursor of the row to start after. Defaults to None.
+        limit (Optional[int]): The maximum number of rows. Defaults to None.
+
+    Returns:
+        Iterator[Dict[str, Any]]: An iterator of a dictionary per row, keyed by the field
+                                  names of the table.
+
+    Example:
+        for row in iter_table_rows("Person"):
+            print(row["name"])
+    """
+    logger.info(f"Streaming rows from table '{table_id}'")
+
+    # Built right away rather than on the first row, so the database is chosen while
+    # the request that asked for the rows is still being handled
+    queryset = get_rows_queryset(table_id, query, expand, order_by, after, limit)
+    names = field_names(queryset.model)
+
+    if not expand:
+        return queryset.values(*names).iterator(chunk_size=chunk_size)
+
+    expanded = {
+        name: field_names(queryset.model._meta.get_field(name).related_model)
+        for name in expand
+    }
+    rows = queryset.values(
+        *names,
+        *(
+            f"{name}__{column}"
+            for name, columns in expanded.items()
+            for column in columns
+        ),
+    ).iterator(chunk_size=chunk_size)
+
+    return (
+        {
+            **{name: row[name] for name in names},
+            **{
+                name: {column: row[f"{name}__{column}"] for column in columns}
+                for name, columns in expanded.items()
+            },
+        }
+        for row in rows
+    )
+
+
+def update_table_rows(
+    table_id: str, predicate: Dict[str, Any], values: Dict[str, Any]
+) -> Optional[int]:
+    """
+    Updates all rows of the specified table that match a filter predicate.
+
+    The update is executed as a single `UPDATE ... WHERE` statement through
+    `QuerySet.update()`, so no row is loaded into Python regardless of how many match.
+
+    Args:
+        table_id (str): The identifier of the table to update.
+        predicate (Dict[str, Any]): The filter predicate selecting the rows, see
+                                    `filters.to_filter_kwargs`. An empty predicate matches all rows.
+        values (Dict[str, Any]): The new values, keyed by column name.
+
+    Returns:
+        Optional[int]: The number of updated rows. Returns None if the update fails.
+
+    Example:
+        count = update_table_rows("Person", {"age__lt": 18}, {"adult": False})
+        # Sets 'adult' to False for every person younger than 18 and returns their count.
+    """
+    logger.info(f"Updating rows of table '{table_id}'")
+
     DynamicModel = get_dynamic_model(table_id)
 
-    items = DynamicModel.objects.all()
+    try:
+        columns = {field.name for field in DynamicModel._meta.concrete_fields}
+        if not isinstance(values, dict) or not values:
+            raise ValueError("Values must be a non-empty object")
+        if not set(values) <= columns - {DynamicModel._meta.pk.name}:
+            raise ValueError(f"Invalid values to update: {values}")
+
+        queryset = DynamicModel.objects.filter(
+            **filters.to_filter_kwargs(DynamicModel, predicate)
+        )
+        partitions.ensure_partitions(table_id, DynamicModel, [values])
+        count = queryset.update(**values)
+    except (DjangoError, ValidationError, ValueError, TypeError) as err:
+        logger.error(f"Failed to update rows of table '{table_id}': {err}")
+        return None
+
+    logger.info(f"Updated {count} rows of table '{table_id}'")
+    return count
 
-    logger.info(f"Rows from table '{table_id}' successfully retrieved")
 
-    return list(map(lambda x: obj_to_dict(x), items))
+def delete_table_rows(table_id: str, predicate: Dict[str, Any]) -> Optional[int]:
+    """
+    Deletes all rows of the specified table that match a filter predicate.
+
+    Reference columns of other tables point at the rows with `on_delete=DO_NOTHING`,
+    which Django does not collect, and dynamic models have no delete signals, so
+    `QuerySet.delete()` still takes its fast-delete path and issues a single
+    `DELETE ... WHERE` statement, leaving the referencing rows to Postgres.
+
+    Args:
+        table_id (str): The identifier of the table to delete rows from.
+        predicate (Dict[str, Any]): The filter predicate selecting the rows, see
+                                    `filters.to_filter_kwargs`. An empty predicate matches all rows.
+
+    Returns:
+        Optional[int]: The number of deleted rows. Returns None if the deletion fails.
+
+    Example:
+        count = delete_table_rows("Person", {"name__startswith": "Matt"})
+        # Deletes every person whose name starts with 'Matt' and returns their count.
+    """
+    logger.info(f"Deleting rows of table '{table_id}'")
+
+    DynamicModel = get_dynamic_model(table_id)
+
+    try:
+        queryset = DynamicModel.objects.filter(
+            **filters.to_filter_kwargs(DynamicModel, predicate)
+        )
+        count, _ = queryset.delete()
+    except (DjangoError, ValidationError, ValueError, TypeError) as err:
+        logger.error(f"Failed to delete rows of table '{table_id}': {err}")
+        return None
+
+    logger.info(f"Deleted {count} rows of table '{table_id}'")
+    return count
+
+
+def upsert_table_rows(
+    table_id: str,
+    rows: List[Dict[str, Any]],
+    batch_size: int = 1000,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Optional[int]:
+    """
+    Inserts rows into the specified table, updating the rows that already exist.
+
+    Rows are matched on the table's natural key, the columns declared with 'key' when the
+    table was created. They are written in batches of `INSERT ... ON CONFLICT DO UPDATE`
+    statements through `bulk_create(update_conflicts=True)`, so resending the same
+    entities never creates duplicates and never needs to read the table first. Rows
+    repeating a key within the request are collapsed, the last one wins. All batches
+    are written in one transaction. Tables without columns besides their key have
+    nothing to update, their existing rows are left as they are.
+
+    Args:
+        table_id (str): The identifier of the table to upsert the rows into.
+        rows (List[Dict[str, Any]]): The rows to insert or update.
+        batch_size (int): The number of rows per statement. Defaults to 1000.
+        progress (Optional[Callable[[int, int], None]]): Called after each batch with
+                                                          the number of rows written so
+                                                          far and the number of rows.
+
+    Returns:
+        Optional[int]: The number of rows inserted or updated, as reported by Postgres.
+                       Returns None if the table has no natural key or the upsert fails.
+
+    Example:
+        rows = [{"email": "matt@example.com", "age": 112}]
+        count = upsert_table_rows("Person", rows)
+        # Inserts the person, or updates its age if 'matt@example.com' is already stored.
+    """
+    logger.info(f"Upserting {len(rows)} rows into table '{table_id}'")
+
+    DynamicModel = get_dynamic_model(table_id)
+
+    unique_keys = get_unique_keys(DynamicModel)
+    if not unique_keys:
+        logger.error(f"Table '{table_id}' has no key columns to upsert on")
+        return None
+
+    update_fields = [
+        field.name
+        for field in DynamicModel._meta.concrete_fields
+        if field.name not in unique_keys and not field.primary_key
+    ]
+
+    written = 0
+
+    def count_rows(execute, sql, params, many, context):
+        # Rows skipped by ON CONFLICT DO NOTHING are not in the row count of the INSERT
+        nonlocal written
+        result = execute(sql, params, many, context)
+        if sql.startswith("INSERT"):
+            written += max(context["cursor"].rowcount, 0)
+        return result
+
+    try:
+        unique_rows = {tuple(row[key] for key in unique_keys): row for row in rows}
+        records = [to_record(DynamicModel, row) for row in unique_rows.values()]
+
+        partitions.ensure_partitions(table_id, DynamicModel, unique_rows.values())
+
+        using = router.db_for_write(DynamicModel)
+        with transaction.atomic(using=using):
+            with connections[using].execute_wrapper(count_rows):
+                for start in range(0, len(records), batch_size):
+                    DynamicModel.objects.bulk_create(
+                        records[start : start + batch_size],
+                        update_conflicts=bool(update_fields),
+                        ignore_conflicts=not update_fields,
+                        unique_fields=unique_keys if update_fields else None,
+                        update_fields=update_fields or None,
+                    )
+
+                    if progress is not None:
+                        progress(min(start + batch_size, len(records)), len(records))
+    except (DjangoError, ValidationError, ValueError, TypeError, KeyError) as err:
+        logger.error(f"Failed to upsert rows into table '{table_id}': {err}")
+        return None
+
+    logger.info(f"Upserted {written} rows into table '{table_id}'")
+    return written
+
+
+def _clone_columns(
+    table_id: str, DynamicModel, names: Optional[List[str]]
+) -> List[Dict[str, Any]]:
+    """
+    Returns the column definitions of a clone of a table, projected on the given names.
+
+    Raises:
+        ValueError: If a name is not a column of the table.
+    """
+    columns = to_columns(DynamicModel)
+
+    if names is not None:
+        known = {column["name"] for column in columns}
+        for name in names:
+            if name not in known:
+                raise ValueError(f"Unknown column '{name}'")
+
+        kept = [column for column in columns if column["name"] in names]
+
+        # A natural key only holds when all of its columns are kept
+        if len([column for column in kept if column.get("key")]) < len(
+            [column for column in columns if column.get("key")]
+        ):
+            for column in kept:
+                column.pop("key", None)
+
+        columns = kept
+
+    for column in columns:
+        if column["name"] in search.searchable_tables.get(table_id, []):
+            column["search"] = True
+
+    return columns
+
+
+def clone_table(
+    table_id: str,
+    columns: Optional[List[str]] = None,
+    predicate: Optional[Dict[str, Any]] = None,
+    snapshot: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Creates a new table with the structure and rows of the specified table.
+
+    The clone has the columns, natural key, search columns and partitioning of the
+    table, and is placed on the same shard, where its rows are copied with a single
+    `INSERT INTO ... SELECT` statement, so they never leave the database. The rows keep
+    their ids, and the clone's id sequence continues after the largest one. Rollups and
+    the change feed are not cloned.
+
+    A snapshot is a clone of all rows and columns that is made read-only and recorded
+    with the time its rows were read at, see `snapshots`. Being a single statement, the
+    copy reads the rows as of one point in time, unaffected by concurrent writes.
+
+    Args:
+        table_id (str): The identifier of the table to clone.
+        columns (Optional[List[str]]): The names of the columns to clone. Defaults to None,
+                                       in which case all columns are cloned.
+        predicate (Optional[Dict[str, Any]]): The filter predicate selecting the rows to
+                                              copy, see `filters.to_filter_kwargs`.
+                                              Defaults to None, in which case all rows are copied.
+        snapshot (bool): Whether to take a read-only snapshot of the table. Defaults to False.
+
+    Returns:
+        Optional[Dict[str, Any]]: The 'table_id' of the clone and the 'count' of copied
+                                  rows, with the 'taken_at' time of snapshots. Returns
+                                  None if the cloning fails.
+
+    Example:
+        clone_table("Person", columns=["name"], predicate={"age__gte": 18})
+        # Returns e.g. {"table_id": "Ks8Jd...", "count": 1520} for a table of the names
+        # of adults, copied without the rows passing through the application.
+    """
+    logger.info(f"Cloning table '{table_id}'{' as a snapshot' if snapshot else ''}")
+
+    DynamicModel = get_dynamic_model(table_id)
+    if DynamicModel is None:
+        logger.error(f"Table '{table_id}' does not exist.")
+        return None
+
+    try:
+        clone_columns = _clone_columns(table_id, DynamicModel, columns)
+        queryset = DynamicModel.objects.filter(
+            **filters.to_filter_kwargs(DynamicModel, predicate or {})
+        )
+    except ValueError as err:
+        logger.error(f"Cannot clone table '{table_id}': {err}")
+        return None
+
+    partitioning = {}
+    if partitions.is_partitioned(table_id):
+        key = partitions.partitioned_tables[table_id]["key"]
+        if key == "id" or any(column["name"] == key for column in clone_columns):
+            partitioning = {
+                "partition_size": partitions.partitioned_tables[table_id]["size"],
+                "partition_key": key,
+            }
+
+    # Place the clone next to the table, the copy runs within one database
+    shard = shards.get_shard(table_id)
+    clone_id = shortuuid.uuid()
+
+    if create_table(clone_columns, clone_id, shard=shard, **partitioning) is None:
+        return None
+
+    CloneModel = get_dynamic_model(clone_id)
+    quote_name = connections[shard].ops.quote_name
+    db_table = quote_name(CloneModel._meta.db_table)
+    names = ["id"] + [column["name"] for column in clone_columns]
+
+    try:
+        partitions.clone_partitions(clone_id, CloneModel, DynamicModel, shard)
+
+        sql, params = (
+            queryset.using(shard).order_by().values_list(*names).query.sql_with_params()
+        )
+
+        with transaction.atomic(using=shard):
+            with connections[shard].cursor() as cursor:
+                cursor.execute("SELECT clock_timestamp()")
+                taken_at = cursor.fetchone()[0]
+
+                cursor.execute(
+                    f"INSERT INTO {db_table} ({', '.join(map(quote_name, names))}) {sql}",
+                    params,
+                )
+                count = cursor.rowcount
+
+                cursor.execute(
+                    "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {db_table}), false)",
+                    [CloneModel._meta.db_table],
+                )
+
+                if snapshot:
+                    snapshots.protect(cursor, CloneModel)
+
+        if snapshot:
+            snapshots.record(clone_id, table_id, taken_at, count)
+
+    except DjangoError as err:
+        logger.error(
+            f"Failed to copy rows of table '{table_id}' to '{clone_id}': {err}"
+        )
+
+        with connections[shard].schema_editor() as schema_editor:
+            schema_editor.delete_model(CloneModel)
+        unregister_dynamic_model(clone_id)
+        partitions.unregister(clone_id)
+        search.unregister(clone_id)
+        shards.unset_shard(clone_id)
+        return None
+
+    logger.info(f"Table '{table_id}' cloned to '{clone_id}' with {count} rows")
+
+    result = {"table_id": clone_id, "count": count}
+    if snapshot:
+        result["taken_at"] = taken_at
+
+    return result
+
+
+def _copy_rows(DynamicModel, source: str, target: str, ids: List[int]):
+    rows = list(DynamicModel.objects.using(source).filter(id__in=ids))
+
+    with transaction.atomic(using=target):
+        DynamicModel.objects.using(target).filter(id__in=ids).delete()
+        DynamicModel.objects.using(target).bulk_create(rows)
+
+
+def _pop_changes(cursor, changes: str, limit: Optional[int] = None) -> List[int]:
+    cursor.execute(
+        f"DELETE FROM {changes} WHERE seq IN "
+        f"(SELECT seq FROM {changes} ORDER BY seq LIMIT %s) RETURNING id",
+        [limit],
+    )
+    return sorted({row[0] for row in cursor.fetchall()})
+
+
+def move_table(table_id: str, shard: str, batch_size: int = 10000) -> Optional[str]:
+    """
+    Moves the specified table to another shard while it keeps serving requests.
+
+    A trigger on the source table first logs the id of every row written from then on.
+    The table is then created on the target shard and its rows are copied in batches of
+    'batch_size', without blocking reads nor writes, after which the logged rows are
+    copied again until fewer than 'batch_size' remain. Only the last of them are copied
+    with writes to the source table blocked, in the same transaction that records the
+    new shard in the shard map and makes the source table read-only. Workers that
+    looked the table up earlier follow the move once their `DYNATABLE_SHARD_MAP_TTL`
+    expires: until then they keep reading the source table, and their writes fail
+    rather than being lost. The source table is dropped once that time has passed.
+    Tables related by reference columns are not moved, foreign keys cannot span shards.
+
+    Args:
+        table_id (str): The identifier of the table to move.
+        shard (str): The database alias of the shard to move the table to, one of
+                     `settings.DATABASE_SHARDS`.
+        batch_size (int): The number of rows copied at once. Defaults to 10000.
+
+    Returns:
+        Optional[str]: The table identifier of the moved table. Returns None if the move
+                       fails, in which case the table stays on its shard.
+
+    Example:
+        move_table("Person", "shard2")
+        # Copies 'Person' to 'shard2' and serves it from there from now on.
+    """
+    if shard not in settings.DATABASE_SHARDS:
+        logger.error(f"Cannot move table '{table_id}', unknown shard '{shard}'")
+        return None
+
+    DynamicModel = get_dynamic_model(table_id)
+    if DynamicModel is None:
+        logger.error(f"Table '{table_id}' does not exist.")
+        return None
+
+    source = shards.get_shard(table_id)
+    if source == shard:
+        logger.info(f"Table '{table_id}' is already on shard '{shard}'")
+        return table_id
+
+    # Foreign keys do not span databases, tables related by references stay together
+    with connections[source].cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_constraint WHERE contype = 'f' "
+            "AND (conrelid = %s::regclass OR confrelid = %s::regclass)",
+            [DynamicModel._meta.db_table, DynamicModel._meta.db_table],
+        )
+        if cursor.fetchone() is not None:
+            logger.error(
+                f"Cannot move table '{table_id}', it references or is referenced "
+                "by other tables"
+            )
+            return None
+
+    logger.info(f"Moving table '{table_id}' from shard '{source}' to '{shard}'")
+
+    quote_name = connections[source].ops.quote_name
+    db_table = quote_name(DynamicModel._meta.db_table)
+    changes = quote_name(f"{DynamicModel._meta.db_table}_changes")
+
+    try:
+        with connections[source].cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {changes} (seq bigserial PRIMARY KEY, id bigint NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE FUNCTION {changes}() RETURNS trigger LANGUAGE plpgsql AS $$ "
+                f"BEGIN INSERT INTO {changes} (id) VALUES "
+                "(CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END); "
+                "RETURN NULL; END $$"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {changes} AFTER INSERT OR UPDATE OR DELETE "
+                f"ON {db_table} FOR EACH ROW EXECUTE FUNCTION {changes}()"
+            )
+
+        with connections[shard].schema_editor() as schema_editor:
+            partitions.create_model(schema_editor, table_id, DynamicModel)
+            search.create_search_index(schema_editor, table_id, DynamicModel)
+            rollups.create_rollups(schema_editor, table_id, DynamicModel)
+            _save_table_options(schema_editor, table_id, DynamicModel)
+
+        partitions.copy_partitions(table_id, DynamicModel, source, shard)
+
+        last_id = 0
+        while True:
+            rows = list(
+                DynamicModel.objects.using(source)
+                .filter(id__gt=last_id)
+                .order_by("id")[:batch_size]
+            )
+            if not rows:
+                break
+
+            DynamicModel.objects.using(shard).bulk_create(rows)
+            last_id = rows[-1].id
+
+        while True:
+            with connections[source].cursor() as cursor:
+                ids = _pop_changes(cursor, changes, batch_size)
+
+            partitions.copy_partitions(table_id, DynamicModel, source, shard)
+            _copy_rows(DynamicModel, source, shard, ids)
+
+            if len(ids) < batch_size:
+                break
+
+        with transaction.atomic(using=source):
+            with connections[source].cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {db_table} IN EXCLUSIVE MODE")
+                ids = _pop_changes(cursor, changes)
+
+                # Clones set their sequence without calling it, which
+                # pg_sequence_last_value() reports as NULL
+                cursor.execute(
+                    "SELECT pg_get_serial_sequence(%s, 'id')",
+                    [DynamicModel._meta.db_table],
+                )
+                cursor.execute(
+                    f"SELECT last_value, is_called FROM {cursor.fetchone()[0]}"
+                )
+                last_value, is_called = cursor.fetchone()
+
+            partitions.copy_partitions(table_id, DynamicModel, source, shard)
+            _copy_rows(DynamicModel, source, shard, ids)
+
+            with connections[shard].cursor() as cursor:
+                cursor.execute(
+                    "SELECT setval(pg_get_serial_sequence(%s, 'id'), %s, %s)",
+                    [DynamicModel._meta.db_table, last_value, is_called],
+                )
+
+            feeds.copy_feed(table_id, DynamicModel, source, shard)
+
+            if snapshots.is_snapshot(table_id):
+                with connections[shard].cursor() as cursor:
+                    snapshots.protect(cursor, DynamicModel)
+
+            # The trigger logging the writes now rejects them
+            with connections[source].cursor() as cursor:
+                cursor.execute(
+                    f"CREATE OR REPLACE FUNCTION {changes}() RETURNS trigger "
+                    "LANGUAGE plpgsql AS $$ BEGIN RAISE EXCEPTION "
+                    "'Table \"%%\" was moved to another shard', TG_TABLE_NAME; END $$",
+                    [],
+                )
+
+            shards.set_shard(table_id, shard)
+
+    except DjangoError as err:
+        logger.error(f"Error moving table '{table_id}' to shard '{shard}': {err}")
+
+        with connections[source].cursor() as cursor:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {changes} ON {db_table}")
+            cursor.execute(f"DROP TABLE IF EXISTS {changes}")
+            cursor.execute(f"DROP FUNCTION IF EXISTS {changes}()")
+
+        with connections[shard].schema_editor() as schema_editor:
+            rollups.drop_rollups(schema_editor, table_id, DynamicModel)
+            feeds.drop_feed(schema_editor, table_id, DynamicModel)
+            schema_editor.execute(f"DROP TABLE IF EXISTS {db_table}")
+
+        return None
+
+    # Workers may still route the table to the source shard until their lookup expires
+    time.sleep(settings.DYNATABLE_SHARD_MAP_TTL)
+
+    try:
+        with connections[source].schema_editor() as schema_editor:
+            rollups.drop_rollups(schema_editor, table_id, DynamicModel)
+            feeds.drop_feed(schema_editor, table_id, DynamicModel)
+            schema_editor.delete_model(DynamicModel)
+            schema_editor.execute(f"DROP TABLE {changes}")
+            schema_editor.execute(f"DROP FUNCTION {changes}()")
+    except DjangoError as err:
+        logger.error(f"Error dropping table '{table_id}' from shard '{source}': {err}")
+
+    logger.info(f"Table '{table_id}' successfully moved to shard '{shard}'.")
+    return table_id
+
+
+def create_rollup(
+    table_id: str, name: str, group_by: List[str], aggregates: Dict[str, List[str]]
+) -> Optional[str]:
+    """
+    Registers an incrementally maintained aggregate rollup on the specified table.
+
+    The rows of the table are grouped by the 'group_by' columns, and for each group the
+    number of rows and the requested aggregates of numeric columns are kept in a side
+    table. Triggers update the side table on every write to the table, so reading the
+    rollup costs as much as the number of groups, however many rows the table holds.
+    See `rollups.create_rollup`.
+
+    Args:
+        table_id (str): The identifier of the table.
+        name (str): The name of the rollup, up to 12 lowercase letters, digits or underscores.
+        group_by (List[str]): The columns to group the rows by.
+        aggregates (Dict[str, List[str]]): The functions, among 'sum', 'count', 'min' and
+                                           'max', to maintain per numeric column.
+
+    Returns:
+        Optional[str]: The name of the rollup. Returns None if it cannot be created.
+
+    Example:
+        create_rollup("Person", "by_city", ["city"], {"age": ["sum", "max"]})
+        # Maintains the number of people, the sum and the maximum of their age per city.
+    """
+    logger.info(f"Creating rollup '{name}' of table '{table_id}'")
+
+    DynamicModel = get_dynamic_model(table_id)
+    if DynamicModel is None:
+        logger.error(f"Table '{table_id}' does not exist.")
+        return None
+
+    if rollups.has_rollup(table_id, name):
+        logger.error(f"Table '{table_id}' already has a rollup '{name}'")
+        return None
+
+    try:
+        rollups.validate(DynamicModel, name, group_by, aggregates)
+        rollups.register(table_id, name, group_by, aggregates)
+
+        with connections[shards.get_shard(table_id)].schema_editor() as schema_editor:
+            rollups.create_rollup(schema_editor, table_id, DynamicModel, name)
+            _save_table_options(schema_editor, table_id, DynamicModel)
+    except (DjangoError, ValueError) as err:
+        logger.error(f"Error creating rollup '{name}' of table '{table_id}': {err}")
+        rollups.unregister(table_id, name)
+        return None
+
+    logger.info(f"Rollup '{name}' of table '{table_id}' successfully created.")
+    return name
+
+
+def get_rollup(table_id: str, name: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Retrieves the groups of a rollup of the specified table, see `rollups.read_rollup`.
+
+    Args:
+        table_id (str): The identifier of the table.
+        name (str): The name of the rollup.
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: A dictionary per group. Returns None if the table
+                                        has no such rollup.
+    """
+    logger.info(f"Fetching rollup '{name}' of table '{table_id}'")
+
+    DynamicModel = get_dynamic_model(table_id)
+    if DynamicModel is None or not rollups.has_rollup(table_id, name):
+        logger.error(f"Table '{table_id}' has no rollup '{name}'")
+        return None
+
+    return rollups.read_rollup(table_id, DynamicModel, name)
+
+
+def enable_change_feed(table_id: str) -> Optional[str]:
+    """
+    Starts recording the changes of the specified table for its change feed.
+
+    From then on every inserted, updated and deleted row is appended to the table's
+    change log and announced to the clients following the feed, see `feeds.create_feed`.
+    Enabling the change feed of a table that already has one does nothing.
+
+    Args:
+        table_id (str): The identifier of the table.
+
+    Returns:
+        Optional[str]: The table identifier. Returns None if the change feed cannot be
+                       enabled.
+
+    Example:
+        enable_change_feed("Person")
+        # Changes of 'Person' are now streamed by `GET /api/table/Person/changes`.
+    """
+    logger.info(f"Enabling change feed of table '{table_id}'")
+
+    DynamicModel = get_dynamic_model(table_id)
+    if DynamicModel is None:
+        logger.error(f"Table '{table_id}' does not exist.")
+        return None
+
+    if feeds.has_feed(table_id):
+        logger.info(f"Table '{table_id}' already has a change feed")
+        return table_id
+
+    try:
+        feeds.register(table_id)
+
+        with connections[shards.get_shard(table_id)].schema_editor() as schema_editor:
+            feeds.create_feed(schema_editor, table_id, DynamicModel)
+            _save_table_options(schema_editor, table_id, DynamicModel)
+    except DjangoError as err:
+        logger.error(f"Error enabling change feed of table '{table_id}': {err}")
+        feeds.unregister(table_id)
+        return None
+
+    logger.info(f"Change feed of table '{table_id}' successfully enabled.")
+    return table_id
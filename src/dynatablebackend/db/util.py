@@ -1,28 +1,73 @@
-from django.db import models
+import json
+import os
+from collections import OrderedDict
 
-# Global dictionary to store dynamic models
-dynamic_models = {}
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, models
+from dynatable.logger import get_logger
+
+from dynatablebackend.db import feeds, partitions, rollups, search, shards
+
+logger = get_logger(__name__)
+
+# App the dynamic models belong to, their tables are named '<app label>_<table_id>'
+APP_LABEL = "dynatablebackend"
+
+# Global dictionary to store dynamic models, least recently used first
+dynamic_models = OrderedDict()
+
+# Counters of the dynamic model lifecycle in this worker, 'changes' counts the models
+# defined or forgotten, which outdates anything derived from the resident models
+model_stats = {"evictions": 0, "rebuilds": 0, "changes": 0}
 
 # Only allowed types in dynamic model
 MODEL_TYPES = {
     "string": models.CharField,
     "boolean": models.BooleanField,
     "number": models.FloatField,
+    "smallint": models.SmallIntegerField,
+    "integer": models.IntegerField,
+    "bigint": models.BigIntegerField,
+    "decimal": models.DecimalField,
+    "varchar": models.CharField,
+    "timestamp": models.DateTimeField,
+    "date": models.DateField,
+    "uuid": models.UUIDField,
+    "jsonb": models.JSONField,
+    "reference": models.ForeignKey,
+}
+
+# Column options passed on to the model field, required by the types listed
+MODEL_TYPE_OPTIONS = {
+    "varchar": ["max_length"],
+    "decimal": ["max_digits", "decimal_places"],
+    "reference": ["table"],
 }
 
+# Types holding numbers
+NUMERIC_TYPES = {"number", "smallint", "integer", "bigint", "decimal"}
+
+# Types holding text
+TEXT_TYPES = {"string", "varchar"}
+
 
 def to_model_types(columns):
     """
     Converts a list of column definitions to Django model field types.
 
     Each column is transformed into an appropriate Django model field type, based
-    on the mapping defined in the MODEL_TYPES dictionary. The function
-    automatically adds an 'id' field as an AutoField, serving as the primary key.
+    on the mapping defined in the MODEL_TYPES dictionary. Types listed in
+    MODEL_TYPE_OPTIONS get their options, such as 'max_length', from the column.
+    'reference' columns become foreign keys to the dynamic model of the table given
+    by their 'table' option, see `reference_field`. The function automatically adds
+    an 'id' field as an AutoField, serving as the primary key.
 
     Args:
         columns (list of dict): A list of dictionaries representing columns, where
                                 each dictionary contains 'name' (the column name)
-                                and 'type' (the type of data, e.g., 'string').
+                                and 'type' (the type of data, e.g., 'string'), plus
+                                the options required by the type.
 
     Returns:
         dict: A dictionary with field names as keys and Django model field types as values.
@@ -39,23 +84,105 @@ def to_model_types(columns):
     }
 
     for column in columns:
-        model_types[column["name"]] = MODEL_TYPES[column["type"]]()
+        if column["type"] == "reference":
+            model_types[column["name"]] = reference_field(
+                column["name"], column["table"]
+            )
+            continue
+
+        options = {
+            option: column[option]
+            for option in MODEL_TYPE_OPTIONS.get(column["type"], [])
+        }
+        model_types[column["name"]] = MODEL_TYPES[column["type"]](**options)
 
     return model_types
 
 
-def create_dynamic_model(table_id, fields):
+def reference_field(name, table_id):
+    """
+    Creates the field of a 'reference' column, a foreign key to another dynamic table.
+
+    The column keeps the name it was given, holding the id of the referenced row, and is
+    indexed. The field has no reverse accessor and no delete cascade, and its database
+    constraint is not created by Django, which defers it, but by the table creation,
+    which checks it on every statement.
+
+    Args:
+        name (str): The name of the column.
+        table_id (str): The identifier of the referenced table.
+
+    Returns:
+        ForeignKey: The field of the column.
+
+    Raises:
+        ValueError: If the referenced table does not exist.
+    """
+    TargetModel = get_dynamic_model(table_id)
+    if TargetModel is None:
+        raise ValueError(f"Column '{name}' references unknown table '{table_id}'")
+
+    return models.ForeignKey(
+        TargetModel,
+        on_delete=models.DO_NOTHING,
+        db_column=name,
+        db_constraint=False,
+        related_name="+",
+    )
+
+
+def get_references(DynamicModel):
+    """
+    Returns the reference columns of a dynamic model and the tables they reference.
+
+    Args:
+        DynamicModel (class): The dynamic model class.
+
+    Returns:
+        dict: The identifiers of the referenced tables, by column name.
+
+    Example:
+        get_references(get_dynamic_model('Book'))
+        # Returns {'author': 'Person'} if 'author' references the 'Person' table.
+    """
+    return {
+        field.name: field.related_model.__name__
+        for field in DynamicModel._meta.concrete_fields
+        if field.is_relation
+    }
+
+
+def to_record(DynamicModel, row):
+    """
+    Creates an instance of a dynamic model from a row keyed by column names.
+
+    Reference columns hold the id of the referenced row, which Django takes through the
+    'attname' of their field, e.g. 'author_id', rather than through its name.
+    """
+    attnames = {
+        field.name: field.attname
+        for field in DynamicModel._meta.concrete_fields
+        if field.is_relation
+    }
+    return DynamicModel(
+        **{attnames.get(name, name): value for name, value in row.items()}
+    )
+
+
+def create_dynamic_model(table_id, fields, unique_keys=None):
     """
     Dynamically creates a new Django model with the specified fields.
 
     This function uses Python's type function to create a new model class at runtime.
     It assigns the model to a global dictionary for reference. The model includes
-    the given fields and is named using the provided table_id.
+    the given fields and is named using the provided table_id. When 'unique_keys' are
+    given, the model gets a unique constraint over them, its natural key.
 
     Args:
         table_id (str): The name of the dynamic model (also used as the database table name).
         fields (dict): A dictionary where keys are field names and values are Django model fields.
                        For example, {'name': models.CharField(...), 'age': models.IntegerField(...)}
+        unique_keys (list of str, optional): The names of the fields forming the natural key.
 
     Returns:
         class: A new dynamically created Django model class.
@@ -67,13 +194,73 @@ def create_dynamic_model(table_id, fields):
     """
     attrs = {"__module__": __name__, **fields}
 
+    if unique_keys:
+        attrs["Meta"] = type(
+            "Meta",
+            (),
+            {
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=list(unique_keys), name=f"{table_id.lower()}_natural_key"
+                    )
+                ]
+            },
+        )
+
+    # Drop the class being superseded first, so Django does not warn about reloading it
+    superseded = unregister_dynamic_model(table_id)
+
+    # Models referencing the superseded class are rebuilt on their next use
+    if superseded is not None:
+        for other_id, OtherModel in list(dynamic_models.items()):
+            if table_id in get_references(OtherModel).values():
+                unregister_dynamic_model(other_id)
+
     DynamicModel = type(table_id, (models.Model,), attrs)
 
     dynamic_models[table_id] = DynamicModel
+    model_stats["changes"] += 1
+    _evict_dynamic_models()
+
+    return DynamicModel
+
+
+def unregister_dynamic_model(table_id):
+    """
+    Forgets the dynamic model of a table, in this module and in Django's app registry.
+
+    Django keeps every model class it has seen in `apps.all_models`, so without this a
+    class superseded by a schema update, or evicted from `dynamic_models`, would stay in
+    memory for the lifetime of the worker. The table in the database is left untouched.
+
+    Args:
+        table_id (str): The identifier of the table whose model to forget.
+
+    Returns:
+        class or None: The forgotten model class, or None if the table had no model.
+    """
+    DynamicModel = dynamic_models.pop(table_id, None)
+    if DynamicModel is None:
+        return None
+
+    model_stats["changes"] += 1
+
+    app_models = apps.all_models[DynamicModel._meta.app_label]
+    if app_models.get(DynamicModel._meta.model_name) is DynamicModel:
+        del app_models[DynamicModel._meta.model_name]
+        apps.clear_cache()
 
     return DynamicModel
 
 
+def _evict_dynamic_models():
+    while len(dynamic_models) > settings.DYNATABLE_MAX_RESIDENT_MODELS:
+        table_id = next(iter(dynamic_models))
+        logger.info(f"Evicting model of table '{table_id}'")
+        unregister_dynamic_model(table_id)
+        model_stats["evictions"] += 1
+
+
 def get_combined_fields(table_id, fields):
     """
     Combines fields from a provided list with the fields of an existing dynamic model.
@@ -105,19 +292,96 @@ def get_combined_fields(table_id, fields):
     model_types = to_model_types(fields)
 
     for field in DynamicModel._meta.get_fields():
-        if field.name not in model_types:
-            model_types[field.name] = type(field)()
+        if field.name in model_types:
+            continue
+
+        if field.is_relation:
+            # A clone would reference the table lazily, by its name in the app registry
+            model_types[field.name] = reference_field(
+                field.name, field.related_model.__name__
+            )
+        else:
+            model_types[field.name] = field.clone()
 
     return model_types
 
 
+def to_columns(DynamicModel):
+    """
+    Converts the fields of a dynamic model back to column definitions.
+
+    This is the reverse of `to_model_types`: every field but the 'id' primary key is
+    described by its 'name' and 'type', plus the options required by the type, and the
+    columns of the table's natural key are marked with 'key'.
+
+    Args:
+        DynamicModel (class): The dynamic model class.
+
+    Returns:
+        list of dict: The column definitions, in the order of the model's fields.
+
+    Example:
+        to_columns(get_dynamic_model('Person'))
+        # Returns [{"name": "email", "type": "varchar", "max_length": 64, "key": True},
+        #          {"name": "age", "type": "integer"}]
+    """
+    unique_keys = get_unique_keys(DynamicModel)
+    columns = []
+
+    for field in DynamicModel._meta.concrete_fields:
+        if field.primary_key:
+            continue
+
+        column_type = next(
+            name for name, cls in MODEL_TYPES.items() if type(field) is cls
+        )
+        if column_type in TEXT_TYPES:
+            column_type = "varchar" if field.max_length else "string"
+
+        column = {"name": field.name, "type": column_type}
+        if field.is_relation:
+            column["table"] = field.related_model.__name__
+        else:
+            for option in MODEL_TYPE_OPTIONS.get(column_type, []):
+                column[option] = getattr(field, option)
+        if field.name in unique_keys:
+            column["key"] = True
+
+        columns.append(column)
+
+    return columns
+
+
+def get_unique_keys(DynamicModel):
+    """
+    Returns the natural key of a dynamic model.
+
+    Args:
+        DynamicModel (class): The dynamic model class.
+
+    Returns:
+        list of str: The names of the fields forming the natural key, empty if the model has none.
+
+    Example:
+        get_unique_keys(get_dynamic_model('Person'))
+        # Returns ['email'] if the 'Person' table was created with 'email' as its key column.
+    """
+    for constraint in DynamicModel._meta.constraints:
+        if isinstance(constraint, models.UniqueConstraint):
+            return list(constraint.fields)
+
+    return []
+
+
 def get_dynamic_model(table_id):
     """
     Retrieves a dynamically created Django model by its table identifier.
 
     This function looks up the global dictionary of dynamic models and returns the model
-    associated with the given table_id, if it exists. If no model is found with the given
-    table_id, the function returns None.
+    associated with the given table_id, if it exists. Only the most recently used
+    `settings.DYNATABLE_MAX_RESIDENT_MODELS` models are kept, so a model that is not
+    resident is rebuilt from the table's definition in the Postgres catalog. If no table
+    exists with the given table_id, the function returns None.
 
     Args:
         table_id (str): The identifier of the table (model name) to retrieve.
@@ -130,10 +394,142 @@ def get_dynamic_model(table_id):
         # Returns the 'Person' model if it exists, otherwise None.
     """
     if table_id in dynamic_models:
+        dynamic_models.move_to_end(table_id)
         return dynamic_models[table_id]
 
-    return None
+    return _rebuild_dynamic_model(table_id)
+
+
+def _rebuild_dynamic_model(table_id):
+    """
+    Rebuilds the dynamic model of an existing table from the Postgres catalog.
+
+    The table is looked up on the shard owning it. Columns are mapped back to the field
+    classes of MODEL_TYPES the way `inspectdb` does it, and the natural key is recovered
+    from its unique constraint. Columns of other types, such as the generated full-text
+    search vector, are not model fields. Partitioning, search, rollup and change feed
+    options, kept in the table's comment, are registered again unless this worker
+    already knows them. The comment also tells the tables referenced by the reference
+    columns, whose models are rebuilt as well.
+    """
+    db_table = f"{APP_LABEL}_{table_id.lower()}"
+    connection = connections[shards.get_shard(table_id)]
+    introspection = connection.introspection
+    field_classes = {
+        field_class.__name__: field_class for field_class in MODEL_TYPES.values()
+    }
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_class WHERE relname = %s AND relkind IN ('r', 'p') "
+            "AND pg_table_is_visible(oid)",
+            [db_table],
+        )
+        if cursor.fetchone() is None:
+            return None
+
+        description = introspection.get_table_description(cursor, db_table)
+        constraints = introspection.get_constraints(cursor, db_table)
+
+        cursor.execute("SELECT obj_description(%s::regclass, 'pg_class')", [db_table])
+        options = json.loads(cursor.fetchone()[0] or "{}")
 
+    fields = {"__module__": APP_LABEL}
+    for column in description:
+        if column.type_code not in introspection.data_types_reverse:
+            continue
 
-def obj_to_dict(obj):
-    return {field.name: getattr(obj, field.name) for field in obj._meta.fields}
+        field_type = introspection.get_field_type(column.type_code, column)
+
+        if field_type == "AutoField":
+            fields[column.name] = models.AutoField(primary_key=True)
+        elif field_type == "CharField" and (column.display_size or 0) > 0:
+            fields[column.name] = models.CharField(max_length=column.display_size)
+        elif field_type == "DecimalField":
+            fields[column.name] = models.DecimalField(
+                max_digits=column.precision, decimal_places=column.scale
+            )
+        elif field_type in field_classes:
+            fields[column.name] = field_classes[field_type]()
+
+    for name, target in options.get("references", {}).items():
+        if name in fields:
+            fields[name] = reference_field(name, target)
+
+    natural_key = constraints.get(f"{table_id.lower()}_natural_key", {})
+
+    if "partition" in options and not partitions.is_partitioned(table_id):
+        partitions.register(
+            table_id, options["partition"]["key"], options["partition"]["size"]
+        )
+
+    if "search" in options and not search.is_searchable(table_id):
+        search.register(table_id, options["search"])
+
+    for name, rollup in options.get("rollups", {}).items():
+        if not rollups.has_rollup(table_id, name):
+            rollups.register(table_id, name, rollup["group_by"], rollup["aggregates"])
+
+    if options.get("feed"):
+        feeds.register(table_id)
+
+    logger.info(f"Rebuilding model of table '{table_id}' from the catalog")
+    model_stats["rebuilds"] += 1
+
+    return create_dynamic_model(table_id, fields, natural_key.get("columns"))
+
+
+def memory_report():
+    """
+    Reports the memory used by this worker and the dynamic models it keeps.
+
+    Returns:
+        dict: The process id, its resident set size in bytes (None where /proc is not
+              available), the number of resident dynamic models and its bound, the
+              number of models in Django's app registry, and the eviction, rebuild and
+              change counters.
+
+    Example:
+        memory_report()
+        # Returns {"pid": 7, "rss_bytes": 81362944, "resident_models": 120, ...}
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            rss_bytes = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        rss_bytes = None
+
+    return {
+        "pid": os.getpid(),
+        "rss_bytes": rss_bytes,
+        "resident_models": len(dynamic_models),
+        "max_resident_models": settings.DYNATABLE_MAX_RESIDENT_MODELS,
+        "registered_models": len(apps.all_models[APP_LABEL]),
+        **model_stats,
+    }
+
+
+def obj_to_dict(obj, expand=()):
+    """
+    Converts a model instance to a dictionary keyed by field names.
+
+    Reference columns hold the id of the referenced row, or for the columns listed in
+    'expand' the referenced row itself, which should be fetched along with the instance
+    through `select_related`.
+    """
+    row = {field.name: getattr(obj, field.attname) for field in obj._meta.fields}
+
+    for name in expand:
+        row[name] = obj_to_dict(getattr(obj, name))
+
+    return row
+
+
+def field_names(DynamicModel):
+    """
+    Returns the names of the fields of a dynamic model, as in the rows of its table.
+
+    Pass them to `QuerySet.values()`, which otherwise keys reference columns by their
+    'attname', e.g. 'author_id'.
+    """
+    return [field.name for field in DynamicModel._meta.concrete_fields]
@@ -0,0 +1,286 @@
+"""Background jobs for long-running table operations."""
+
+import json
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import shortuuid
+from django.conf import settings
+from django.db import connections
+from dynatable.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Name of the table keeping the jobs of all workers, in the 'default' database
+JOBS_TABLE = "dynatable_jobs"
+
+# Statuses of a job, in the order a job goes through them
+JOB_STATUSES = ["queued", "running", "succeeded", "failed"]
+
+# Worker pool running the jobs of this process, started on the first job
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Whether this process has made sure the jobs table exists
+_table_ready = False
+
+
+def _worker() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DYNATABLE_JOB_WORKERS,
+                thread_name_prefix="dynatable-job",
+            )
+
+    return _executor
+
+
+def _ensure_table(cursor):
+    global _table_ready
+
+    if not _table_ready:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {JOBS_TABLE} ("
+            "id varchar PRIMARY KEY, kind varchar NOT NULL, table_id varchar, "
+            "status varchar NOT NULL, done bigint NOT NULL DEFAULT 0, total bigint, "
+            "result jsonb, error text, worker varchar NOT NULL, "
+            "created_at timestamptz NOT NULL DEFAULT now(), "
+            "started_at timestamptz, finished_at timestamptz)"
+        )
+        # Created in a transaction, the table is only known to exist once it commits
+        _table_ready = not connections["default"].in_atomic_block
+
+
+def _status_connection():
+    """
+    Opens a connection of its own to record the status of a running job.
+
+    Jobs usually run their work in a transaction, which would hide progress written
+    through the thread's regular connection until the work is done.
+    """
+    wrapper = connections["default"]
+    connection = wrapper.get_new_connection(wrapper.get_connection_params())
+    connection.autocommit = True
+    return connection
+
+
+class Progress:
+    """
+    Reports the progress of a running job.
+
+    Passed to the task of a job, which calls it with the number of items processed so
+    far and, once known, the total number of items.
+
+    Attributes:
+        job_id (str): The identifier of the job.
+    """
+
+    def __init__(self, job_id: str, connection):
+        self.job_id = job_id
+        self.connection = connection
+
+    def __call__(self, done: int, total: Optional[int] = None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {JOBS_TABLE} SET done = %s, total = coalesce(%s, total) "
+                "WHERE id = %s",
+                [done, total, self.job_id],
+            )
+
+
+class _ErrorCapture(logging.Handler):
+    """
+    Keeps the last error logged by the thread running a job.
+
+    Table operations report failures by logging an error and returning None; the
+    logged message is the reason a failed job reports.
+    """
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.thread = threading.get_ident()
+        self.message = None
+
+    def emit(self, record):
+        if record.thread == self.thread:
+            self.message = record.getMessage()
+
+
+def submit(
+    kind: str,
+    table_id: Optional[str],
+    task: Callable[[Progress], Any],
+    total: Optional[int] = None,
+) -> str:
+    """
+    Queues a long-running operation to run in the background.
+
+    The job is recorded in the jobs table and run by a pool of DYNATABLE_JOB_WORKERS
+    threads of the current process, so the request that submitted it returns at once
+    and no broker is needed. The task is called with a `Progress` to report on; its
+    return value is the result of the job, and None, the way table operations report
+    failures, fails the job with the last error the task logged.
+
+    Args:
+        kind (str): The kind of operation, e.g. 'upsert_rows'.
+        table_id (Optional[str]): The identifier of the table the job works on.
+        task (Callable[[Progress], Any]): The operation to run.
+        total (Optional[int]): The number of items to process, if known up front.
+
+    Returns:
+        str: The identifier of the job.
+
+    Example:
+        job_id = submit("upsert_rows", "Person", lambda progress: upsert(progress))
+        # Returns at once; `get_job(job_id)` follows the upsert.
+    """
+    job_id = shortuuid.uuid()
+
+    with connections["default"].cursor() as cursor:
+        _ensure_table(cursor)
+        cursor.execute(
+            f"INSERT INTO {JOBS_TABLE} (id, kind, table_id, status, total, worker) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [job_id, kind, table_id, "queued", total, _worker()],
+        )
+
+    _get_executor().submit(_run, job_id, kind, task)
+
+    logger.info(f"Queued job '{job_id}' ({kind}) of table '{table_id}'")
+    return job_id
+
+
+def _run(job_id: str, kind: str, task: Callable[[Progress], Any]):
+    connection = _status_connection()
+    capture = _ErrorCapture()
+    logging.getLogger("dynatablebackend").addHandler(capture)
+
+    def finish(status: str, result: Any = None, error: Optional[str] = None):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {JOBS_TABLE} SET status = %s, result = %s, error = %s, "
+                "done = CASE WHEN %s = 'succeeded' THEN greatest(done, coalesce(total, 0)) "
+                "ELSE done END, finished_at = now() WHERE id = %s",
+                [
+                    status,
+                    None if result is None else json.dumps(result, default=str),
+                    error,
+                    status,
+                    job_id,
+                ],
+            )
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {JOBS_TABLE} SET status = 'running', started_at = now() "
+                "WHERE id = %s",
+                [job_id],
+            )
+
+        logger.info(f"Running job '{job_id}' ({kind})")
+        result = task(Progress(job_id, connection))
+
+        if result is None:
+            finish("failed", error=capture.message or f"Job '{kind}' failed")
+            logger.error(f"Job '{job_id}' ({kind}) failed")
+        else:
+            finish("succeeded", result)
+            logger.info(f"Job '{job_id}' ({kind}) succeeded")
+
+    except Exception as err:
+        logger.exception(f"Job '{job_id}' ({kind}) failed: {err}")
+        finish("failed", error=str(err))
+
+    finally:
+        logging.getLogger("dynatablebackend").removeHandler(capture)
+        connection.close()
+        connections.close_all()
+
+
+def _is_lost(worker: str) -> bool:
+    host, _, pid = worker.rpartition(":")
+    if host != socket.gethostname():
+        return False
+
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+
+    return False
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Retrieves the status of a job.
+
+    Jobs left queued or running by a process of this host that has exited, e.g. a
+    worker restarted by the application server, are reported as failed.
+
+    Args:
+        job_id (str): The identifier of the job.
+
+    Returns:
+        Optional[Dict[str, Any]]: The job's 'job_id', 'kind', 'table_id', 'status',
+                                  'progress' ('done' and 'total' items), 'throughput'
+                                  in items per second while running or once done,
+                                  'result', 'error' and timestamps. Returns None if
+                                  there is no such job.
+
+    Example:
+        get_job("5Lq3uJ2WYtB9fK8mZc7eNa")
+        # {"job_id": "...", "status": "running", "progress": {"done": 20000,
+        #  "total": 50000}, "throughput": 9821.4, ...}
+    """
+    with connections["default"].cursor() as cursor:
+        _ensure_table(cursor)
+        cursor.execute(
+            f"SELECT id, kind, table_id, status, done, total, result::text, error, worker, "
+            "created_at, started_at, finished_at, "
+            "extract(epoch FROM coalesce(finished_at, now()) - started_at) "
+            f"FROM {JOBS_TABLE} WHERE id = %s",
+            [job_id],
+        )
+        row = cursor.fetchone()
+
+        if row is None:
+            return None
+
+        (_, kind, table_id, status, done, total, result, error, worker) = row[:9]
+        created_at, started_at, finished_at, elapsed = row[9:]
+
+        if status in ("queued", "running") and _is_lost(worker):
+            status, error = "failed", "Worker exited before the job finished"
+            cursor.execute(
+                f"UPDATE {JOBS_TABLE} SET status = %s, error = %s, "
+                "finished_at = now() WHERE id = %s",
+                [status, error, job_id],
+            )
+
+    return {
+        "job_id": job_id,
+        "kind": kind,
+        "table_id": table_id,
+        "status": status,
+        "progress": {"done": done, "total": total},
+        "throughput": done / float(elapsed) if elapsed else None,
+        "result": None if result is None else json.loads(result),
+        "error": error,
+        "created_at": created_at,
+        "started_at": started_at,
+        "finished_at": finished_at,
+    }
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dynatablebackend.db import shards, tables
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves a dynamic table to another shard while it keeps serving requests. "
+        "Without a shard, moves it back to the shard its table_id hashes to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("table_id", help="Identifier of the table to move.")
+        parser.add_argument(
+            "shard", nargs="?", help="Database alias of the shard to move it to."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of rows copied at once. Defaults to 10000.",
+        )
+
+    def handle(self, *args, **options):
+        table_id = options["table_id"]
+        shard = options["shard"] or shards.hash_shard(table_id)
+
+        if tables.move_table(table_id, shard, options["batch_size"]) is None:
+            raise CommandError(f"Failed to move table '{table_id}' to shard '{shard}'")
+
+        self.stdout.write(f"Table '{table_id}' is on shard '{shard}'")
@@ -0,0 +1,178 @@
+"""Middleware of the DynaTable API."""
+
+import json
+import os
+import time
+
+import msgpack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from dynatable.logger import get_logger
+
+from dynatablebackend import admission
+from dynatablebackend.routers import pin_to_primary, pinned_to_primary
+
+logger = get_logger(__name__)
+
+# Cookie marking clients that wrote within the last DYNATABLE_REPLICA_PIN_SECONDS
+PIN_COOKIE = "dynatable_primary"
+
+# Request methods that only read
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Requests to paths starting with this prefix are recorded by TrafficRecorderMiddleware
+RECORDED_PATH = "/api/table"
+
+# Request headers recorded by TrafficRecorderMiddleware, they choose how a view responds
+RECORDED_HEADERS = ["Accept", "Accept-Encoding", "Prefer"]
+
+
+class ReplicaPinMiddleware:
+    """
+    Pins clients that have just written to the primary database.
+
+    Replicas apply the primary's writes with a delay, so a client reading right after
+    its own write could miss it. Every writing request is served by the primary and
+    sets a short-lived cookie; while the cookie lives, the client's reads are served by
+    the primary as well. Other clients keep reading from the replicas.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = pinned_to_primary.set(False)
+
+        try:
+            if request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES:
+                pin_to_primary()
+
+            response = self.get_response(request)
+        finally:
+            pinned_to_primary.reset(token)
+
+        if request.method not in SAFE_METHODS and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.DYNATABLE_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+
+        return response
+
+
+class TrafficRecorderMiddleware:
+    """
+    Records the API traffic to the tables to a log file for later replay.
+
+    Enabled by setting DYNATABLE_TRAFFIC_LOG to the path of the log. Each request to
+    RECORDED_PATH is appended as a MessagePack map with its start time 't', method 'm',
+    full path 'p' with the query string, content type 'c', the RECORDED_HEADERS it was
+    sent with 'h', raw body 'b', response status 's' and the time the application took
+    to respond 'd', in seconds. For requests that create a table, such as a table
+    creation, a clone or a snapshot, the created table's id is kept as 'r', so a replay
+    can map the ids it gets to the recorded ones. Every record is appended with a
+    single write to a file opened in append mode, so the workers of an application
+    server can share one log.
+
+    Streamed responses are timed until their first byte.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DYNATABLE_TRAFFIC_LOG:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.fd = os.open(
+            settings.DYNATABLE_TRAFFIC_LOG,
+            os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+            0o644,
+        )
+
+        logger.info(f"Recording API traffic to '{settings.DYNATABLE_TRAFFIC_LOG}'")
+
+    def __call__(self, request):
+        if not request.path.startswith(RECORDED_PATH):
+            return self.get_response(request)
+
+        body = request.body
+        started = time.time()
+        start = time.perf_counter()
+
+        response = self.get_response(request)
+
+        record = {
+            "t": started,
+            "m": request.method,
+            "p": request.get_full_path(),
+            "c": request.content_type,
+            "h": {
+                name: request.headers[name]
+                for name in RECORDED_HEADERS
+                if name in request.headers
+            },
+            "b": body,
+            "s": response.status_code,
+            "d": time.perf_counter() - start,
+        }
+
+        if response.status_code == 201 and response.get("Content-Type", "").startswith(
+            "application/json"
+        ):
+            # Rollups and change feeds answer with the id of the table they belong to
+            created = json.loads(response.content).get("table_id")
+            resolver_match = getattr(request, "resolver_match", None)
+            if created and created != (
+                resolver_match and resolver_match.kwargs.get("table_id")
+            ):
+                record["r"] = created
+
+        os.write(self.fd, msgpack.packb(record, use_bin_type=True))
+        return response
+
+
+class AdmissionMiddleware:
+    """
+    Holds back requests to a table beyond its limits, see `admission.admit`.
+
+    Requests to the views of a table, those taking a 'table_id', are admitted per table
+    and kind of operation. A request that is not admitted gets a 429 response with a
+    Retry-After header. A request holds its slot until its view returns, so the body of
+    a streamed response is sent outside of the concurrency limit.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            gate = getattr(request, "_admission_gate", None)
+            if gate is not None:
+                gate.leave()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        table_id = view_kwargs.get("table_id")
+        if table_id is None:
+            return None
+
+        try:
+            request._admission_gate = admission.admit(
+                table_id, admission.operation(request.method)
+            )
+        except admission.Rejected as rejection:
+            response = JsonResponse(
+                {
+                    "message": f"Too many requests to table '{table_id}', "
+                    f"{rejection.reason} limit reached"
+                },
+                status=429,
+            )
+            response["Retry-After"] = str(rejection.retry_after)
+            return response
+
+        return None
@@ -0,0 +1,65 @@
+"""Database routing of dynamic tables to their shards and read replicas."""
+
+import contextvars
+import itertools
+
+from django.conf import settings
+
+from dynatablebackend.db import shards
+from dynatablebackend.db.util import APP_LABEL
+
+# Whether reads of the current request must go to the primary database
+pinned_to_primary = contextvars.ContextVar("pinned_to_primary", default=False)
+
+
+def pin_to_primary():
+    """
+    Sends the remaining reads of the current request or task to the primary database.
+
+    Called for requests that write, and for requests of clients that wrote recently, so
+    that their reads see their own writes however far the replicas lag behind.
+    """
+    pinned_to_primary.set(True)
+
+
+class ReplicaRouter:
+    """
+    Routes dynamic tables to their shards, and their reads to read replicas, round-robin.
+
+    Every dynamic model is read and written on the shard owning its table, see
+    `shards.get_shard`. The replicas are the database aliases listed in
+    `settings.DATABASE_REPLICAS`, which replicate the 'default' database, so reads of
+    tables on the 'default' shard are spread over them unless the current request is
+    pinned to the primary. Every model outside of dynamic tables is left to Django.
+    """
+
+    def __init__(self):
+        self.counter = itertools.count()
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != APP_LABEL:
+            return None
+
+        shard = shards.get_shard(model._meta.object_name)
+        replicas = settings.DATABASE_REPLICAS
+
+        if shard != "default" or not replicas or pinned_to_primary.get():
+            return shard
+
+        return replicas[next(self.counter) % len(replicas)]
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != APP_LABEL:
+            return None
+
+        pin_to_primary()
+        return shards.get_shard(model._meta.object_name)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+
+        return None
@@ -0,0 +1,125 @@
+"""OpenAPI schema of the DynaTable API and of the rows of dynamic tables."""
+
+import weakref
+from typing import Any, Dict
+
+from django.conf import settings
+from django.db import models
+from django.urls import get_urlconf
+from drf_yasg.generators import OpenAPISchemaGenerator
+from dynatable.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Schemas of model fields, checked in order since field classes subclass one another
+FIELD_SCHEMAS = [
+    (models.ForeignKey, {"type": "integer", "format": "int32"}),
+    (models.BooleanField, {"type": "boolean"}),
+    (models.SmallIntegerField, {"type": "integer", "format": "int32"}),
+    (models.BigIntegerField, {"type": "integer", "format": "int64"}),
+    (models.IntegerField, {"type": "integer", "format": "int32"}),
+    (models.FloatField, {"type": "number", "format": "double"}),
+    (models.DecimalField, {"type": "number", "format": "decimal"}),
+    (models.DateTimeField, {"type": "string", "format": "date-time"}),
+    (models.DateField, {"type": "string", "format": "date"}),
+    (models.UUIDField, {"type": "string", "format": "uuid"}),
+    (models.CharField, {"type": "string"}),
+    (models.JSONField, {}),
+]
+
+# Row schemas of the dynamic models, forgotten with the model classes they describe
+_row_schemas: "weakref.WeakKeyDictionary[type, Dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Generated API schemas by URL and URL configuration
+_api_schemas: Dict[tuple, Any] = {}
+
+
+def _field_schema(field: models.Field) -> Dict[str, Any]:
+    schema = next(
+        (dict(schema) for cls, schema in FIELD_SCHEMAS if isinstance(field, cls)), {}
+    )
+
+    if isinstance(field, models.CharField) and field.max_length:
+        schema["maxLength"] = field.max_length
+    if field.primary_key:
+        schema["readOnly"] = True
+    if field.null:
+        schema["x-nullable"] = True
+
+    return schema
+
+
+def row_schema(table_id: str, DynamicModel) -> Dict[str, Any]:
+    """
+    Describes the rows of a dynamic table as an OpenAPI schema object.
+
+    The schema is built from the fields of the table's dynamic model the first time it
+    is asked for and kept as long as the model class lives, so a schema update, which
+    defines a new class, yields a new schema.
+
+    Args:
+        table_id (str): The identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+
+    Returns:
+        Dict[str, Any]: The schema of a row: its 'properties' by field name and the
+                        'required' fields, those a new row has to provide.
+
+    Example:
+        row_schema("Person", get_dynamic_model("Person"))
+        # {"title": "Person", "type": "object", "properties": {"id": {"type": "integer",
+        #  "format": "int32", "readOnly": true}, "name": {"type": "string", ...}, ...},
+        #  "required": ["name"]}
+    """
+    schema = _row_schemas.get(DynamicModel)
+    if schema is not None:
+        return schema
+
+    fields = DynamicModel._meta.concrete_fields
+    schema = {
+        "title": table_id,
+        "type": "object",
+        "properties": {field.name: _field_schema(field) for field in fields},
+        "required": [
+            field.name
+            for field in fields
+            if not (field.primary_key or field.null or field.has_default())
+        ],
+    }
+
+    _row_schemas[DynamicModel] = schema
+    return schema
+
+
+class CachedSchemaGenerator(OpenAPISchemaGenerator):
+    """
+    Schema generator building the public API schema once and serving it from memory.
+
+    drf_yasg inspects every view on each request for the schema, which the API can do
+    without: the schema only changes with the routing. It is kept per schema URL and URL
+    configuration. The rows of each table are described by the table's own schema
+    endpoint, so the document is the same in every worker whatever tables it serves.
+    """
+
+    def get_schema(self, request=None, public=False):
+        if not public:
+            return super().get_schema(request, public)
+
+        url = self.url
+        if url is None and request is not None:
+            url = request.build_absolute_uri(request.path)
+
+        key = (
+            url,
+            self._gen.urlconf or get_urlconf() or settings.ROOT_URLCONF,
+            self.version,
+        )
+
+        schema = _api_schemas.get(key)
+        if schema is None:
+            logger.info(f"Generating API schema for '{url}'")
+            schema = _api_schemas[key] = super().get_schema(request, public)
+
+        return schema
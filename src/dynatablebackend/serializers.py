@@ -1,34 +1,76 @@
 from rest_framework import serializers
 
+from dynatablebackend.db.rollups import ROLLUP_FUNCTIONS, ROLLUP_NAME
+from dynatablebackend.db.util import MODEL_TYPE_OPTIONS, MODEL_TYPES, TEXT_TYPES
+
 
 class ColumnSerializer(serializers.Serializer):
     """
     Serializer for a column definition with validations.
 
     This serializer defines a column with 'name' and 'type' fields. The 'type' field
-    is restricted to specific choices - 'string', 'number', or 'boolean'. It includes
-    custom validation to ensure the 'type' field adheres to these choices.
+    is restricted to the types of MODEL_TYPES - 'string', 'number', 'boolean', and the
+    compact 'smallint', 'integer', 'bigint', 'decimal', 'varchar', 'timestamp', 'date',
+    'uuid' and 'jsonb', and 'reference', holding the id of a row of another table.
+    It includes custom validation to ensure the 'type' field adheres to these choices
+    and that the options the type requires are present. Columns marked with 'key'
+    together form the natural key of the table, used for upserts. Text columns marked
+    with 'search' are indexed for full-text search.
 
     Attributes:
         name (CharField): A field for the column name with a maximum length of 100.
         type (ChoiceField): A choice field for the column type.
+        key (BooleanField): Whether the column is part of the natural key. Defaults to False.
+        search (BooleanField): Whether the column is indexed for full-text search. Defaults to False.
+        max_length (IntegerField): The maximum length of a 'varchar' column.
+        max_digits (IntegerField): The precision of a 'decimal' column.
+        decimal_places (IntegerField): The scale of a 'decimal' column.
+        table (CharField): The identifier of the table a 'reference' column references.
 
     Methods:
         validate_type(value): Validates that the 'type' field contains a valid choice.
-        validate(attrs): Returns the attributes as-is after performing default validation.
+        validate(attrs): Validates the options required by the column type.
     """
 
     name = serializers.CharField(max_length=100)
-    type = serializers.ChoiceField(choices=["string", "number", "boolean"])
+    type = serializers.ChoiceField(choices=list(MODEL_TYPES))
+    key = serializers.BooleanField(default=False)
+    search = serializers.BooleanField(default=False)
+    max_length = serializers.IntegerField(
+        min_value=1, max_value=10485760, required=False
+    )
+    max_digits = serializers.IntegerField(min_value=1, max_value=1000, required=False)
+    decimal_places = serializers.IntegerField(
+        min_value=0, max_value=1000, required=False
+    )
+    table = serializers.CharField(max_length=100, required=False)
 
     def validate_type(self, value):
-        if value not in ["string", "number", "boolean"]:
+        if value not in MODEL_TYPES:
             raise serializers.ValidationError(
-                "Type must be 'string', 'number', or 'boolean'."
+                f"Type must be one of: {', '.join(MODEL_TYPES)}."
             )
         return value
 
     def validate(self, attrs):
+        column_type = attrs["type"]
+
+        for option in MODEL_TYPE_OPTIONS.get(column_type, []):
+            if option not in attrs:
+                raise serializers.ValidationError(
+                    {option: f"This field is required for '{column_type}' columns."}
+                )
+
+        if attrs.get("decimal_places", 0) > attrs.get("max_digits", 1000):
+            raise serializers.ValidationError(
+                {"decimal_places": "Must not be greater than 'max_digits'."}
+            )
+
+        if attrs["search"] and column_type not in TEXT_TYPES:
+            raise serializers.ValidationError(
+                {"search": "Only text columns can be searched."}
+            )
+
         return attrs
 
 
@@ -50,3 +92,28 @@ class ColumnListSerializer(serializers.ListSerializer):
 
     def validate(self, data):
         return data
+
+
+class RollupSerializer(serializers.Serializer):
+    """
+    Serializer for an aggregate rollup definition.
+
+    A rollup groups the rows of a table by the 'group_by' columns and maintains, per
+    group, the number of rows and the 'aggregates' of numeric columns, given as lists of
+    ROLLUP_FUNCTIONS - 'sum', 'count', 'min' and 'max' - keyed by column name. Whether
+    the columns exist and are numeric is checked against the table itself.
+
+    Attributes:
+        name (CharField): The name of the rollup, up to 12 characters.
+        group_by (ListField): The names of the columns to group by.
+        aggregates (DictField): The aggregate functions per numeric column.
+    """
+
+    name = serializers.RegexField(ROLLUP_NAME)
+    group_by = serializers.ListField(child=serializers.CharField(), allow_empty=False)
+    aggregates = serializers.DictField(
+        child=serializers.ListField(
+            child=serializers.ChoiceField(choices=ROLLUP_FUNCTIONS), allow_empty=False
+        ),
+        allow_empty=False,
+    )
@@ -4,7 +4,21 @@ from dynatablebackend import views
 
 urlpatterns = [
     path("table", views.create_table),
+    path("tables/stats", views.list_table_stats),
+    path("worker/memory", views.worker_memory),
+    path("worker/admission", views.worker_admission),
+    path("jobs/<str:job_id>", views.get_job),
     path("table/<str:table_id>", views.update_table_structure),
     path("table/<str:table_id>/row", views.add_table_row),
-    path("table/<str:table_id>/rows", views.get_table_rows),
+    path("table/<str:table_id>/rows", views.table_rows),
+    path("table/<str:table_id>/count", views.count_table_rows),
+    path("table/<str:table_id>/explain", views.explain_table_rows),
+    path("table/<str:table_id>/schema", views.get_table_schema),
+    path("table/<str:table_id>/stats", views.get_table_stats),
+    path("table/<str:table_id>/rollups", views.create_rollup),
+    path("table/<str:table_id>/rollups/<str:name>", views.get_rollup),
+    path("table/<str:table_id>/changes", views.table_changes),
+    path("table/<str:table_id>/clone", views.clone_table),
+    path("table/<str:table_id>/snapshots", views.table_snapshots),
+    path("table/<str:table_id>/export.<str:export_format>", views.export_table),
 ]
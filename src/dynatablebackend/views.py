@@ -1,16 +1,180 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import router
+from django.http import StreamingHttpResponse
 from dynatable.logger import get_logger
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from dynatablebackend.db import tables
-from dynatablebackend.db.util import get_dynamic_model
-from dynatablebackend.serializers import ColumnListSerializer
+from dynatablebackend import admission, jobs, schema
+from dynatablebackend.db import export, feeds, ordering, search, snapshots, tables
+from dynatablebackend.db.util import (
+    get_dynamic_model,
+    get_references,
+    get_unique_keys,
+    memory_report,
+)
+from dynatablebackend.renderers import (
+    FEED_RENDERER_CLASSES,
+    ROW_RENDERER_CLASSES,
+    EventStreamRenderer,
+)
+from dynatablebackend.serializers import ColumnListSerializer, RollupSerializer
 
 logger = get_logger(__name__)
 
 
+# Supported export formats: stream function, content type and whether to compress
+EXPORT_FORMATS = {
+    "arrow": (export.stream_arrow, "application/vnd.apache.arrow.stream", False),
+    "parquet": (export.stream_parquet, "application/vnd.apache.parquet", False),
+    "csv": (export.stream_csv, "text/csv", True),
+}
+
+
+def _accepted_encoding(request: Request):
+    """
+    Picks the preferred content encoding from the 'Accept-Encoding' header.
+
+    Args:
+        request (Request): The request object.
+
+    Returns:
+        str or None: One of export.ENCODINGS accepted by the client, or None for identity.
+    """
+    accepted = set()
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        _, _, quality = params.partition("q=")
+
+        try:
+            if float(quality or 1) > 0:
+                accepted.add(coding.strip().lower())
+        except ValueError:
+            continue
+
+    for encoding in export.ENCODINGS:
+        if encoding in accepted:
+            return encoding
+
+    return None
+
+
+def _is_true(value) -> bool:
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def _respond_async(request: Request) -> bool:
+    """
+    Tells whether the client asked for the operation to run in the background.
+
+    Clients opt in with the 'Prefer: respond-async' header of RFC 7240.
+    """
+    preferences = request.headers.get("Prefer", "")
+    return "respond-async" in [
+        preference.split("=")[0].strip().lower()
+        for preference in preferences.split(",")
+    ]
+
+
+def _accepted(kind: str, table_id: str, task, total=None) -> Response:
+    """
+    Runs an operation as a background job and responds with the job to follow.
+
+    Args:
+        kind (str): The kind of operation.
+        table_id (str): Identifier of the table the operation works on.
+        task (Callable[[jobs.Progress], Any]): The operation to run.
+        total (Optional[int]): The number of items to process, if known up front.
+
+    Returns:
+        Response: A 202 Response with the 'job_id' and its URL in 'Location'.
+    """
+    job_id = jobs.submit(kind, table_id, task, total)
+    logger.info(f"Operation '{kind}' of table '{table_id}' queued as job '{job_id}'")
+
+    return Response(
+        {"job_id": job_id, "status": "queued"},
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": f"/api/jobs/{job_id}"},
+    )
+
+
+def _expand(request: Request, table_id: str):
+    """
+    Reads the reference columns to expand from the 'expand' query parameter.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table whose rows are read.
+
+    Returns:
+        list of str or None: The comma separated names of the 'expand' query parameter,
+                             or None if it is absent.
+
+    Raises:
+        ValueError: If a name is not a reference column of the table.
+    """
+    value = request.query_params.get("expand")
+    if not value:
+        return None
+
+    expand = [name.strip() for name in value.split(",") if name.strip()]
+    references = get_references(get_dynamic_model(table_id))
+
+    for name in expand:
+        if name not in references:
+            raise ValueError(f"Column '{name}' is not a reference column")
+
+    return expand
+
+
+def _order_by(request: Request):
+    """
+    Reads the columns to sort the rows by from the 'order_by' query parameter.
+
+    Args:
+        request (Request): The request object.
+
+    Returns:
+        list of str or None: The comma separated names of the 'order_by' query parameter,
+                             '-' prefixed for a descending order, or None if it is absent.
+    """
+    value = request.query_params.get("order_by")
+    if not value:
+        return None
+
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def _positive_int(request: Request, name: str, default=None):
+    """
+    Reads a positive integer query parameter.
+
+    Args:
+        request (Request): The request object.
+        name (str): The name of the query parameter.
+        default: The value returned when the parameter is absent.
+
+    Returns:
+        int: The value of the parameter, or 'default' if it is absent.
+
+    Raises:
+        ValueError: If the parameter is not a positive integer.
+    """
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+
+    value = int(value)
+    if value < 1:
+        raise ValueError(f"'{name}' must be a positive integer")
+
+    return value
+
+
 @api_view(["POST"])
 def create_table(request: Request):
     """
@@ -20,6 +184,10 @@ def create_table(request: Request):
     should contain serialized column data. The function validates the data, creates a new
     table, and returns the table identifier.
 
+    The optional 'partition_size' query parameter creates the table range partitioned,
+    with partitions covering 'partition_size' values of the 'partition_key' column
+    ('id' by default, or a numeric column).
+
     Args:
         request (Request): The request object containing serialized column data.
 
@@ -35,8 +203,21 @@ def create_table(request: Request):
         )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    try:
+        partition_size = _positive_int(request, "partition_size")
+    except ValueError:
+        logger.error("Table creation failed due to invalid partition size")
+        return Response(
+            {"message": "'partition_size' must be a positive integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
     columns = list(serializer.data)
-    table_id = tables.create_table(columns)
+    table_id = tables.create_table(
+        columns,
+        partition_size=partition_size,
+        partition_key=request.query_params.get("partition_key", "id"),
+    )
 
     if table_id is None:
         logger.error("Failed to create table due to an internal error")
@@ -55,7 +236,9 @@ def update_table_structure(request: Request, table_id: str):
 
     Handles PUT requests to modify the structure of a table identified by 'table_id'.
     The request data should contain serialized column data for updates. The function validates
-    the data, checks if the table is empty, and updates the table's structure.
+    the data, checks if the table is empty, and updates the table's structure. With the
+    'Prefer: respond-async' header the update runs as a background job and the response
+    is a 202 with the 'job_id' to follow at `GET /api/jobs/<job_id>`.
 
     Args:
         request (Request): The request object containing serialized column data.
@@ -81,7 +264,14 @@ def update_table_structure(request: Request, table_id: str):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    is_empty = DynamicModel.objects.count() == 0
+    if snapshots.is_snapshot(table_id):
+        logger.error(f"Update failed - Table '{table_id}' is a read-only snapshot")
+        return Response(
+            {"message": f"Table '{table_id}' is a read-only snapshot"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    is_empty = not DynamicModel.objects.exists()
     if not is_empty:
         logger.error(f"Update failed - Table '{table_id}' contains data")
         return Response(
@@ -90,7 +280,20 @@ def update_table_structure(request: Request, table_id: str):
         )
 
     columns = list(serializer.data)
-    tables.update_table(table_id, columns)
+    if _respond_async(request):
+        return _accepted(
+            "update_table",
+            table_id,
+            lambda progress: tables.update_table(table_id, columns),
+        )
+
+    if tables.update_table(table_id, columns) is None:
+        logger.error(f"Failed to update table structure for '{table_id}'")
+        return Response(
+            {"message": "Failed to update table structure"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
     logger.info(f"Table structure for '{table_id}' updated successfully")
     return Response(
         {"message": "Table structure updated."}, status=status.HTTP_201_CREATED
@@ -127,13 +330,62 @@ def add_table_row(request: Request, table_id: str):
     return Response({"message": "Row added to table."}, status=status.HTTP_201_CREATED)
 
 
-@api_view(["GET"])
+@api_view(["GET", "PUT", "PATCH", "DELETE"])
+@renderer_classes(ROW_RENDERER_CLASSES)
+def table_rows(request: Request, table_id: str):
+    """
+    API view for the rows of a specified table.
+
+    Dispatches GET requests to `get_table_rows`, PUT requests to `upsert_table_rows`,
+    PATCH requests to `update_table_rows` and DELETE requests to `delete_table_rows`,
+    once the table is known to exist.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table.
+
+    Returns:
+        Response: A Response object returned by the handler of the request method.
+    """
+    if get_dynamic_model(table_id) is None:
+        logger.error(f"Request failed - Table '{table_id}' does not exist")
+        return Response(
+            {"message": f"Table '{table_id}' does not exists"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    if request.method == "PUT":
+        return upsert_table_rows(request, table_id)
+
+    if request.method == "PATCH":
+        return update_table_rows(request, table_id)
+
+    if request.method == "DELETE":
+        return delete_table_rows(request, table_id)
+
+    return get_table_rows(request, table_id)
+
+
 def get_table_rows(request: Request, table_id: str):
     """
-    API view to retrieve all rows from a specified table.
+    Retrieves all rows from a specified table.
 
     Handles GET requests to fetch all rows of data from the table identified by 'table_id'.
-    The function retrieves all the rows and returns them in the response.
+    The response encoding is negotiated through the 'Accept' header: 'application/json'
+    (orjson) or 'application/msgpack'. With the 'stream' query parameter set, rows are
+    read lazily from the database and streamed to the client chunk by chunk. The 'q'
+    query parameter runs a full-text search over the table's searchable columns and
+    returns the matching rows, best matches first. The 'count' query parameter, one of
+    'exact', 'estimate' or 'auto', adds the 'total' number of matching rows to the
+    response, counted as by the count endpoint. The 'expand' query parameter, a comma
+    separated list of reference columns, replaces their ids with the referenced rows,
+    joined in the same SQL query.
+
+    The 'order_by' query parameter sorts the rows by a comma separated list of columns,
+    '-' prefixed for a descending order, with 'id' breaking ties. With 'limit', at most
+    that many rows are returned along with the 'next' cursor, null on the last page,
+    which passed as 'after' returns the rows that follow. A 'hint' tells when no index
+    serves the sort order, so that every page sorts all matching rows.
 
     Args:
         request (Request): The request object.
@@ -145,6 +397,917 @@ def get_table_rows(request: Request, table_id: str):
 
     logger.info(f"Received request to retrieve rows from table '{table_id}'")
 
-    rows = tables.get_table_rows(table_id)
+    query = request.query_params.get("q")
+    if query is not None and not search.is_searchable(table_id):
+        logger.error(f"Search failed - Table '{table_id}' is not searchable")
+        return Response(
+            {"message": f"Table '{table_id}' has no searchable columns"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    order_by = _order_by(request)
+    after = request.query_params.get("after")
+
+    try:
+        expand = _expand(request, table_id)
+        limit = _positive_int(request, "limit")
+    except ValueError as err:
+        logger.error(f"Retrieval failed - {err}")
+        return Response({"message": str(err)}, status=status.HTTP_400_BAD_REQUEST)
+
+    renderer = request.accepted_renderer
+    if _is_true(request.query_params.get("stream")) and hasattr(
+        renderer, "render_stream"
+    ):
+        try:
+            rows = tables.iter_table_rows(
+                table_id,
+                query=query,
+                expand=expand,
+                order_by=order_by,
+                after=after,
+                limit=limit,
+            )
+        except ValueError as err:
+            logger.error(f"Retrieval failed - {err}")
+            return Response({"message": str(err)}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(f"Streaming rows from table '{table_id}'")
+        return StreamingHttpResponse(
+            renderer.render_stream(table_id, rows),
+            content_type=renderer.media_type,
+            status=status.HTTP_200_OK,
+        )
+
+    count_mode = request.query_params.get("count")
+    if count_mode is not None and count_mode not in tables.COUNT_MODES:
+        logger.error(f"Retrieval failed - Invalid count mode '{count_mode}'")
+        return Response(
+            {"message": f"Count mode must be one of: {', '.join(tables.COUNT_MODES)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        rows = tables.get_table_rows(table_id, query, expand, order_by, after, limit)
+    except ValueError as err:
+        logger.error(f"Retrieval failed - {err}")
+        return Response({"message": str(err)}, status=status.HTTP_400_BAD_REQUEST)
+
     logger.info(f"Rows retrieved successfully from table '{table_id}'")
-    return Response({"table_id": table_id, "rows": rows}, status=status.HTTP_200_OK)
+
+    data = {"table_id": table_id, "rows": rows}
+    if count_mode is not None:
+        data["total"] = tables.count_table_rows(table_id, count_mode, query)
+
+    DynamicModel = get_dynamic_model(table_id)
+    if limit is not None:
+        data["next"] = (
+            ordering.encode_cursor(DynamicModel, order_by, rows[-1])
+            if len(rows) == limit
+            else None
+        )
+
+    if order_by and not ordering.is_indexed(
+        DynamicModel, order_by, router.db_for_read(DynamicModel)
+    ):
+        logger.warning(f"Sort of table '{table_id}' by {order_by} has no index")
+        data["hint"] = (
+            f"No index serves the sort order '{','.join(order_by)}', every page "
+            "sorts all matching rows"
+        )
+
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+def count_table_rows(request: Request, table_id: str):
+    """
+    API view to count the rows of a specified table.
+
+    Handles GET requests to count the rows of the table identified by 'table_id'. The
+    'mode' query parameter selects how: 'exact' runs COUNT(*), 'estimate' reads the
+    planner statistics of the table in constant time, and 'auto' (the default) estimates
+    and counts exactly only when the estimate is below the
+    DYNATABLE_COUNT_ESTIMATE_THRESHOLD setting. The optional 'q' query parameter counts
+    the rows matching a full-text search instead.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table whose rows to count.
+
+    Returns:
+        Response: A Response object with the status code, the row count and whether
+                  the count is exact.
+    """
+    logger.info(f"Received request to count rows of table '{table_id}'")
+
+    if get_dynamic_model(table_id) is None:
+        logger.error(f"Count failed - Table '{table_id}' does not exist")
+        return Response(
+            {"message": f"Table '{table_id}' does not exists"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    mode = request.query_params.get("mode", "auto")
+    if mode not in tables.COUNT_MODES:
+        logger.error(f"Count failed - Invalid count mode '{mode}'")
+        return Response(
+            {"message": f"Count mode must be one of: {', '.join(tables.COUNT_MODES)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    query = request.query_params.get("q")
+    if query is not None and not search.is_searchable(table_id):
+        logger.error(f"Count failed - Table '{table_id}' is not searchable")
+        return Response(
+            {"message": f"Table '{table_id}' has no searchable columns"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    result = tables.count_table_rows(table_id, mode, query)
+    logger.info(f"Rows of table '{table_id}' counted successfully")
+    return Response({"table_id": table_id, **result}, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+def explain_table_rows(request: Request, table_id: str):
+    """
+    API view to explain the query of the rows of a specified table.
+
+    Handles GET requests with the query parameters of the rows endpoint, such as 'q',
+    'expand', 'order_by', 'after' and 'limit', and returns the Postgres plan of the
+    query the rows endpoint would run for them. The query is run to measure it, unless
+    the 'analyze' query parameter is false. Plans reveal the data and load of the
+    database, so the view only answers in DEBUG mode or to staff users.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table whose rows query to explain.
+
+    Returns:
+        Response: A Response object with the status code, the 'database' and 'sql' of
+                  the query and its 'plan' as returned by `EXPLAIN (FORMAT JSON)`.
+    """
+    logger.info(f"Received request to explain rows query of table '{table_id}'")
+
+    if not (settings.DEBUG or request.user.is_staff):
+        logger.error(f"Explain failed - Not allowed for table '{table_id}'")
+        return Response(
+            {"message": "Query plans are only available to staff or in DEBUG mode"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    if get_dynamic_model(table_id) is None:
+        logger.error(f"Explain failed - Table '{table_id}' does not exist")
+        return Response(
+            {"message": f"Table '{table_id}' does not exists"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    query = request.query_params.get("q")
+    if query is not None and not search.is_searchable(table_id):
+        logger.error(f"Explain failed - Table '{table_id}' is not searchable")
+        return Response(
+            {"message": f"Table '{table_id}' has no searchable columns"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    analyze = _is_true(request.query_params.get("analyze", "true"))
+
+    try:
+        explanation = tables.explain_table_rows(
+            table_id,
+            query,
+            analyze,
+            _expand(request, table_id),
+            _order_by(request),
+            request.query_params.get("after"),
+            _positive_int(request, "limit"),
+        )
+    except ValueError as err:
+        logger.error(f"Explain failed - {err}")
+        return Response({"message": str(err)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {"table_id": table_id, **explanation},
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(["GET"])
+def get_table_schema(request: Request, table_id: str):
+    """
+    API view to describe the rows of a specified table.
+
+    Handles GET requests for the OpenAPI schema of the rows of the table identified by
+    'table_id', built from its fields when first asked for and kept until the table's
+    structure changes.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table to describe.
+
+    Returns:
+        Response: A Response object with the status code, the table's natural 'key' and
+                  the row 'schema'.
+    """
+    logger.info(f"Received request to describe rows of table '{table_id}'")
+
+    DynamicModel = get_dynamic_model(table_id)
+    if DynamicModel is None:
+        logger.error(f"Description failed - Table '{table_id}' does not exist")
+        return Response(
+            {"message": f"Table '{table_id}' does not exists"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return Response(
+        {
+            "table_id": table_id,
+            "key": get_unique_keys(DynamicModel),
+            "schema": schema.row_schema(table_id, DynamicModel),
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(["GET"])
+def get_table_stats(request: Request, table_id: str):
+    """
+    API view to report the storage and usage statistics of a specified table.
+
+    Handles GET requests for the statistics Postgres keeps of the table identified by
+    'table_id': its estimated rows, heap, index and TOAST sizes, sequential and index
+    scans, dead tuples and last vacuum and analyze times, with the usage of each index
+    and the table's registered columns.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table to report on.
+
+    Returns:
+        Response: A Response object with the status code and the table's statistics.
+    """
+    logger.info(f"Received request for statistics of table '{table_id}'")
+
+    stats = tables.get_table_stats(table_id)
+    if stats is None:
+        logger.error(f"Statistics failed - Table '{table_id}' does not exist")
+        return Response(
+            {"message": f"Table '{table_id}' does not exists"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return Response({"table_id": table_id, **stats}, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+def list_table_stats(request: Request):
+    """
+    API view to list the storage and usage statistics of all tables.
+
+    Handles GET requests for the statistics of every dynamic table on every shard,
+    ordered by the 'order_by' query parameter, 'total_bytes' by default, largest first,
+    and cut to the first 'limit' tables if given.
+
+    Args:
+        request (Request): The request object.
+
+    Returns:
+        Response: A Response object with the status code and the list of 'tables'.
+    """
+    logger.info("Received request for statistics of all tables")
+
+    try:
+        listing = tables.list_table_stats(
+            request.query_params.get("order_by", "total_bytes"),
+            _positive_int(request, "limit"),
+        )
+    except ValueError as err:
+        logger.error(f"Listing statistics failed - {err}")
+        return Response({"message": str(err)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({"tables": listing}, status=status.HTTP_200_OK)
+
+
+def upsert_table_rows(request: Request, table_id: str):
+    """
+    Inserts or updates rows of a specified table by their natural key.
+
+    Handles PUT requests whose data is a list of rows. Rows whose key columns match an
+    existing row update it, the others are inserted. The table must have been created
+    with at least one column marked as 'key'. With the 'Prefer: respond-async' header
+    the rows are upserted by a background job, which reports the rows written so far.
+
+    Args:
+        request (Request): The request object containing the list of rows.
+        table_id (str): Identifier of the table to upsert the rows into.
+
+    Returns:
+        Response: A Response object with the status code and the number of upserted rows.
+    """
+    logger.info(f"Received request to upsert rows into table '{table_id}'")
+
+    rows = request.data
+    if not isinstance(rows, list):
+        logger.error(f"Upsert into table '{table_id}' did not receive a list of rows")
+        return Response(
+            {"message": "Request must contain a list of rows"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if _respond_async(request):
+        return _accepted(
+            "upsert_rows",
+            table_id,
+            lambda progress: tables.upsert_table_rows(
+                table_id, rows, progress=progress
+            ),
+            total=len(rows),
+        )
+
+    count = tables.upsert_table_rows(table_id, rows)
+    if count is None:
+        logger.error(f"Failed to upsert rows into table '{table_id}'")
+        return Response(
+            {"message": "Failed to upsert table rows"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    logger.info(f"Rows upserted successfully into table '{table_id}'")
+    return Response({"table_id": table_id, "count": count}, status=status.HTTP_200_OK)
+
+
+def update_table_rows(request: Request, table_id: str):
+    """
+    Updates the rows of a specified table that match a filter.
+
+    Handles PATCH requests whose data contains a 'filter' predicate (column lookups such
+    as {"age__gte": 18}, an empty object matches all rows) and the new 'values'. The
+    update runs as a single set-based SQL statement, as a background job with the
+    'Prefer: respond-async' header.
+
+    Args:
+        request (Request): The request object containing the filter and the new values.
+        table_id (str): Identifier of the table to update.
+
+    Returns:
+        Response: A Response object with the status code and the number of updated rows.
+    """
+    logger.info(f"Received request to update rows of table '{table_id}'")
+
+    data = request.data
+    if "filter" not in data or "values" not in data:
+        logger.error(
+            f"Update of rows of table '{table_id}' is missing filter or values"
+        )
+        return Response(
+            {"message": "Request must contain 'filter' and 'values'"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if _respond_async(request):
+        return _accepted(
+            "update_rows",
+            table_id,
+            lambda progress: tables.update_table_rows(
+                table_id, data["filter"], data["values"]
+            ),
+        )
+
+    count = tables.update_table_rows(table_id, data["filter"], data["values"])
+    if count is None:
+        logger.error(f"Failed to update rows of table '{table_id}'")
+        return Response(
+            {"message": "Failed to update table rows"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    logger.info(f"Rows of table '{table_id}' updated successfully")
+    return Response({"table_id": table_id, "count": count}, status=status.HTTP_200_OK)
+
+
+def delete_table_rows(request: Request, table_id: str):
+    """
+    Deletes the rows of a specified table that match a filter.
+
+    Handles DELETE requests whose data contains a 'filter' predicate (column lookups such
+    as {"age__gte": 18}). The filter is required; an explicit empty object deletes all
+    rows. The deletion runs as a single set-based SQL statement, as a background job
+    with the 'Prefer: respond-async' header.
+
+    Args:
+        request (Request): The request object containing the filter.
+        table_id (str): Identifier of the table to delete rows from.
+
+    Returns:
+        Response: A Response object with the status code and the number of deleted rows.
+    """
+    logger.info(f"Received request to delete rows of table '{table_id}'")
+
+    data = request.data
+    if "filter" not in data:
+        logger.error(f"Deletion of rows of table '{table_id}' is missing filter")
+        return Response(
+            {"message": "Request must contain 'filter'"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if _respond_async(request):
+        return _accepted(
+            "delete_rows",
+            table_id,
+            lambda progress: tables.delete_table_rows(table_id, data["filter"]),
+        )
+
+    count = tables.delete_table_rows(table_id, data["filter"])
+    if count is None:
+        logger.error(f"Failed to delete rows of table '{table_id}'")
+        return Response(
+            {"message": "Failed to delete table rows"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    logger.info(f"Rows of table '{table_id}' deleted successfully")
+    return Response({"table_id": table_id, "count": count}, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+def export_table(request: Request, table_id: str, export_format: str):
+    """
+    API view to export a whole table in a columnar format.
+
+    Handles GET requests to stream the table identified by 'table_id' as an Arrow IPC
+    stream ('export.arrow'), a Parquet file ('export.parquet') or CSV ('export.csv').
+    Rows are read and encoded in batches, so the export runs in bounded memory. The
+    optional 'batch_size' query parameter sets the number of rows per batch. CSV is
+    compressed on the fly with zstd or gzip when the client accepts it.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table to export.
+        export_format (str): The requested export format, 'arrow', 'parquet' or 'csv'.
+
+    Returns:
+        StreamingHttpResponse: A response streaming the exported table, or a Response
+                               with an error message.
+    """
+    logger.info(f"Received request to export table '{table_id}' as '{export_format}'")
+
+    if export_format not in EXPORT_FORMATS:
+        logger.error(f"Export failed - Unsupported format '{export_format}'")
+        return Response(
+            {"message": f"Unsupported export format '{export_format}'"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    if get_dynamic_model(table_id) is None:
+        logger.error(f"Export failed - Table '{table_id}' does not exist")
+        return Response(
+            {"message": f"Table '{table_id}' does not exists"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    try:
+        batch_size = _positive_int(request, "batch_size", 10000)
+    except ValueError:
+        logger.error(f"Export failed - Invalid batch size for table '{table_id}'")
+        return Response(
+            {"message": "'batch_size' must be a positive integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    stream, content_type, compressible = EXPORT_FORMATS[export_format]
+    chunks = stream(table_id, batch_size)
+
+    encoding = _accepted_encoding(request) if compressible else None
+    if encoding is not None:
+        chunks = export.compress(chunks, encoding)
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = (
+        f'attachment; filename="{table_id}.{export_format}"'
+    )
+    if compressible:
+        response["Vary"] = "Accept-Encoding"
+    if encoding is not None:
+        response["Content-Encoding"] = encoding
+
+    return response
+
+
+@api_view(["POST"])
+def create_rollup(request: Request, table_id: str):
+    """
+    API view to create an aggregate rollup of a specified table.
+
+    Handles POST requests whose data defines the rollup: its 'name', the 'group_by'
+    columns and the 'aggregates', a list of 'sum', 'count', 'min' or 'max' per numeric
+    column. The rollup is computed once and then kept up to date on every write. With
+    the 'Prefer: respond-async' header the rollup is built by a background job.
+
+    Args:
+        request (Request): The request object containing the rollup definition.
+        table_id (str): Identifier of the table to create the rollup for.
+
+    Returns:
+        Response: A Response object with the status code and the name of the rollup.
+    """
+    logger.info(f"Received request to create a rollup of table '{table_id}'")
+
+    serializer = RollupSerializer(data=request.data)
+    if not serializer.is_valid():
+        logger.error(
+            f"Rollup creation failed for table '{table_id}' due to invalid serializer data: {serializer.errors}"
+        )
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    if get_dynamic_model(table_id) is None:
+        logger.error(f"Rollup creation failed - Table '{table_id}' does not exist")
+        return Response(
+            {"message": f"Table '{table_id}' does not exists"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    if _respond_async(request):
+        return _accepted(
+            "create_rollup",
+            table_id,
+            lambda progress: tables.create_rollup(
+                table_id, **serializer.validated_data
+            ),
+        )
+
+    name = tables.create_rollup(table_id, **serializer.validated_data)
+    if name is None:
+        logger.error(f"Failed to create rollup of table '{table_id}'")
+        return Response(
+            {"message": "Failed to create rollup"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    logger.info(f"Rollup '{name}' of table '{table_id}' created successfully")
+    return Response(
+        {"table_id": table_id, "name": name}, status=status.HTTP_201_CREATED
+    )
+
+
+@api_view(["GET"])
+def get_rollup(request: Request, table_id: str, name: str):
+    """
+    API view to retrieve the groups of a rollup of a specified table.
+
+    Handles GET requests for the rollup 'name' of the table identified by 'table_id'.
+    Only the rollup's own table is read, one row per group, so the response is as fast
+    for a billion-row table as for an empty one.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table.
+        name (str): Name of the rollup.
+
+    Returns:
+        Response: A Response object with the status code and the groups of the rollup.
+    """
+    logger.info(f"Received request to retrieve rollup '{name}' of table '{table_id}'")
+
+    groups = tables.get_rollup(table_id, name)
+    if groups is None:
+        logger.error(f"Retrieval failed - Table '{table_id}' has no rollup '{name}'")
+        return Response(
+            {"message": f"Table '{table_id}' has no rollup '{name}'"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    logger.info(f"Rollup '{name}' of table '{table_id}' retrieved successfully")
+    return Response(
+        {"table_id": table_id, "name": name, "groups": groups},
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(["POST"])
+def clone_table(request: Request, table_id: str):
+    """
+    API view to clone a specified table.
+
+    Handles POST requests to create a new table with the structure and rows of the table
+    identified by 'table_id'. The optional 'columns' list of the request data projects
+    the clone on some of the columns, and the optional 'filter' predicate (column lookups
+    such as {"age__gte": 18}) selects the rows to copy. The rows are copied inside the
+    database with a single statement, as a background job with the 'Prefer:
+    respond-async' header.
+
+    Args:
+        request (Request): The request object containing the optional columns and filter.
+        table_id (str): Identifier of the table to clone.
+
+    Returns:
+        Response: A Response object with the status code, the identifier of the clone
+                  and the number of copied rows.
+    """
+    logger.info(f"Received request to clone table '{table_id}'")
+
+    if get_dynamic_model(table_id) is None:
+        logger.error(f"Cloning failed - Table '{table_id}' does not exist")
+        return Response(
+            {"message": f"Table '{table_id}' does not exists"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    if not isinstance(request.data, dict):
+        logger.error(f"Cloning of table '{table_id}' has an invalid payload")
+        return Response(
+            {"message": "Request must be an object of 'columns' and 'filter'"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    columns = request.data.get("columns")
+    if columns is not None and (
+        not isinstance(columns, list)
+        or not all(isinstance(column, str) for column in columns)
+    ):
+        logger.error(f"Cloning of table '{table_id}' has invalid columns")
+        return Response(
+            {"message": "'columns' must be a list of column names"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    predicate = request.data.get("filter")
+    if predicate is not None and not isinstance(predicate, dict):
+        logger.error(f"Cloning of table '{table_id}' has an invalid filter")
+        return Response(
+            {"message": "'filter' must be an object of column lookups"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if _respond_async(request):
+        return _accepted(
+            "clone_table",
+            table_id,
+            lambda progress: tables.clone_table(table_id, columns, predicate),
+        )
+
+    result = tables.clone_table(table_id, columns, predicate)
+    if result is None:
+        logger.error(f"Failed to clone table '{table_id}'")
+        return Response(
+            {"message": "Failed to clone table"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    logger.info(f"Table '{table_id}' cloned successfully to '{result['table_id']}'")
+    return Response(
+        {"source_table_id": table_id, **result}, status=status.HTTP_201_CREATED
+    )
+
+
+@api_view(["GET", "POST"])
+def table_snapshots(request: Request, table_id: str):
+    """
+    API view for the snapshots of a specified table.
+
+    Handles POST requests to take a read-only snapshot of the table identified by
+    'table_id', a clone of all its rows as of one point in time, copied inside the
+    database (as a background job with the 'Prefer: respond-async' header), and GET
+    requests to list the snapshots taken of it so far.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table.
+
+    Returns:
+        Response: A Response object with the status code and the new snapshot, or the
+                  list of 'snapshots'.
+    """
+    logger.info(
+        f"Received {request.method} request for snapshots of table '{table_id}'"
+    )
+
+    if get_dynamic_model(table_id) is None:
+        logger.error(f"Request failed - Table '{table_id}' does not exist")
+        return Response(
+            {"message": f"Table '{table_id}' does not exists"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    if request.method == "GET":
+        return Response(
+            {"table_id": table_id, "snapshots": snapshots.list_snapshots(table_id)},
+            status=status.HTTP_200_OK,
+        )
+
+    if _respond_async(request):
+        return _accepted(
+            "snapshot_table",
+            table_id,
+            lambda progress: tables.clone_table(table_id, snapshot=True),
+        )
+
+    result = tables.clone_table(table_id, snapshot=True)
+    if result is None:
+        logger.error(f"Failed to take a snapshot of table '{table_id}'")
+        return Response(
+            {"message": "Failed to take a snapshot of the table"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    logger.info(f"Snapshot '{result['table_id']}' of table '{table_id}' taken")
+    return Response(
+        {"source_table_id": table_id, **result}, status=status.HTTP_201_CREATED
+    )
+
+
+@api_view(["GET", "POST"])
+@renderer_classes(FEED_RENDERER_CLASSES)
+def table_changes(request: Request, table_id: str):
+    """
+    API view for the change feed of a specified table.
+
+    Dispatches GET requests to `get_table_changes` and POST requests to
+    `enable_change_feed`, once the table is known to exist.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table.
+
+    Returns:
+        Response: A Response object returned by the handler of the request method.
+    """
+    DynamicModel = get_dynamic_model(table_id)
+    if DynamicModel is None:
+        logger.error(f"Request failed - Table '{table_id}' does not exist")
+        return Response(
+            {"message": f"Table '{table_id}' does not exists"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    if request.method == "POST":
+        return enable_change_feed(request, table_id)
+
+    return get_table_changes(request, table_id, DynamicModel)
+
+
+def enable_change_feed(request: Request, table_id: str):
+    """
+    Enables the change feed of a specified table.
+
+    Handles POST requests to start recording the inserted, updated and deleted rows of
+    the table identified by 'table_id'. Changes made before are not part of the feed.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table.
+
+    Returns:
+        Response: A Response object with the status code and the table identifier.
+    """
+    logger.info(f"Received request to enable change feed of table '{table_id}'")
+
+    if tables.enable_change_feed(table_id) is None:
+        logger.error(f"Failed to enable change feed of table '{table_id}'")
+        return Response(
+            {"message": "Failed to enable change feed"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    logger.info(f"Change feed of table '{table_id}' enabled successfully")
+    return Response({"table_id": table_id}, status=status.HTTP_201_CREATED)
+
+
+def get_table_changes(request: Request, table_id: str, DynamicModel):
+    """
+    Streams the changes of a specified table as Server-Sent Events.
+
+    Handles GET requests, typically from an `EventSource`, for the table identified by
+    'table_id'. Every inserted, updated or deleted row is pushed as an 'insert', 'update'
+    or 'delete' event whose id is the change's sequence number. The changes after the
+    'Last-Event-ID' header, or else the 'cursor' query parameter, are caught up on first,
+    so a client that reconnects misses nothing; without either, only changes from now on
+    are sent. A 'reset' event means the changes after the cursor are no longer kept and
+    the client should fetch the rows again.
+
+    Under ASGI the response stays open and changes are pushed as Postgres announces them.
+    Under WSGI, where a worker cannot be held by a client, the response ends after the
+    catch-up and the client reconnects after DYNATABLE_CHANGE_FEED_RETRY milliseconds.
+
+    Args:
+        request (Request): The request object.
+        table_id (str): Identifier of the table.
+        DynamicModel (class): The dynamic model of the table.
+
+    Returns:
+        StreamingHttpResponse: A response streaming the changes, or a Response with an
+                               error message.
+    """
+    logger.info(f"Received request to follow changes of table '{table_id}'")
+
+    if not feeds.has_feed(table_id):
+        logger.error(f"Request failed - Table '{table_id}' has no change feed")
+        return Response(
+            {"message": f"Table '{table_id}' has no change feed"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    cursor = request.headers.get("Last-Event-ID", request.query_params.get("cursor"))
+    try:
+        cursor = None if cursor is None else int(cursor)
+        if cursor is not None and cursor < 0:
+            raise ValueError
+    except ValueError:
+        logger.error(f"Request failed - Invalid cursor for table '{table_id}'")
+        return Response(
+            {"message": "Cursor must be a non-negative integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    feeds.prune(table_id, DynamicModel)
+    if cursor is None:
+        cursor = feeds.last_seq(table_id, DynamicModel)
+
+    renderer = EventStreamRenderer()
+    retry = settings.DYNATABLE_CHANGE_FEED_RETRY
+
+    if isinstance(request._request, ASGIRequest):
+        content = renderer.render_async_stream(
+            feeds.stream_changes(table_id, DynamicModel, cursor), cursor, retry
+        )
+    else:
+        content = renderer.render_stream(
+            feeds.iter_changes(table_id, DynamicModel, cursor), cursor, retry
+        )
+
+    response = StreamingHttpResponse(content, content_type=renderer.media_type)
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+
+    logger.info(f"Streaming changes of table '{table_id}' after change {cursor}")
+    return response
+
+
+@api_view(["GET"])
+def get_job(request: Request, job_id: str):
+    """
+    API view to follow a background job.
+
+    Handles GET requests for the job identified by 'job_id', as returned in the 202
+    response of an operation requested with the 'Prefer: respond-async' header.
+
+    Args:
+        request (Request): The request object.
+        job_id (str): Identifier of the job.
+
+    Returns:
+        Response: A Response object with the status code and the job's 'status'
+                  ('queued', 'running', 'succeeded' or 'failed'), 'progress',
+                  'throughput' in items per second, 'result' and 'error'.
+    """
+    logger.info(f"Received request to retrieve job '{job_id}'")
+
+    job = jobs.get_job(job_id)
+    if job is None:
+        logger.error(f"Retrieval failed - Job '{job_id}' does not exist")
+        return Response(
+            {"message": f"Job '{job_id}' does not exist"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return Response(job, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+def worker_memory(request: Request):
+    """
+    API view to report the memory usage of the worker serving the request.
+
+    Each worker process keeps its own dynamic model classes, so the report describes
+    only the worker that answered: its process id, resident set size, and the number of
+    resident dynamic models together with the eviction and rebuild counters.
+
+    Args:
+        request (Request): The request object.
+
+    Returns:
+        Response: A Response object with the status code and the memory report.
+    """
+    logger.info("Received request to report worker memory usage")
+    return Response(memory_report(), status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+def worker_admission(request: Request):
+    """
+    API view to report the admission of requests by the worker serving the request.
+
+    Each worker process limits the requests to every table on its own, so the report
+    describes only the worker that answered: the configured limits, and per table and
+    kind of operation the requests in flight, queued for a slot, admitted and rejected.
+
+    Args:
+        request (Request): The request object.
+
+    Returns:
+        Response: A Response object with the status code and the admission report.
+    """
+    logger.info("Received request to report worker admission")
+    return Response(admission.admission_report(), status=status.HTTP_200_OK)
@@ -1,9 +1,12 @@
 import argparse
+import time
 
 import requests
 from dynatable.logger import get_logger
 from tests.generator import generator
 
+from simulation import replay
+
 logger = get_logger(__name__)
 
 
@@ -70,9 +73,14 @@ def simulate_table(host: str):
     return {"table_id": table_id, "rows": rows}
 
 
+def _speed(value: str):
+    return None if value == "max" else float(value)
+
+
 def main():
     """
-    The main function that parses command-line arguments and initiates table simulation.
+    The main function that parses command-line arguments and initiates table simulation,
+    or the replay of a traffic log.
     """
     parser = argparse.ArgumentParser(
         description="Command-line program for interacting with DynaTable."
@@ -90,7 +98,38 @@ def main():
         "--host", type=str, required=True, help="URI to the host backend Django REST."
     )
 
+    parser.add_argument(
+        "--replay",
+        type=str,
+        help="Path of a traffic log to replay instead of simulating tables.",
+    )
+
+    parser.add_argument(
+        "--speed",
+        type=_speed,
+        default=1.0,
+        help="Replay speed relative to the recording, e.g. 1 or 10, or 'max'.",
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Number of requests the replay keeps in flight at most.",
+    )
+
     args = parser.parse_args()
+
+    if args.replay:
+        logger.info(f"HOST URI: {args.host}, Traffic log: {args.replay}")
+
+        start = time.perf_counter()
+        results = replay.replay(
+            replay.read_log(args.replay), args.host, args.speed, args.concurrency
+        )
+        replay.show(results, time.perf_counter() - start)
+        return
+
     logger.info(f"HOST URI: {args.host}, Number of tables: {args.tables}")
 
     for _ in range(args.tables):
@@ -0,0 +1,254 @@
+"""Replay of the API traffic recorded by TrafficRecorderMiddleware."""
+
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import msgpack
+import requests
+from dynatable.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Paths of the API that refer to a table, with its id
+TABLE_PATH = re.compile(r"^/api/table/(?P<table_id>[^/?]+)")
+
+# Percentiles of the latencies shown in a replay report
+PERCENTILES = [50, 90, 99]
+
+
+def read_log(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Reads the requests recorded to a traffic log.
+
+    Args:
+        path (str): The path of the log, see DYNATABLE_TRAFFIC_LOG.
+
+    Yields:
+        Dict[str, Any]: The recorded requests, in the order they were recorded.
+    """
+    with open(path, "rb") as log:
+        yield from msgpack.Unpacker(log, raw=False)
+
+
+def endpoint(method: str, path: str) -> str:
+    """
+    Names the endpoint of a request, with the table id and query string left out.
+
+    Example:
+        endpoint("GET", "/api/table/2PCYdAwfB3iPvchWbj5DmY/rows?stream=true")
+        # Returns "GET /api/table/<table_id>/rows".
+    """
+    path = TABLE_PATH.sub("/api/table/<table_id>", path.split("?")[0])
+    return f"{method} {path}"
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """
+    Returns the nearest-rank percentile of a list of values.
+    """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+class _TableIds:
+    """
+    Maps the ids of tables created in the recording to those created by the replay.
+
+    Requests to a table created in the recording wait until the replay has created it.
+    Tables that existed before the recording started keep their ids, so the replayed
+    instance should start from a copy of the recorded one's tables.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], timeout: float):
+        self.timeout = timeout
+        self.created = {
+            record["r"]: threading.Event() for record in records if "r" in record
+        }
+        self.ids: Dict[str, str] = {}
+
+    def resolve(self, path: str) -> str:
+        match = TABLE_PATH.match(path)
+        if match is None or match["table_id"] not in self.created:
+            return path
+
+        recorded = match["table_id"]
+        self.created[recorded].wait(self.timeout)
+        return path.replace(recorded, self.ids.get(recorded, recorded), 1)
+
+    def create(self, recorded: str, table_id: Optional[str]):
+        self.ids[recorded] = table_id or recorded
+        self.created[recorded].set()
+
+
+def replay(
+    records: Iterable[Dict[str, Any]],
+    host: str,
+    speed: Optional[float] = 1.0,
+    concurrency: int = 8,
+    timeout: float = 30,
+) -> List[Dict[str, Any]]:
+    """
+    Replays recorded requests against a DynaTable instance.
+
+    Requests are sent at their recorded offsets from the first request divided by
+    'speed', so 1 reproduces the recorded load shape, 10 compresses it ten times and
+    None sends every request as soon as one of the 'concurrency' clients is free.
+    Tables created during the recording are created again and requests to them are
+    sent to the new tables. Requests are sent with their recorded content type and
+    headers, so the views encode, compress and defer their responses as they did.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): The recorded requests, see `read_log`.
+        host (str): The URI of the DynaTable backend, e.g. 'http://localhost:8000'.
+        speed (Optional[float]): The replay speed relative to the recording. Defaults
+                                 to 1.0; None replays at maximum speed.
+        concurrency (int): The number of requests in flight at most. Defaults to 8.
+        timeout (float): The number of seconds to wait for a response. Defaults to 30.
+
+    Returns:
+        List[Dict[str, Any]]: A result per request: its 'endpoint', the 'recorded' and
+                              'replayed' latency in seconds, the 'recorded_status' and
+                              'status' (None if the request failed) and 'lag', how late
+                              it was sent compared to its schedule.
+
+    Example:
+        results = replay(read_log("traffic.log"), "http://localhost:8000", speed=10)
+    """
+    records = sorted(records, key=lambda record: record["t"])
+    if not records:
+        return []
+
+    host = host.rstrip("/")
+    table_ids = _TableIds(records, timeout)
+    sessions = threading.local()
+    first = records[0]["t"]
+    start = time.perf_counter()
+
+    def send(record: Dict[str, Any]) -> Dict[str, Any]:
+        scheduled = (record["t"] - first) / speed if speed else 0.0
+        delay = scheduled - (time.perf_counter() - start)
+        if delay > 0:
+            time.sleep(delay)
+
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+
+        path = table_ids.resolve(record["p"])
+        # Headers the recording was made without are not sent either, rather than
+        # the defaults of requests, which would e.g. ask for compressed exports
+        headers = {"Accept": None, "Accept-Encoding": None, **record.get("h", {})}
+        if record.get("c"):
+            headers["Content-Type"] = record["c"]
+        sent = time.perf_counter()
+
+        try:
+            response = sessions.session.request(
+                record["m"],
+                host + path,
+                data=record["b"],
+                headers=headers,
+                timeout=timeout,
+            )
+            status = response.status_code
+        except requests.RequestException as err:
+            logger.error(f"Replay of {record['m']} {path} failed: {err}")
+            response, status = None, None
+
+        replayed = time.perf_counter() - sent
+
+        if "r" in record:
+            created = response.json()["table_id"] if status == 201 else None
+            table_ids.create(record["r"], created)
+
+        return {
+            "endpoint": endpoint(record["m"], record["p"]),
+            "recorded": record["d"],
+            "replayed": replayed,
+            "recorded_status": record["s"],
+            "status": status,
+            "lag": max(sent - start - scheduled, 0.0),
+        }
+
+    logger.info(
+        f"Replaying {len(records)} requests against {host} "
+        f"at {f'{speed}x' if speed else 'maximum'} speed with {concurrency} clients"
+    )
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(send, records))
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Compares the replayed latencies with the recorded ones, per endpoint.
+
+    Args:
+        results (List[Dict[str, Any]]): The results of `replay`.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per endpoint, the number of requests 'count', the
+                                   number of 'mismatches' of the response status, and
+                                   the 'recorded' and 'replayed' latency percentiles
+                                   and their 'delta', in milliseconds.
+    """
+    endpoints: Dict[str, List[Dict[str, Any]]] = {}
+    for result in results:
+        endpoints.setdefault(result["endpoint"], []).append(result)
+
+    summary = {}
+    for name, group in sorted(endpoints.items()):
+        recorded = [result["recorded"] * 1000 for result in group]
+        replayed = [result["replayed"] * 1000 for result in group]
+
+        summary[name] = {
+            "count": len(group),
+            "mismatches": sum(
+                result["status"] != result["recorded_status"] for result in group
+            ),
+            "recorded": {p: percentile(recorded, p) for p in PERCENTILES},
+            "replayed": {p: percentile(replayed, p) for p in PERCENTILES},
+        }
+        summary[name]["delta"] = {
+            p: summary[name]["replayed"][p] - summary[name]["recorded"][p]
+            for p in PERCENTILES
+        }
+
+    return summary
+
+
+def show(results: List[Dict[str, Any]], elapsed: float):
+    """
+    Prints a report of a replay.
+
+    Example:
+        A sample output might look like this:
+
+            =========================
+            Replayed 1200 requests in 12.31s (97.5 req/s), max lag 3.2 ms
+              POST /api/table/<table_id>/row: 800 requests, 0 status mismatches
+                p50: recorded 4.10 ms, replayed 3.90 ms, delta -0.20 ms
+                ...
+    """
+    lag = max((result["lag"] for result in results), default=0.0) * 1000
+
+    print(
+        f"{'=' * 25}\nReplayed {len(results)} requests in {elapsed:.2f}s "
+        f"({len(results) / elapsed if elapsed else 0:.1f} req/s), max lag {lag:.1f} ms"
+    )
+
+    for name, stats in summarize(results).items():
+        print(
+            f"  {name}: {stats['count']} requests, "
+            f"{stats['mismatches']} status mismatches"
+        )
+
+        for p in PERCENTILES:
+            print(
+                f"    p{p}: recorded {stats['recorded'][p]:.2f} ms, "
+                f"replayed {stats['replayed'][p]:.2f} ms, "
+                f"delta {stats['delta'][p]:+.2f} ms"
+            )
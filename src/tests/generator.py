@@ -13,6 +13,8 @@ consistent and realistic dummy data creation across different instances and usag
 Included Generators:
     - ModelFieldsGenerator: Generates random model fields based on data specifications
       in 'data.json', useful for creating dynamic models.
+    - BulkRowGenerator: Generates whole columns of rows at once with NumPy from a seed,
+      useful for large benchmark fixtures written to CSV/NDJSON or copied into a table.
 
 Usage:
     >> from this_module import generator
@@ -20,6 +22,8 @@ Usage:
     # Generates 8 sets of model fields.
     >> model_fields = generator.model_fields_generator.one()
     # Generates 1 set of model fields
+    >> model_fields.bulk_row_generator(seed=42).write_csv(f, 10_000_000)
+    # Writes 10M rows matching the model fields to a CSV file
 
 Note:
     This module is particularly useful in testing environments where mock data closely
@@ -31,10 +35,14 @@ __version__ = "0.0.1"
 __author__ = "Mateusz Solnica (blooser@protonmail.com)"
 
 
+import io
 import json
 import pathlib
 import random
 from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, TextIO
+
+import numpy as np
 
 
 def _remove_duplicates(dict_list, key):
@@ -149,6 +157,13 @@ class GeneratedModelFields(list):
         """
         return ModelRowGenerator(self)
 
+    def bulk_row_generator(self, seed: Optional[int] = None):
+        """
+        Returns a BulkRowGenerator instance for generating many rows matching the model
+        fields, reproducibly for a given seed.
+        """
+        return BulkRowGenerator(self, seed)
+
 
 class ModelFieldsGenerator(Generator):
     """
@@ -225,11 +240,14 @@ class ModelRowGenerator(Generator):
         Returns:
             Any: A random value appropriate for the given field type.
         """
-        return {
-            "string": self.random("name"),
-            "number": random.randint(1, 100),
-            "boolean": random.choice([True, False]),
-        }[field_type]
+        if field_type == "string":
+            return self.random("name")
+        if field_type == "number":
+            return random.randint(1, 100)
+        if field_type == "boolean":
+            return random.choice([True, False])
+
+        raise KeyError(field_type)
 
     def generate(self):
         """
@@ -244,6 +262,258 @@ class ModelRowGenerator(Generator):
         }
 
 
+# Text of the generated values, looked up by value instead of formatted one by one
+NUMBER_TEXT = np.array([str(value) for value in range(101)], dtype=object)
+BOOLEAN_TEXT = np.array(["false", "true"], dtype=object)
+
+
+def _csv_quote(value: str) -> str:
+    if any(char in value for char in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+class BulkRowGenerator:
+    """
+    Generates large numbers of rows matching generated model fields, column by column.
+
+    Where ModelRowGenerator draws every value with a Python-level call, this generator
+    draws a whole column of a batch with a single NumPy call and formats it with array
+    operations, which makes fixtures of millions of rows practical. Values follow the
+    same distributions: names from 'data.json' for 'string' fields, integers from 1 to
+    100 for 'number' fields and booleans.
+
+    Every column draws from its own stream spawned from the seed, so the same seed
+    yields the same rows whatever the batch size.
+
+    Args:
+        generated_model (GeneratedModelFields): The generated model fields to base the
+                                                rows on.
+        seed (Optional[int]): The seed of the generated values. Defaults to None, which
+                              draws fresh values on every run.
+
+    Example:
+        fields = generator.model_fields_generator.one()
+        rows = fields.bulk_row_generator(seed=42).rows(1000)
+        # Generates the same 1000 rows on every run.
+    """
+
+    def __init__(
+        self, generated_model: GeneratedModelFields, seed: Optional[int] = None
+    ):
+        self.generated_model = generated_model
+        self.seed = seed
+        self.names = np.array(_load()["name"], dtype=object)
+
+    def _streams(self) -> List[np.random.Generator]:
+        children = np.random.SeedSequence(self.seed).spawn(len(self.generated_model))
+        return [np.random.default_rng(child) for child in children]
+
+    def _draw(self, stream: np.random.Generator, field_type: str, n: int) -> np.ndarray:
+        if field_type == "string":
+            return stream.integers(0, len(self.names), n, dtype=np.int64)
+        if field_type == "number":
+            return stream.integers(1, 101, n, dtype=np.int64)
+        if field_type == "boolean":
+            return stream.integers(0, 2, n, dtype=np.int64).astype(bool)
+
+        raise KeyError(field_type)
+
+    def batches(
+        self, n: int, batch_size: int = 100_000
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Generates the columns of 'n' rows in batches.
+
+        Values of 'string' fields are kept as indexes into the generator's names, see
+        `column_values` to resolve them.
+
+        Args:
+            n (int): The number of rows to generate.
+            batch_size (int): The number of rows per batch. Defaults to 100000.
+
+        Yields:
+            Dict[str, np.ndarray]: A column per field name, of up to 'batch_size' rows.
+        """
+        streams = self._streams()
+
+        for start in range(0, n, batch_size):
+            size = min(batch_size, n - start)
+            yield {
+                field["name"]: self._draw(stream, field["type"], size)
+                for field, stream in zip(self.generated_model, streams)
+            }
+
+    def column_values(self, field_type: str, column: np.ndarray) -> np.ndarray:
+        """
+        Resolves a generated column to its values.
+        """
+        return self.names[column] if field_type == "string" else column
+
+    def columns(self, n: int) -> Dict[str, np.ndarray]:
+        """
+        Generates the columns of 'n' rows at once.
+
+        Args:
+            n (int): The number of rows to generate.
+
+        Returns:
+            Dict[str, np.ndarray]: The values of each field, by field name.
+        """
+        columns = next(self.batches(n, max(n, 1)), {})
+        return {
+            field["name"]: self.column_values(field["type"], columns[field["name"]])
+            for field in self.generated_model
+            if field["name"] in columns
+        }
+
+    def rows(self, n: int) -> List[dict]:
+        """
+        Generates 'n' rows as dictionaries, like `ModelRowGenerator.many`.
+
+        Args:
+            n (int): The number of rows to generate.
+
+        Returns:
+            list of dict: The generated rows.
+        """
+        columns = self.columns(n)
+        names = list(columns)
+        return [
+            dict(zip(names, values))
+            for values in zip(*(column.tolist() for column in columns.values()))
+        ]
+
+    def _text(
+        self, n: int, batch_size: int, names: np.ndarray, prefixes: dict, end: str
+    ) -> Iterator[str]:
+        """
+        Formats batches of generated rows as text, a line per row.
+
+        Cells of a field are its encoded values, 'names' for 'string' fields, preceded
+        by the field's prefix and separated by commas; lines finish with 'end'.
+        """
+        for batch in self.batches(n, batch_size):
+            lines = None
+            for field in self.generated_model:
+                column = batch[field["name"]]
+
+                if field["type"] == "string":
+                    cells = names[column]
+                elif field["type"] == "boolean":
+                    cells = BOOLEAN_TEXT[column.astype(np.int64)]
+                else:
+                    cells = NUMBER_TEXT[column]
+
+                cells = prefixes.get(field["name"], "") + cells
+                lines = cells if lines is None else lines + "," + cells
+
+            if lines is not None:
+                yield "".join((lines + end).tolist())
+
+    def _csv(self, n: int, batch_size: int) -> Iterator[str]:
+        names = np.array([_csv_quote(name) for name in self.names], dtype=object)
+        return self._text(n, batch_size, names, {}, "\n")
+
+    def write_csv(
+        self, file: TextIO, n: int, batch_size: int = 100_000, header: bool = True
+    ) -> int:
+        """
+        Writes 'n' generated rows to a CSV file.
+
+        Args:
+            file (TextIO): The file to write to.
+            n (int): The number of rows to generate.
+            batch_size (int): The number of rows formatted at once. Defaults to 100000.
+            header (bool): Whether to start with a header of the field names. Defaults
+                           to True.
+
+        Returns:
+            int: The number of rows written.
+
+        Example:
+            with open("fixture.csv", "w") as f:
+                fields.bulk_row_generator(seed=42).write_csv(f, 10_000_000)
+        """
+        if header:
+            names = [_csv_quote(field["name"]) for field in self.generated_model]
+            file.write(",".join(names) + "\n")
+
+        for text in self._csv(n, batch_size):
+            file.write(text)
+
+        return n
+
+    def write_ndjson(self, file: TextIO, n: int, batch_size: int = 100_000) -> int:
+        """
+        Writes 'n' generated rows to a newline-delimited JSON file, an object per line.
+
+        Args:
+            file (TextIO): The file to write to.
+            n (int): The number of rows to generate.
+            batch_size (int): The number of rows formatted at once. Defaults to 100000.
+
+        Returns:
+            int: The number of rows written.
+
+        Example:
+            with open("fixture.ndjson", "w") as f:
+                fields.bulk_row_generator(seed=42).write_ndjson(f, 10_000_000)
+        """
+        names = np.array([json.dumps(name) for name in self.names], dtype=object)
+        prefixes = {
+            field["name"]: ("{" if i == 0 else "") + json.dumps(field["name"]) + ":"
+            for i, field in enumerate(self.generated_model)
+        }
+
+        for text in self._text(n, batch_size, names, prefixes, "}\n"):
+            file.write(text)
+
+        return n
+
+    def copy_to_table(self, table_id: str, n: int, batch_size: int = 100_000) -> int:
+        """
+        Streams 'n' generated rows into a dynamic table with COPY.
+
+        Each batch is formatted as CSV and sent with `COPY ... FROM STDIN` to the
+        database the table is written to, so no model instance is created per row.
+
+        Args:
+            table_id (str): The identifier of the table, whose columns match the model
+                            fields.
+            n (int): The number of rows to generate.
+            batch_size (int): The number of rows per COPY. Defaults to 100000.
+
+        Returns:
+            int: The number of rows copied.
+
+        Example:
+            table_id = tables.create_table(fields)
+            fields.bulk_row_generator(seed=42).copy_to_table(table_id, 10_000_000)
+        """
+        from django.db import connections, router, transaction
+        from dynatablebackend.db.util import get_dynamic_model
+
+        DynamicModel = get_dynamic_model(table_id)
+        using = router.db_for_write(DynamicModel)
+        quote = connections[using].ops.quote_name
+
+        columns = ", ".join(
+            quote(DynamicModel._meta.get_field(field["name"]).column)
+            for field in self.generated_model
+        )
+        sql = (
+            f"COPY {quote(DynamicModel._meta.db_table)} ({columns}) "
+            "FROM STDIN (FORMAT csv)"
+        )
+
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            for text in self._csv(n, batch_size):
+                cursor.copy_expert(sql, io.StringIO(text))
+
+        return n
+
+
 class _generator:
     """
     A wrapper class for various data generators.
@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+
+import pytest
+from dynatablebackend import admission
+from dynatablebackend.db import tables
+from rest_framework.test import APIClient
+
+FIELDS = [{"name": "name", "type": "string"}]
+
+
+@pytest.fixture(autouse=True)
+def gates(monkeypatch):
+    monkeypatch.setattr(admission, "_gates", OrderedDict())
+    monkeypatch.setattr(
+        admission,
+        "_retired",
+        {"admitted": 0, "rejected": {"rate": 0, "concurrency": 0}},
+    )
+
+
+def _limits(settings, kind: str, concurrency: int = 0, rate: float = 0, burst: int = 0):
+    settings.DYNATABLE_ADMISSION_LIMITS = {
+        **settings.DYNATABLE_ADMISSION_LIMITS,
+        kind: {"concurrency": concurrency, "rate": rate, "burst": burst},
+    }
+
+
+@pytest.mark.parametrize(
+    "rate, burst, admitted, retry_after",
+    [(1, 3, 3, 1.0), (0.5, 0, 1, 2.0), (4, 2, 2, 0.25)],
+)
+def test_token_bucket_admits_burst_then_reports_wait(
+    rate, burst, admitted, retry_after
+):
+    bucket = admission.TokenBucket(rate, burst)
+
+    assert [bucket.take() for _ in range(admitted)] == [0.0] * admitted
+    assert bucket.take() == pytest.approx(retry_after, rel=0.01)
+
+
+def test_gate_queues_requests_until_a_slot_frees_up():
+    gate = admission.Gate(concurrency=1, rate=0, burst=0)
+    gate.enter(timeout=1)
+
+    entered = threading.Event()
+
+    def enter():
+        gate.enter(timeout=5)
+        entered.set()
+
+    waiter = threading.Thread(target=enter)
+    waiter.start()
+
+    while gate.queued == 0:
+        pass
+    assert gate.report()["in_flight"] == 1
+
+    gate.leave()
+    waiter.join(5)
+
+    assert entered.is_set()
+    assert gate.report() == {
+        "in_flight": 1,
+        "queued": 0,
+        "admitted": 2,
+        "rejected": {"rate": 0, "concurrency": 0},
+    }
+
+
+def test_gate_rejects_requests_waiting_too_long():
+    gate = admission.Gate(concurrency=1, rate=0, burst=0)
+    gate.enter(timeout=1)
+
+    with pytest.raises(admission.Rejected) as rejection:
+        gate.enter(timeout=0.05)
+
+    assert rejection.value.reason == "concurrency"
+    assert rejection.value.retry_after == 1
+    assert gate.report()["rejected"]["concurrency"] == 1
+
+
+@pytest.mark.django_db
+def test_rate_limited_writes_get_429_with_retry_after(settings):
+    _limits(settings, "write", rate=0.5, burst=2)
+    client = APIClient()
+    table_id = tables.create_table(FIELDS)
+    other_id = tables.create_table(FIELDS)
+
+    for name in ["Anna", "Matt"]:
+        response = client.post(f"/api/table/{table_id}/row", {"name": name})
+        assert response.status_code == 201
+
+    response = client.post(f"/api/table/{table_id}/row", {"name": "Olga"})
+    assert response.status_code == 429
+    assert response["Retry-After"] == "2"
+    assert "rate limit" in response.json()["message"]
+
+    # Other tables and reads are not held back
+    assert (
+        client.post(f"/api/table/{other_id}/row", {"name": "Olga"}).status_code == 201
+    )
+    assert client.get(f"/api/table/{table_id}/rows").status_code == 200
+
+    report = client.get("/api/worker/admission").json()
+
+    assert report["rejected"] == {"rate": 1, "concurrency": 0}
+    assert report["admitted"] == 3
+    assert report["tables"][table_id]["write"] == {
+        "in_flight": 0,
+        "queued": 0,
+        "admitted": 2,
+        "rejected": {"rate": 1, "concurrency": 0},
+    }
+    assert "read" not in report["tables"][table_id]
+
+
+@pytest.mark.django_db
+def test_admission_forgets_idle_gates_keeping_totals(settings):
+    _limits(settings, "read", concurrency=4)
+    settings.DYNATABLE_ADMISSION_MAX_GATES = 2
+
+    for table_id in ["A", "B", "C", "D"]:
+        admission.admit(table_id, "read").leave()
+
+    report = admission.admission_report()
+
+    assert list(report["tables"]) == ["C", "D"]
+    assert report["admitted"] == 4
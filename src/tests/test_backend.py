@@ -1,4 +1,11 @@
+import gzip
+import json
+
+import msgpack
+import pyarrow as pa
 import pytest
+import zstandard
+from django.db import connection
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -38,7 +45,7 @@ def test_create_table(api_client, fields):
 @pytest.mark.django_db
 def test_create_table_validates_data_and_does_not_allow_incorrect_payload(api_client):
     url = "/api/table"
-    data = [{"name": "email", "type": "string"}, {"name": "age", "type": "integer"}]
+    data = [{"name": "email", "type": "string"}, {"name": "age", "type": "list"}]
 
     response = api_client.post(url, data, format="json")
 
@@ -266,3 +273,677 @@ def test_get_table_rows(api_client, fields):
 
     for column in row:
         assert row[column] == db_row[column]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_get_table_rows_negotiates_msgpack(api_client, fields):
+    url = "/api/table"
+
+    response = api_client.post(url, fields, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/row"
+    row = fields.row_generator.one()
+    response = api_client.post(url, row, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{table_id}/rows"
+    response = api_client.get(url, HTTP_ACCEPT="application/msgpack")
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/msgpack"
+
+    data = msgpack.unpackb(response.content)
+    assert data["table_id"] == table_id
+    assert len(data["rows"]) == 1
+
+    for column in row:
+        assert row[column] == data["rows"][0][column]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_get_table_rows_streams_rows(api_client, fields):
+    url = "/api/table"
+
+    response = api_client.post(url, fields, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/row"
+    rows = fields.row_generator.many()
+    for row in rows:
+        response = api_client.post(url, row, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{table_id}/rows?stream=true"
+    response = api_client.get(url, HTTP_ACCEPT="application/json")
+    assert response.status_code == status.HTTP_200_OK
+
+    data = json.loads(b"".join(response.streaming_content))
+    assert data["table_id"] == table_id
+    assert len(data["rows"]) == len(rows)
+
+    for row, db_row in zip(rows, data["rows"]):
+        for column in row:
+            assert row[column] == db_row[column]
+
+
+@pytest.mark.django_db
+def test_get_table_rows_handle_non_existing_table_id(api_client):
+    url = "/api/table/hj40935jh03/rows"
+
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_export_table_streams_arrow(api_client, fields):
+    url = "/api/table"
+
+    response = api_client.post(url, fields, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/row"
+    rows = fields.row_generator.many()
+    for row in rows:
+        response = api_client.post(url, row, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{table_id}/export.arrow"
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/vnd.apache.arrow.stream"
+
+    db_rows = (
+        pa.ipc.open_stream(b"".join(response.streaming_content)).read_all().to_pylist()
+    )
+    assert len(db_rows) == len(rows)
+
+
+@pytest.mark.django_db
+def test_export_table_handle_unsupported_format(api_client):
+    url = "/api/table"
+    data = [{"name": "email", "type": "string"}]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/export.xlsx"
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "accept_encoding, content_encoding",
+    [
+        ("", None),
+        ("gzip, deflate", "gzip"),
+        ("gzip, zstd", "zstd"),
+        ("zstd;q=0, gzip", "gzip"),
+    ],
+)
+def test_export_table_streams_compressed_csv(
+    api_client, accept_encoding, content_encoding
+):
+    url = "/api/table"
+    data = [{"name": "email", "type": "string"}, {"name": "age", "type": "number"}]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/row"
+    response = api_client.post(url, {"email": "a@b.c", "age": 3}, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{table_id}/export.csv"
+    response = api_client.get(url, HTTP_ACCEPT_ENCODING=accept_encoding)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.get("Content-Encoding") == content_encoding
+
+    content = b"".join(response.streaming_content)
+    if content_encoding == "gzip":
+        content = gzip.decompress(content)
+    elif content_encoding == "zstd":
+        content = zstandard.ZstdDecompressor().decompressobj().decompress(content)
+
+    assert content == b"id,email,age\n1,a@b.c,3\n"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("partition_size", ["0", "-1", "abc"])
+def test_create_table_validates_partition_size(api_client, partition_size):
+    url = f"/api/table?partition_size={partition_size}"
+    data = [{"name": "email", "type": "string"}]
+
+    response = api_client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_create_table_creates_partitioned_table(api_client):
+    url = "/api/table?partition_size=1000&partition_key=age"
+    data = [{"name": "email", "type": "string"}, {"name": "age", "type": "number"}]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/row"
+    response = api_client.post(url, {"email": "a@b.c", "age": 3}, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+@pytest.mark.django_db
+def test_update_table_rows_returns_affected_row_count(api_client):
+    url = "/api/table"
+    data = [{"name": "email", "type": "string"}, {"name": "age", "type": "number"}]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/row"
+    for age in (10, 20, 30):
+        response = api_client.post(url, {"email": "a@b.c", "age": age}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{table_id}/rows"
+    data = {"filter": {"age__lt": 25}, "values": {"email": "x@y.z"}}
+    response = api_client.patch(url, data, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["count"] == 2
+
+    data = {"filter": {"age": 10}}
+    response = api_client.patch(url, data, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_delete_table_rows_returns_affected_row_count(api_client):
+    url = "/api/table"
+    data = [{"name": "email", "type": "string"}, {"name": "age", "type": "number"}]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/row"
+    for age in (10, 20, 30):
+        response = api_client.post(url, {"email": "a@b.c", "age": age}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{table_id}/rows"
+    response = api_client.delete(url, {}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client.delete(url, {"filter": {"age__gt": 15}}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["count"] == 2
+
+    response = api_client.get(url, format="json")
+    assert len(response.json()["rows"]) == 1
+
+
+@pytest.mark.django_db
+def test_upsert_table_rows_does_not_duplicate_rows(api_client):
+    url = "/api/table"
+    data = [
+        {"name": "email", "type": "string", "key": True},
+        {"name": "age", "type": "number"},
+    ]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/rows"
+    rows = [{"email": "a@b.c", "age": 1}, {"email": "d@e.f", "age": 2}]
+    for _ in range(3):
+        response = api_client.put(url, rows, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["count"] == 2
+
+    response = api_client.get(url, format="json")
+    assert len(response.json()["rows"]) == 2
+
+    response = api_client.put(url, {"email": "a@b.c"}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_get_table_rows_searches_rows(api_client):
+    url = "/api/table"
+    data = [{"name": "email", "type": "string", "search": True}]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/row"
+    for email in ("anna@example.com", "matt@example.com"):
+        response = api_client.post(url, {"email": email}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{table_id}/rows?q=anna@example.com"
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert [row["email"] for row in response.json()["rows"]] == ["anna@example.com"]
+
+
+@pytest.mark.django_db
+def test_get_table_rows_does_not_search_table_without_searchable_columns(api_client):
+    url = "/api/table"
+    data = [{"name": "email", "type": "string"}]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/rows?q=anna"
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_count_table_rows(api_client):
+    url = "/api/table"
+    data = [{"name": "email", "type": "string"}]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/row"
+    for email in ("anna@example.com", "matt@example.com"):
+        response = api_client.post(url, {"email": email}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{table_id}/count?mode=exact"
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"table_id": table_id, "count": 2, "exact": True}
+
+    url = f"/api/table/{table_id}/count?mode=estimate"
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["exact"] is False
+
+    url = f"/api/table/{table_id}/rows?count=exact"
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == {"count": 2, "exact": True}
+
+    url = f"/api/table/{table_id}/count?mode=precise"
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    url = "/api/table/missing/count"
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_worker_memory_reports_memory_usage(api_client):
+    url = "/api/table"
+    data = [{"name": "email", "type": "string"}]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    url = "/api/worker/memory"
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["resident_models"] >= 1
+
+
+@pytest.mark.django_db
+def test_explain_table_rows_returns_plan_of_rows_query(api_client, settings):
+    settings.DEBUG = True
+
+    url = "/api/table"
+    data = [{"name": "email", "type": "string", "search": True}]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/row"
+    response = api_client.post(url, {"email": "anna@example.com"}, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{table_id}/explain?q=anna@example.com"
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_200_OK
+
+    data = response.json()
+    assert data["table_id"] == table_id
+    assert data["database"] == "default"
+    assert data["sql"].startswith("SELECT")
+    assert data["plan"][0]["Plan"]["Actual Rows"] == 1
+    assert "Shared Hit Blocks" in data["plan"][0]["Plan"]
+    assert "Execution Time" in data["plan"][0]
+
+    url = f"/api/table/{table_id}/explain?analyze=false"
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert "Actual Rows" not in response.json()["plan"][0]["Plan"]
+
+
+@pytest.mark.django_db
+def test_explain_table_rows_is_restricted_to_staff(api_client, django_user_model):
+    url = "/api/table"
+    data = [{"name": "email", "type": "string"}]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{response.json()['table_id']}/explain"
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    staff = django_user_model.objects.create_user("admin", is_staff=True)
+    api_client.force_authenticate(user=staff)
+
+    response = api_client.get(url, format="json")
+    assert response.status_code == status.HTTP_200_OK
+
+    response = api_client.get(f"{url}?q=anna", format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client.get("/api/table/missing/explain", format="json")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_get_table_stats_reports_storage_and_usage(api_client):
+    url = "/api/table"
+    data = [
+        {"name": "email", "type": "varchar", "max_length": 64, "key": True},
+        {"name": "bio", "type": "string"},
+    ]
+
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    table_id = response.json()["table_id"]
+
+    for number in range(20):
+        row = {"email": f"user{number}@example.com", "bio": "x" * 4000 * number}
+        response = api_client.post(f"/api/table/{table_id}/row", row, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE dynatablebackend_{table_id.lower()}")
+
+    response = api_client.get(f"/api/table/{table_id}/stats", format="json")
+    assert response.status_code == status.HTTP_200_OK
+
+    stats = response.json()
+    assert stats["table_id"] == table_id
+    assert stats["database"] == "default"
+    assert stats["table"] == f"dynatablebackend_{table_id.lower()}"
+    assert stats["rows"] == 20
+    assert stats["heap_bytes"] > 0
+    assert stats["index_bytes"] > 0
+    assert stats["toast_bytes"] > 0
+    assert stats["total_bytes"] == (
+        stats["heap_bytes"] + stats["index_bytes"] + stats["toast_bytes"]
+    )
+    assert stats["last_analyze"] is not None
+    assert {"seq_scan", "idx_scan", "n_dead_tup", "dead_ratio"} <= set(stats)
+    assert {index["name"] for index in stats["indexes"]} == {
+        f"dynatablebackend_{table_id.lower()}_pkey",
+        f"{table_id.lower()}_natural_key",
+    }
+    assert stats["columns"] == data
+
+    response = api_client.get("/api/table/missing/stats", format="json")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_list_table_stats_orders_and_limits_tables(api_client):
+    table_ids = []
+    for rows in [1, 3, 2]:
+        response = api_client.post(
+            "/api/table", [{"name": "name", "type": "string"}], format="json"
+        )
+        table_id = response.json()["table_id"]
+        table_ids.append(table_id)
+
+        for _ in range(rows):
+            response = api_client.post(
+                f"/api/table/{table_id}/row", {"name": "x" * 3000}, format="json"
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE dynatablebackend_{table_id.lower()}")
+
+    response = api_client.get("/api/tables/stats?order_by=rows", format="json")
+    assert response.status_code == status.HTTP_200_OK
+
+    listing = response.json()["tables"]
+    assert [stats["table_id"] for stats in listing if stats["table_id"]] == [
+        table_ids[1],
+        table_ids[2],
+        table_ids[0],
+    ]
+    assert "columns" not in listing[0]
+
+    response = api_client.get("/api/tables/stats?order_by=rows&limit=1")
+    assert [stats["table_id"] for stats in response.json()["tables"]] == [table_ids[1]]
+
+    response = api_client.get("/api/tables/stats?order_by=name", format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client.get("/api/tables/stats?limit=0", format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_clone_table_creates_table_with_copied_rows(api_client):
+    response = api_client.post(
+        "/api/table",
+        [{"name": "name", "type": "string"}, {"name": "age", "type": "integer"}],
+        format="json",
+    )
+    table_id = response.json()["table_id"]
+
+    for name, age in [("Matt", 20), ("Anna", 30)]:
+        response = api_client.post(
+            f"/api/table/{table_id}/row", {"name": name, "age": age}, format="json"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{table_id}/clone"
+    data = {"columns": ["name"], "filter": {"age__gt": 25}}
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["source_table_id"] == table_id
+    assert response.json()["count"] == 1
+
+    response = api_client.get(f"/api/table/{response.json()['table_id']}/rows")
+    assert response.json()["rows"] == [{"id": 2, "name": "Anna"}]
+
+    for data in [{"columns": "name"}, {"filter": ["age"]}, ["name"]]:
+        response = api_client.post(url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client.post("/api/table/missing/clone", {}, format="json")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db(transaction=True)
+def test_table_snapshots_are_read_only_copies(api_client):
+    response = api_client.post(
+        "/api/table", [{"name": "name", "type": "string"}], format="json"
+    )
+    table_id = response.json()["table_id"]
+
+    url = f"/api/table/{table_id}/snapshots"
+    assert api_client.get(url).json() == {"table_id": table_id, "snapshots": []}
+
+    api_client.post(f"/api/table/{table_id}/row", {"name": "Matt"}, format="json")
+    response = api_client.post(url)
+    assert response.status_code == status.HTTP_201_CREATED
+    snapshot = response.json()
+
+    api_client.post(f"/api/table/{table_id}/row", {"name": "Anna"}, format="json")
+    response = api_client.post(url)
+    assert response.json()["count"] == 2
+
+    snapshots = api_client.get(url).json()["snapshots"]
+    assert [item["rows"] for item in snapshots] == [1, 2]
+    assert snapshots[0]["table_id"] == snapshot["table_id"]
+
+    snapshot_url = f"/api/table/{snapshot['table_id']}"
+    rows = [{"id": 1, "name": "Matt"}]
+    assert api_client.get(f"{snapshot_url}/rows").json()["rows"] == rows
+
+    response = api_client.post(f"{snapshot_url}/row", {"name": "Olga"}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client.delete(f"{snapshot_url}/rows", {"filter": {}}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client.put(
+        snapshot_url, [{"name": "age", "type": "integer"}], format="json"
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.get(f"{snapshot_url}/rows").json()["rows"] == rows
+
+
+@pytest.mark.django_db(transaction=True)
+def test_update_table_structure_rejects_snapshots(api_client):
+    response = api_client.post(
+        "/api/table", [{"name": "name", "type": "string"}], format="json"
+    )
+    table_id = response.json()["table_id"]
+    snapshot_id = api_client.post(f"/api/table/{table_id}/snapshots").json()["table_id"]
+
+    response = api_client.put(
+        f"/api/table/{snapshot_id}", [{"name": "age", "type": "integer"}], format="json"
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "read-only snapshot" in response.json()["message"]
+
+    response = api_client.get(f"/api/table/{snapshot_id}/schema")
+    assert list(response.json()["schema"]["properties"]) == ["id", "name"]
+
+
+@pytest.mark.django_db
+def test_get_table_rows_expands_reference_columns(api_client):
+    response = api_client.post(
+        "/api/table", [{"name": "name", "type": "string"}], format="json"
+    )
+    person_id = response.json()["table_id"]
+    api_client.post(f"/api/table/{person_id}/row", {"name": "Anna"}, format="json")
+
+    columns = [
+        {"name": "title", "type": "string"},
+        {"name": "author", "type": "reference", "table": person_id},
+    ]
+    response = api_client.post("/api/table", columns, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    book_id = response.json()["table_id"]
+
+    row = {"title": "Poems", "author": 1}
+    response = api_client.post(f"/api/table/{book_id}/row", row, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+
+    url = f"/api/table/{book_id}/rows"
+    assert api_client.get(url).json()["rows"] == [{"id": 1, **row}]
+
+    response = api_client.get(f"{url}?expand=author")
+    assert response.json()["rows"] == [
+        {"id": 1, "title": "Poems", "author": {"id": 1, "name": "Anna"}}
+    ]
+
+    response = api_client.get(f"{url}?expand=title")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    columns = [{"name": "author", "type": "reference", "table": "missing"}]
+    response = api_client.post("/api/table", columns, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client.post(
+        "/api/table", [{"name": "title", "type": "string"}], format="json"
+    )
+    response = api_client.put(
+        f"/api/table/{response.json()['table_id']}", columns, format="json"
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_get_table_rows_sorts_and_pages_rows(api_client):
+    columns = [{"name": "name", "type": "string"}, {"name": "age", "type": "integer"}]
+    response = api_client.post("/api/table", columns, format="json")
+    table_id = response.json()["table_id"]
+
+    for name, age in [("Matt", 30), ("Anna", 25), ("Olga", 30)]:
+        row = {"name": name, "age": age}
+        api_client.post(f"/api/table/{table_id}/row", row, format="json")
+
+    url = f"/api/table/{table_id}/rows?order_by=-age,name&limit=2"
+    data = api_client.get(url).json()
+    assert [row["name"] for row in data["rows"]] == ["Matt", "Olga"]
+    assert "No index" in data["hint"]
+
+    data = api_client.get(f"{url}&after={data['next']}").json()
+    assert [row["name"] for row in data["rows"]] == ["Anna"]
+    assert data["next"] is None
+
+    data = api_client.get(f"/api/table/{table_id}/rows?order_by=-id").json()
+    assert [row["id"] for row in data["rows"]] == [3, 2, 1]
+    assert "hint" not in data and "next" not in data
+
+    for query in ["order_by=missing", "order_by=age&after=abc", "limit=0"]:
+        response = api_client.get(f"/api/table/{table_id}/rows?{query}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client.get(f"/api/table/{table_id}/rows?stream=true&order_by=x")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,217 @@
+import csv
+import datetime
+import decimal
+import gzip
+import io
+import uuid
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+import shortuuid
+import zstandard
+from dynatablebackend.db import export, tables, util
+
+from tests.generator import generator
+
+ARROW_TYPES = {"string": pa.utf8(), "number": pa.float64(), "boolean": pa.bool_()}
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_arrow_schema_maps_model_fields(fields):
+    model_types = util.to_model_types(fields)
+    DynamicModel = util.create_dynamic_model(shortuuid.uuid(), model_types)
+
+    schema = export.arrow_schema(DynamicModel)
+
+    assert schema.names == ["id"] + [field["name"] for field in fields]
+    assert schema.field("id").type == pa.int64()
+
+    for field in fields:
+        assert schema.field(field["name"]).type == ARROW_TYPES[field["type"]]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_iter_record_batches_splits_table_into_batches(fields):
+    table_id = tables.create_table(fields)
+
+    rows = fields.row_generator.many(7)
+    for row in rows:
+        assert tables.add_table_row(table_id, row)
+
+    batches = list(export.iter_record_batches(table_id, batch_size=3))
+
+    assert [batch.num_rows for batch in batches] == [3, 3, 1]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_stream_arrow_exports_table(fields):
+    table_id = tables.create_table(fields)
+
+    rows = fields.row_generator.many()
+    for row in rows:
+        assert tables.add_table_row(table_id, row)
+
+    data = b"".join(export.stream_arrow(table_id, batch_size=2))
+    db_rows = pa.ipc.open_stream(data).read_all().to_pylist()
+
+    assert len(rows) == len(db_rows)
+
+    for row, db_row in zip(rows, db_rows):
+        for field in row:
+            assert row[field] == db_row[field]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_stream_parquet_exports_table(fields):
+    table_id = tables.create_table(fields)
+
+    rows = fields.row_generator.many()
+    for row in rows:
+        assert tables.add_table_row(table_id, row)
+
+    data = b"".join(export.stream_parquet(table_id, batch_size=2))
+    db_rows = pq.read_table(io.BytesIO(data)).to_pylist()
+
+    assert len(rows) == len(db_rows)
+
+    for row, db_row in zip(rows, db_rows):
+        for field in row:
+            assert row[field] == db_row[field]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_stream_csv_exports_table(fields):
+    table_id = tables.create_table(fields)
+
+    rows = fields.row_generator.many(7)
+    for row in rows:
+        assert tables.add_table_row(table_id, row)
+
+    chunks = list(export.stream_csv(table_id, chunk_size=3))
+    assert len(chunks) == 1 + 3
+
+    header, *db_rows = csv.reader(io.StringIO(b"".join(chunks).decode("utf-8")))
+
+    assert header == ["id"] + [field["name"] for field in fields]
+    assert len(db_rows) == len(rows)
+
+    for row, db_row in zip(rows, db_rows):
+        for field, value in zip(header[1:], db_row[1:]):
+            if isinstance(row[field], bool):
+                assert value == ("t" if row[field] else "f")
+            elif isinstance(row[field], int):
+                assert float(value) == row[field]
+            else:
+                assert value == row[field]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "stream", [export.stream_arrow, export.stream_parquet, export.stream_csv]
+)
+def test_exports_choose_database_before_streaming(monkeypatch, stream):
+    table_id = tables.create_table([{"name": "name", "type": "string"}])
+    assert tables.add_table_row(table_id, {"name": "Matt"})
+
+    chosen = []
+    monkeypatch.setattr(
+        export.router,
+        "db_for_read",
+        lambda model, **hints: chosen.append(model) or "default",
+    )
+
+    chunks = stream(table_id)
+    assert len(chosen) == 1
+
+    assert b"".join(chunks)
+    assert len(chosen) == 1
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+def test_compress_compresses_chunks(encoding):
+    chunks = [b"id,name\n", b"1,Matt\n" * 100, b"2,Anna\n" * 100]
+
+    data = b"".join(export.compress(iter(chunks), encoding))
+
+    if encoding == "gzip":
+        assert gzip.decompress(data) == b"".join(chunks)
+    else:
+        assert zstandard.ZstdDecompressor().decompressobj().decompress(
+            data
+        ) == b"".join(chunks)
+
+
+@pytest.mark.django_db
+def test_stream_arrow_exports_compact_types():
+    fields = [
+        {"name": "count", "type": "smallint"},
+        {"name": "price", "type": "decimal", "max_digits": 8, "decimal_places": 2},
+        {"name": "day", "type": "date"},
+        {"name": "uid", "type": "uuid"},
+        {"name": "meta", "type": "jsonb"},
+    ]
+    table_id = tables.create_table(fields)
+
+    row = {
+        "count": 7,
+        "price": decimal.Decimal("19.99"),
+        "day": datetime.date(2024, 4, 1),
+        "uid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "meta": {"tags": ["a", "b"]},
+    }
+    assert tables.add_table_row(table_id, row)
+
+    table = pa.ipc.open_stream(b"".join(export.stream_arrow(table_id))).read_all()
+
+    assert table.schema.field("count").type == pa.int16()
+    assert table.schema.field("price").type == pa.decimal128(8, 2)
+    assert table.to_pylist()[0] == {
+        "id": table.to_pylist()[0]["id"],
+        "count": 7,
+        "price": decimal.Decimal("19.99"),
+        "day": datetime.date(2024, 4, 1),
+        "uid": "12345678-1234-5678-1234-567812345678",
+        "meta": '{"tags": ["a", "b"]}',
+    }
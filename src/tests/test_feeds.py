@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from dynatablebackend.db import feeds, tables, util
+from rest_framework.test import APIClient
+
+FIELDS = [{"name": "name", "type": "string"}, {"name": "age", "type": "integer"}]
+
+
+def _create_table_with_feed():
+    table_id = tables.create_table(FIELDS)
+    assert tables.enable_change_feed(table_id) == table_id
+    return table_id, util.get_dynamic_model(table_id)
+
+
+def _events(data: bytes):
+    events = []
+    for block in data.decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        if "event" in fields:
+            events.append((int(fields["id"]), fields["event"], fields["data"]))
+    return events
+
+
+@pytest.mark.django_db
+def test_read_changes_returns_changes_after_cursor():
+    table_id, DynamicModel = _create_table_with_feed()
+
+    assert tables.add_table_row(table_id, {"name": "Anna", "age": 30})
+    assert tables.add_table_row(table_id, {"name": "Matt", "age": 41})
+    assert tables.update_table_rows(table_id, {"name": "Anna"}, {"age": 31}) == 1
+    assert tables.delete_table_rows(table_id, {"name": "Matt"}) == 1
+
+    changes, cursor = feeds.read_changes(table_id, DynamicModel, 0)
+
+    assert [(change["op"], change["row"]) for change in changes] == [
+        ("insert", {"id": 1, "name": "Anna", "age": 31}),
+        ("update", {"id": 1, "name": "Anna", "age": 31}),
+        ("delete", {"id": 2}),
+    ]
+    assert cursor == changes[-1]["seq"] == 4
+
+    changes, _ = feeds.read_changes(table_id, DynamicModel, 2)
+    assert [change["seq"] for change in changes] == [3, 4]
+
+    assert feeds.read_changes(table_id, DynamicModel, 4) == ([], 4)
+
+
+@pytest.mark.django_db
+def test_read_changes_reports_pruned_changes(settings):
+    settings.DYNATABLE_CHANGE_FEED_RETENTION = 0
+    table_id, DynamicModel = _create_table_with_feed()
+
+    for name in ["Anna", "Matt", "Olga"]:
+        assert tables.add_table_row(table_id, {"name": name, "age": 30})
+
+    # Rows written in the same transaction share its timestamp, which is never older
+    # than now(), so the log is aged by hand
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {DynamicModel._meta.db_table}_feed "
+            "SET changed_at = changed_at - interval '1 hour' WHERE seq < 3"
+        )
+
+    feeds.prune(table_id, DynamicModel)
+
+    changes, cursor = feeds.read_changes(table_id, DynamicModel, 0)
+    assert [(change["seq"], change["op"]) for change in changes] == [
+        (2, "reset"),
+        (3, "insert"),
+    ]
+
+    changes, _ = feeds.read_changes(table_id, DynamicModel, 2)
+    assert [(change["seq"], change["op"]) for change in changes] == [(3, "insert")]
+
+
+@pytest.mark.django_db
+def test_update_table_keeps_change_feed():
+    table_id, DynamicModel = _create_table_with_feed()
+
+    assert tables.add_table_row(table_id, {"name": "Anna", "age": 30})
+    assert tables.delete_table_rows(table_id, {"name": "Anna"}) == 1
+    assert tables.update_table(table_id, [{"name": "email", "type": "string"}])
+
+    row = {"name": "Matt", "age": 41, "email": "matt@example.com"}
+    assert tables.add_table_row(table_id, row)
+
+    changes, _ = feeds.read_changes(table_id, util.get_dynamic_model(table_id), 0)
+    assert [(change["seq"], change["op"]) for change in changes] == [
+        (1, "insert"),
+        (2, "delete"),
+        (3, "insert"),
+    ]
+    assert changes[-1]["row"]["email"] == "matt@example.com"
+
+
+@pytest.mark.django_db
+def test_get_dynamic_model_restores_change_feed():
+    table_id, _ = _create_table_with_feed()
+
+    util.unregister_dynamic_model(table_id)
+    feeds.unregister(table_id)
+
+    assert util.get_dynamic_model(table_id) is not None
+    assert feeds.has_feed(table_id)
+
+
+@pytest.mark.django_db
+def test_table_changes_endpoint_catches_up_from_last_event_id():
+    client = APIClient()
+    table_id = tables.create_table(FIELDS)
+
+    response = client.get(f"/api/table/{table_id}/changes")
+    assert response.status_code == 400
+
+    response = client.post(f"/api/table/{table_id}/changes")
+    assert response.status_code == 201
+
+    assert tables.add_table_row(table_id, {"name": "Anna", "age": 30})
+    assert tables.add_table_row(table_id, {"name": "Matt", "age": 41})
+
+    response = client.get(
+        f"/api/table/{table_id}/changes",
+        HTTP_ACCEPT="text/event-stream",
+        HTTP_LAST_EVENT_ID="1",
+    )
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/event-stream"
+
+    data = b"".join(response.streaming_content)
+    assert data.startswith(b"retry: 1000\nid: 1\n\n")
+    assert _events(data) == [(2, "insert", '{"id":2,"name":"Matt","age":41}')]
+
+    response = client.get(f"/api/table/{table_id}/changes")
+    assert b"".join(response.streaming_content) == b"retry: 1000\nid: 2\n\n"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("cursor", ["-1", "abc"])
+def test_table_changes_endpoint_rejects_invalid_cursor(cursor):
+    client = APIClient()
+    table_id, _ = _create_table_with_feed()
+
+    response = client.get(f"/api/table/{table_id}/changes", {"cursor": cursor})
+    assert response.status_code == 400
+
+    response = client.get("/api/table/Unknown/changes")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_changes_pushes_committed_changes(settings):
+    settings.DYNATABLE_CHANGE_FEED_HEARTBEAT = 1
+    table_id, DynamicModel = _create_table_with_feed()
+
+    assert tables.add_table_row(table_id, {"name": "Anna", "age": 30})
+
+    async def follow():
+        stream = feeds.stream_changes(table_id, DynamicModel, 0)
+        try:
+            caught_up = await asyncio.wait_for(anext(stream), 5)
+            heartbeat = await asyncio.wait_for(anext(stream), 5)
+
+            await sync_to_async(tables.add_table_row)(
+                table_id, {"name": "Matt", "age": 41}
+            )
+            pushed = await asyncio.wait_for(anext(stream), 5)
+        finally:
+            await stream.aclose()
+
+        return caught_up, heartbeat, pushed
+
+    caught_up, heartbeat, pushed = async_to_sync(follow)()
+
+    assert (caught_up["seq"], caught_up["op"]) == (1, "insert")
+    assert heartbeat is None
+    assert pushed == {
+        "seq": 2,
+        "op": "insert",
+        "row": {"id": 2, "name": "Matt", "age": 41},
+    }
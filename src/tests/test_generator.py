@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+
+import pytest
+from dynatablebackend.db import tables
+from dynatablebackend.db.util import get_dynamic_model
+
+from tests.generator import GeneratedModelFields, generator
+
+FIELDS = GeneratedModelFields(
+    [
+        {"name": "name", "type": "string"},
+        {"name": "age", "type": "number"},
+        {"name": "active", "type": "boolean"},
+    ]
+)
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 100, 1000])
+def test_bulk_row_generator_is_reproducible_for_any_batch_size(batch_size):
+    expected = FIELDS.bulk_row_generator(seed=42).rows(100)
+
+    buffer = io.StringIO()
+    FIELDS.bulk_row_generator(seed=42).write_ndjson(buffer, 100, batch_size)
+
+    assert [json.loads(line) for line in buffer.getvalue().splitlines()] == expected
+    assert FIELDS.bulk_row_generator(seed=43).rows(100) != expected
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_bulk_row_generator_matches_model_fields(fields):
+    rows = fields.bulk_row_generator(seed=1).rows(500)
+    names = set(generator.model_fields_generator.data["name"])
+
+    assert len(rows) == 500
+    for row in rows:
+        assert list(row) == [field["name"] for field in fields]
+
+        for field in fields:
+            value = row[field["name"]]
+            if field["type"] == "string":
+                assert value in names
+            elif field["type"] == "number":
+                assert isinstance(value, int) and 1 <= value <= 100
+            elif field["type"] == "boolean":
+                assert isinstance(value, bool)
+
+
+def test_bulk_row_generator_writes_csv():
+    buffer = io.StringIO()
+    assert FIELDS.bulk_row_generator(seed=42).write_csv(buffer, 250, 100) == 250
+
+    buffer.seek(0)
+    rows = list(csv.DictReader(buffer))
+
+    assert [
+        {
+            "name": row["name"],
+            "age": int(row["age"]),
+            "active": row["active"] == "true",
+        }
+        for row in rows
+    ] == FIELDS.bulk_row_generator(seed=42).rows(250)
+
+
+@pytest.mark.django_db
+def test_bulk_row_generator_copies_rows_to_table():
+    table_id = tables.create_table(FIELDS)
+
+    assert (
+        FIELDS.bulk_row_generator(seed=42).copy_to_table(table_id, 2500, 1000) == 2500
+    )
+
+    DynamicModel = get_dynamic_model(table_id)
+    rows = list(DynamicModel.objects.order_by("id").values("name", "age", "active"))
+
+    assert rows == FIELDS.bulk_row_generator(seed=42).rows(2500)
+    assert tables.add_table_row(table_id, {"name": "Anna", "age": 30, "active": True})
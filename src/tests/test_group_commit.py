@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection, connections
+from dynatablebackend.db import group_commit, tables
+from dynatablebackend.db.util import get_dynamic_model
+
+FIELDS = [{"name": "name", "type": "string"}, {"name": "age", "type": "integer"}]
+
+
+def _add_rows(table_id: str, rows: list):
+    def add(row):
+        try:
+            return tables.add_table_row(table_id, row)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=len(rows)) as executor:
+        return list(executor.map(add, rows))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_add_table_row_commits_concurrent_rows_together(settings):
+    settings.DYNATABLE_GROUP_COMMIT_ROWS = 4
+    settings.DYNATABLE_GROUP_COMMIT_WAIT_MS = 2000
+    table_id = tables.create_table(FIELDS)
+
+    rows = [{"name": f"Person {n}", "age": n} for n in range(8)]
+    assert _add_rows(table_id, rows) == [True] * 8
+
+    DynamicModel = get_dynamic_model(table_id)
+    assert sorted(DynamicModel.objects.values_list("age", flat=True)) == list(range(8))
+
+    # Rows committed together share the id of the transaction that inserted them
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT count(DISTINCT xmin::text) FROM {DynamicModel._meta.db_table}"
+        )
+        assert cursor.fetchone()[0] == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_add_table_row_fails_only_bad_rows_of_a_batch(settings):
+    settings.DYNATABLE_GROUP_COMMIT_ROWS = 3
+    settings.DYNATABLE_GROUP_COMMIT_WAIT_MS = 2000
+    table_id = tables.create_table(FIELDS)
+
+    rows = [{"name": "Anna", "age": 30}, {"name": "Matt"}, {"name": "Olga", "age": 27}]
+
+    assert _add_rows(table_id, rows) == [True, False, True]
+    assert tables.count_table_rows(table_id, "exact")["count"] == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_add_table_row_commits_lone_row_after_wait(settings):
+    settings.DYNATABLE_GROUP_COMMIT_ROWS = 100
+    settings.DYNATABLE_GROUP_COMMIT_WAIT_MS = 10
+    table_id = tables.create_table(FIELDS)
+
+    assert tables.add_table_row(table_id, {"name": "Anna", "age": 30})
+    assert group_commit._batches == {}
+    assert tables.count_table_rows(table_id, "exact")["count"] == 1
+
+
+@pytest.mark.django_db
+def test_group_commit_is_skipped_inside_transactions(settings):
+    settings.DYNATABLE_GROUP_COMMIT_ROWS = 100
+    table_id = tables.create_table(FIELDS)
+
+    assert not group_commit.enabled(get_dynamic_model(table_id))
+    assert tables.add_table_row(table_id, {"name": "Anna", "age": 30})
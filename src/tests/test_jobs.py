@@ -0,0 +1,138 @@
+import socket
+import time
+
+import pytest
+from django.db import connection
+from dynatable.logger import get_logger
+from dynatablebackend import jobs
+from dynatablebackend.db import tables
+from rest_framework.test import APIClient
+
+logger = get_logger("dynatablebackend.tests")
+
+
+def _wait(job_id: str, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.get_job(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.05)
+
+    raise TimeoutError(f"Job '{job_id}' did not finish")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_submit_runs_task_in_background():
+    def task(progress):
+        progress(1, 3)
+        progress(2)
+        return {"count": 3}
+
+    job_id = jobs.submit("test", "Person", task, total=3)
+    job = _wait(job_id)
+
+    assert job["status"] == "succeeded"
+    assert job["kind"] == "test"
+    assert job["table_id"] == "Person"
+    assert job["progress"] == {"done": 3, "total": 3}
+    assert job["result"] == {"count": 3}
+    assert job["error"] is None
+    assert job["throughput"] > 0
+    assert job["created_at"] <= job["started_at"] <= job["finished_at"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_submit_reports_logged_error_of_failed_task():
+    def task(progress):
+        logger.error("Table 'Person' does not exist.")
+        return None
+
+    job = _wait(jobs.submit("test", "Person", task))
+
+    assert job["status"] == "failed"
+    assert job["error"] == "Table 'Person' does not exist."
+    assert job["result"] is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_submit_reports_exception_of_failed_task():
+    def task(progress):
+        raise RuntimeError("disk full")
+
+    job = _wait(jobs.submit("test", None, task))
+
+    assert job["status"] == "failed"
+    assert job["error"] == "disk full"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_get_job_fails_jobs_of_exited_workers():
+    job_id = jobs.submit("test", None, lambda progress: True)
+    _wait(job_id)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {jobs.JOBS_TABLE} SET status = 'running', worker = %s WHERE id = %s",
+            [f"{socket.gethostname()}:999999999", job_id],
+        )
+
+    job = jobs.get_job(job_id)
+
+    assert job["status"] == "failed"
+    assert job["error"] == "Worker exited before the job finished"
+    assert jobs.get_job(job_id)["status"] == "failed"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_upsert_table_rows_endpoint_runs_as_job_when_asked():
+    client = APIClient()
+    fields = [{"name": "email", "type": "string", "key": True}]
+    table_id = tables.create_table(fields)
+
+    rows = [{"email": f"{n}@example.com"} for n in range(2500)]
+    response = client.put(
+        f"/api/table/{table_id}/rows",
+        rows,
+        format="json",
+        HTTP_PREFER="respond-async",
+    )
+
+    assert response.status_code == 202
+    assert response["Location"] == f"/api/jobs/{response.data['job_id']}"
+
+    job = _wait(response.data["job_id"])
+    assert job["status"] == "succeeded"
+    assert job["result"] == 2500
+    assert job["progress"] == {"done": 2500, "total": 2500}
+
+    response = client.get(f"/api/jobs/{job['job_id']}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "succeeded"
+
+    assert tables.count_table_rows(table_id, "exact")["count"] == 2500
+
+
+@pytest.mark.django_db(transaction=True)
+def test_delete_table_rows_endpoint_reports_failed_job():
+    client = APIClient()
+    table_id = tables.create_table([{"name": "name", "type": "string"}])
+
+    response = client.delete(
+        f"/api/table/{table_id}/rows",
+        {"filter": {"town": "Warsaw"}},
+        format="json",
+        HTTP_PREFER="respond-async, wait=10",
+    )
+    assert response.status_code == 202
+
+    job = _wait(response.data["job_id"])
+    assert job["status"] == "failed"
+    assert "town" in job["error"]
+
+
+@pytest.mark.django_db
+def test_get_job_endpoint_returns_404_for_unknown_job():
+    response = APIClient().get("/api/jobs/unknown")
+
+    assert response.status_code == 404
@@ -0,0 +1,175 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from dynatablebackend.db import ordering, tables
+from dynatablebackend.db.util import get_dynamic_model
+
+FIELDS = [
+    {"name": "name", "type": "string"},
+    {"name": "age", "type": "integer"},
+    {"name": "code", "type": "varchar", "max_length": 8, "key": True},
+    {"name": "data", "type": "jsonb"},
+]
+
+ROWS = [
+    {"name": "Matt", "age": 30, "code": "a", "data": {}},
+    {"name": "Anna", "age": 25, "code": "b", "data": {}},
+    {"name": "Olga", "age": 30, "code": "c", "data": {}},
+    {"name": "Anna", "age": 40, "code": "d", "data": {}},
+    {"name": "Jan", "age": 25, "code": "e", "data": {}},
+    {"name": "Matt", "age": 30, "code": "f", "data": {}},
+    {"name": "Olga", "age": 20, "code": "g", "data": {}},
+]
+
+
+def _create_people():
+    table_id = tables.create_table(FIELDS)
+    assert tables.upsert_table_rows(table_id, ROWS) == len(ROWS)
+    return table_id
+
+
+def _read_pages(table_id, order_by, limit):
+    DynamicModel = get_dynamic_model(table_id)
+    rows, after = [], None
+
+    while True:
+        page = tables.get_table_rows(
+            table_id, order_by=order_by, after=after, limit=limit
+        )
+        rows.extend(page)
+
+        if len(page) < limit:
+            return rows
+
+        after = ordering.encode_cursor(DynamicModel, order_by, page[-1])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "order_by, keys",
+    [
+        (None, [("id", False)]),
+        (["name"], [("name", False), ("id", False)]),
+        (["-age", "name"], [("age", True), ("name", False), ("id", False)]),
+        (["age", "-name"], [("age", False), ("name", True), ("id", True)]),
+        (["-id"], [("id", True)]),
+    ],
+)
+def test_sort_keys_breaks_ties_by_id(order_by, keys):
+    table_id = tables.create_table(FIELDS)
+
+    assert ordering.sort_keys(get_dynamic_model(table_id), order_by) == keys
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "order_by, message",
+    [
+        (["missing"], "does not exist"),
+        (["data"], "cannot be sorted"),
+        (["name", "-name"], "more than once"),
+    ],
+)
+def test_sort_keys_rejects_invalid_columns(order_by, message):
+    table_id = tables.create_table(FIELDS)
+
+    with pytest.raises(ValueError, match=message):
+        ordering.sort_keys(get_dynamic_model(table_id), order_by)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "order_by", [None, ["name"], ["-age", "name"], ["age", "-name"]]
+)
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_pages_follow_the_sort_order(order_by, limit):
+    table_id = _create_people()
+
+    keys = ordering.sort_keys(get_dynamic_model(table_id), order_by)
+    expected = tables.get_table_rows(table_id)
+    for name, descending in reversed(keys):
+        expected.sort(key=lambda row: row[name], reverse=descending)
+
+    rows = tables.get_table_rows(table_id, order_by=order_by)
+    assert rows == expected
+    assert _read_pages(table_id, order_by, limit) == rows
+
+
+@pytest.mark.django_db
+def test_pages_keep_full_precision_of_cursor_values():
+    table_id = tables.create_table(
+        [
+            {"name": "at", "type": "timestamp"},
+            {"name": "price", "type": "decimal", "max_digits": 8, "decimal_places": 4},
+        ]
+    )
+    at = datetime.datetime(2024, 4, 1, 12, 0, 0, 123456, tzinfo=datetime.timezone.utc)
+    for delta, price in [(1, "1.0001"), (0, "1.0002"), (1, "1.0000")]:
+        row = {"at": at + datetime.timedelta(microseconds=delta), "price": price}
+        assert tables.add_table_row(table_id, row)
+
+    for order_by in [["at", "price"], ["-price"]]:
+        assert _read_pages(table_id, order_by, 1) == tables.get_table_rows(
+            table_id, order_by=order_by
+        )
+
+    first = tables.get_table_rows(table_id, order_by=["price"], limit=1)
+    assert first[0]["price"] == Decimal("1.0000")
+
+
+@pytest.mark.django_db
+def test_decode_cursor_rejects_invalid_cursors():
+    table_id = _create_people()
+    DynamicModel = get_dynamic_model(table_id)
+    row = tables.get_table_rows(table_id, order_by=["name"], limit=1)[0]
+    cursor = ordering.encode_cursor(DynamicModel, ["name"], row)
+
+    assert ordering.decode_cursor(DynamicModel, ["name"], cursor) == ["Anna", 2]
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        ordering.decode_cursor(DynamicModel, ["name"], "not a cursor")
+
+    with pytest.raises(ValueError, match="does not match"):
+        tables.get_table_rows(table_id, order_by=["-name"], after=cursor)
+
+
+@pytest.mark.django_db
+def test_is_indexed_finds_indexes_serving_the_sort_order():
+    table_id = _create_people()
+    DynamicModel = get_dynamic_model(table_id)
+    db_table = DynamicModel._meta.db_table
+
+    def is_indexed(order_by):
+        return ordering.is_indexed(DynamicModel, order_by, "default")
+
+    assert is_indexed(None)
+    assert is_indexed(["-id"])
+    assert is_indexed(["code", "name"])
+    assert not is_indexed(["name"])
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE INDEX people_age_name ON "{db_table}" (age DESC, name)')
+
+    assert is_indexed(["-age", "name"])
+    assert is_indexed(["age", "-name"])
+    assert is_indexed(["-age"])
+    assert not is_indexed(["age", "name"])
+    assert not is_indexed(["name", "-age"])
+
+
+@pytest.mark.django_db
+def test_explain_table_rows_explains_the_sorted_page():
+    table_id = _create_people()
+    DynamicModel = get_dynamic_model(table_id)
+    row = tables.get_table_rows(table_id, order_by=["code"], limit=1)[0]
+    after = ordering.encode_cursor(DynamicModel, ["code"], row)
+
+    explanation = tables.explain_table_rows(
+        table_id, analyze=False, order_by=["code"], after=after, limit=2
+    )
+
+    assert 'ORDER BY "' in explanation["sql"]
+    assert "LIMIT 2" in explanation["sql"]
+    assert explanation["plan"][0]["Plan"]["Node Type"] == "Limit"
@@ -0,0 +1,138 @@
+import pytest
+from django.db import connection
+from dynatablebackend.db import partitions, tables
+
+from tests.generator import generator
+
+
+def _table_name(table_id: str):
+    return f"dynatablebackend_{table_id.lower()}"
+
+
+def _partitions(table_id: str):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+            JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+            WHERE parent.relname = %s
+            ORDER BY child.relname
+            """,
+            [_table_name(table_id)],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_create_table_creates_partitioned_table(fields):
+    table_id = tables.create_table(fields, partition_size=100)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE relname = %s", [_table_name(table_id)]
+        )
+        assert cursor.fetchone()[0] == "p"
+
+    assert _partitions(table_id) == [
+        f"{_table_name(table_id)}_p0",
+        f"{_table_name(table_id)}_p1",
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_add_table_row_creates_partitions_when_crossing_boundaries(fields):
+    table_id = tables.create_table(fields, partition_size=2)
+
+    rows = fields.row_generator.many(7)
+    for row in rows:
+        assert tables.add_table_row(table_id, row)
+
+    assert len(_partitions(table_id)) == 5
+
+    db_rows = tables.get_table_rows(table_id)
+    assert len(db_rows) == len(rows)
+
+
+@pytest.mark.django_db
+def test_create_table_partitions_on_number_column():
+    fields = [{"name": "title", "type": "string"}, {"name": "year", "type": "number"}]
+
+    table_id = tables.create_table(fields, partition_size=10, partition_key="year")
+
+    assert tables.add_table_row(table_id, {"title": "Dune", "year": 1965})
+    assert tables.add_table_row(table_id, {"title": "Solaris", "year": 1961})
+    assert tables.add_table_row(table_id, {"title": "Hyperion", "year": 1989})
+
+    assert f"{_table_name(table_id)}_p196" in _partitions(table_id)
+    assert f"{_table_name(table_id)}_p198" in _partitions(table_id)
+    assert len(tables.get_table_rows(table_id)) == 3
+
+
+@pytest.mark.django_db
+def test_create_table_partitions_on_decimal_column():
+    fields = [
+        {"name": "item", "type": "string"},
+        {"name": "amount", "type": "decimal", "max_digits": 8, "decimal_places": 2},
+    ]
+
+    table_id = tables.create_table(fields, partition_size=10, partition_key="amount")
+
+    assert tables.add_table_row(table_id, {"item": "Book", "amount": "250.50"})
+    assert tables.add_table_row(table_id, {"item": "Pen", "amount": 3.25})
+    assert tables.add_table_row(table_id, {"item": "Ink", "amount": "7.10"})
+
+    assert f"{_table_name(table_id)}_p25" in _partitions(table_id)
+    assert f"{_table_name(table_id)}_p0" in _partitions(table_id)
+    assert len(tables.get_table_rows(table_id)) == 3
+
+
+@pytest.mark.django_db
+def test_create_table_does_not_partition_on_string_column():
+    fields = [{"name": "title", "type": "string"}]
+
+    assert tables.create_table(fields, partition_size=10, partition_key="title") is None
+
+
+@pytest.mark.django_db
+def test_update_table_keeps_table_partitioned():
+    fields = [{"name": "title", "type": "string"}]
+
+    table_id = tables.create_table(fields, partition_size=10)
+
+    assert tables.update_table(table_id, [{"name": "year", "type": "number"}])
+    assert tables.add_table_row(table_id, {"title": "Dune", "year": 1965})
+
+    assert len(_partitions(table_id)) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "fields",
+    [
+        [{"name": "age", "type": "integer", "search": True}],
+        [{"name": "owner", "type": "reference", "table": "missing"}],
+    ],
+)
+def test_create_table_does_not_register_partitions_of_invalid_table(fields):
+    table_id = "InvalidPartitioned"
+
+    assert tables.create_table(fields, table_id=table_id, partition_size=2) is None
+    assert not partitions.is_partitioned(table_id)
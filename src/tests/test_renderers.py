@@ -0,0 +1,77 @@
+import json
+
+import msgpack
+import pytest
+from dynatablebackend.renderers import MessagePackRenderer, ORJSONRenderer
+from rest_framework.renderers import JSONRenderer
+
+from tests.generator import generator
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_orjson_renderer_renders_like_json_renderer(fields):
+    data = {"table_id": "proexe", "rows": fields.row_generator.many()}
+
+    rendered = ORJSONRenderer().render(data)
+
+    assert json.loads(rendered) == json.loads(JSONRenderer().render(data))
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_orjson_renderer_stream_renders_whole_document(fields):
+    rows = fields.row_generator.many(10)
+
+    rendered = b"".join(ORJSONRenderer().render_stream("proexe", iter(rows)))
+
+    assert json.loads(rendered) == {"table_id": "proexe", "rows": rows}
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_msgpack_renderer_renders_data(fields):
+    data = {"table_id": "proexe", "rows": fields.row_generator.many()}
+
+    rendered = MessagePackRenderer().render(data)
+
+    assert msgpack.unpackb(rendered) == data
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+        (generator.model_fields_generator.one()),
+    ],
+)
+def test_msgpack_renderer_stream_renders_header_and_rows(fields):
+    rows = fields.row_generator.many(10)
+
+    unpacker = msgpack.Unpacker()
+    for chunk in MessagePackRenderer().render_stream("proexe", iter(rows)):
+        unpacker.feed(chunk)
+
+    header, *db_rows = list(unpacker)
+
+    assert header == {"table_id": "proexe"}
+    assert db_rows == rows
@@ -0,0 +1,138 @@
+import pytest
+from dynatablebackend.db import tables
+from rest_framework.test import APIClient
+from simulation import replay
+
+FIELDS = [{"name": "name", "type": "string"}, {"name": "age", "type": "integer"}]
+
+
+def _record(client: APIClient):
+    response = client.post("/api/table", FIELDS, format="json")
+    table_id = response.data["table_id"]
+
+    client.post(
+        f"/api/table/{table_id}/row", {"name": "Anna", "age": 30}, format="json"
+    )
+    client.get("/api/table/Unknown/count")
+    client.get(f"/api/table/{table_id}/rows", {"name": "Anna"})
+
+    response = client.post(f"/api/table/{table_id}/clone", {}, format="json")
+    client.get(f"/api/table/{response.data['table_id']}/count")
+    rollup = {"name": "by_age", "group_by": ["age"], "aggregates": {"age": ["sum"]}}
+    client.post(f"/api/table/{table_id}/rollups", rollup, format="json")
+
+    return table_id
+
+
+@pytest.mark.django_db
+def test_traffic_recorder_records_table_requests(settings, tmp_path):
+    settings.DYNATABLE_TRAFFIC_LOG = str(tmp_path / "traffic.log")
+    client = APIClient()
+
+    table_id = _record(client)
+    client.get(
+        f"/api/table/{table_id}/rows",
+        HTTP_ACCEPT="application/msgpack",
+        HTTP_ACCEPT_ENCODING="gzip",
+        HTTP_PREFER="respond-async",
+    )
+    client.get("/status/")
+
+    records = list(replay.read_log(settings.DYNATABLE_TRAFFIC_LOG))
+    clone_id = records[4]["r"]
+
+    assert [(record["m"], record["p"], record["s"]) for record in records] == [
+        ("POST", "/api/table", 201),
+        ("POST", f"/api/table/{table_id}/row", 201),
+        ("GET", "/api/table/Unknown/count", 404),
+        ("GET", f"/api/table/{table_id}/rows?name=Anna", 200),
+        ("POST", f"/api/table/{table_id}/clone", 201),
+        ("GET", f"/api/table/{clone_id}/count", 200),
+        ("POST", f"/api/table/{table_id}/rollups", 201),
+        ("GET", f"/api/table/{table_id}/rows", 200),
+    ]
+    assert records[0]["r"] == table_id
+    assert clone_id != table_id
+    assert [index for index, record in enumerate(records) if "r" in record] == [0, 4]
+    assert records[1]["b"] == b'{"name":"Anna","age":30}'
+    assert records[1]["c"] == "application/json"
+    assert records[1]["h"] == {}
+    assert records[7]["h"] == {
+        "Accept": "application/msgpack",
+        "Accept-Encoding": "gzip",
+        "Prefer": "respond-async",
+    }
+    assert all(record["d"] > 0 for record in records)
+
+
+@pytest.mark.parametrize(
+    "method, path, expected",
+    [
+        ("POST", "/api/table", "POST /api/table"),
+        ("GET", "/api/table/2PCYdAwfB3iPvchWbj5DmY", "GET /api/table/<table_id>"),
+        (
+            "GET",
+            "/api/table/2PCYdAwfB3iPvchWbj5DmY/rows?name=Anna",
+            "GET /api/table/<table_id>/rows",
+        ),
+    ],
+)
+def test_endpoint(method, path, expected):
+    assert replay.endpoint(method, path) == expected
+
+
+@pytest.mark.parametrize(
+    "percent, expected", [(50, 5), (90, 9), (99, 10), (100, 10), (0, 1)]
+)
+def test_percentile(percent, expected):
+    assert replay.percentile(list(range(10, 0, -1)), percent) == expected
+
+
+@pytest.mark.django_db(transaction=True)
+def test_replay_sends_requests_to_created_tables(settings, tmp_path, live_server):
+    settings.DYNATABLE_TRAFFIC_LOG = str(tmp_path / "traffic.log")
+    recorded_id = _record(APIClient())
+    records = list(replay.read_log(settings.DYNATABLE_TRAFFIC_LOG))
+
+    settings.DYNATABLE_TRAFFIC_LOG = None
+    results = replay.replay(records, live_server.url, speed=None, concurrency=4)
+
+    assert [result["status"] for result in results] == [
+        201,
+        201,
+        404,
+        200,
+        201,
+        200,
+        201,
+    ]
+    assert all(result["status"] == result["recorded_status"] for result in results)
+
+    # Rows were added to the table the replay created, not to the recorded one
+    assert tables.count_table_rows(recorded_id, "exact")["count"] == 1
+
+    summary = replay.summarize(results)
+    assert summary["POST /api/table/<table_id>/row"]["count"] == 1
+    assert summary["GET /api/table/<table_id>/count"]["mismatches"] == 0
+
+
+def test_replay_sends_recorded_headers(monkeypatch):
+    sent = []
+
+    def request(session, method, url, data, headers, timeout):
+        sent.append(headers)
+        raise replay.requests.ConnectionError("offline")
+
+    monkeypatch.setattr(replay.requests.Session, "request", request)
+    record = {"t": 0.0, "m": "GET", "p": "/api/table/T/rows", "b": b"", "s": 200}
+    records = [
+        dict(record, d=0.1, c="", h={"Accept": "application/msgpack"}),
+        dict(record, d=0.1, c="", h={"Accept-Encoding": "zstd", "Prefer": "wait=1"}),
+    ]
+
+    replay.replay(records, "http://localhost:8000", speed=None, concurrency=1)
+
+    assert sent == [
+        {"Accept": "application/msgpack", "Accept-Encoding": None},
+        {"Accept": None, "Accept-Encoding": "zstd", "Prefer": "wait=1"},
+    ]
@@ -0,0 +1,237 @@
+import pytest
+from django.db import connection
+from dynatablebackend.db import rollups, tables
+from dynatablebackend.db.util import get_dynamic_model
+from rest_framework.test import APIClient
+
+
+def _table_name(table_id: str):
+    return f"dynatablebackend_{table_id.lower()}"
+
+
+FIELDS = [
+    {"name": "name", "type": "string", "key": True},
+    {"name": "city", "type": "string"},
+    {"name": "age", "type": "integer"},
+    {"name": "score", "type": "number"},
+]
+
+ROWS = [
+    {"name": "Anna", "city": "Warsaw", "age": 30, "score": 1.5},
+    {"name": "Matt", "city": "Warsaw", "age": 41, "score": 2.0},
+    {"name": "Olga", "city": "Cracow", "age": 25, "score": 3.5},
+    {"name": "Piotr", "city": "Cracow", "age": 52, "score": 0.5},
+    {"name": "Ewa", "city": "Gdansk", "age": 19, "score": 4.0},
+]
+
+AGGREGATES = {"age": ["sum", "count", "min", "max"], "score": ["sum", "max"]}
+
+
+def _group_by(table_id: str):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT city, count(*), sum(age)::numeric, count(age), min(age), max(age),
+                   sum(score)::numeric, max(score)
+            FROM {_table_name(table_id)} GROUP BY city ORDER BY city
+            """
+        )
+        columns = [
+            "city",
+            "count",
+            "age__sum",
+            "age__count",
+            "age__min",
+            "age__max",
+            "score__sum",
+            "score__max",
+        ]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _create_table_with_rollup(rows=ROWS, **kwargs):
+    table_id = tables.create_table(FIELDS, **kwargs)
+
+    for row in rows:
+        assert tables.add_table_row(table_id, row)
+
+    assert tables.create_rollup(table_id, "by_city", ["city"], AGGREGATES) == "by_city"
+    return table_id
+
+
+@pytest.mark.django_db
+def test_create_rollup_backfills_existing_rows():
+    table_id = _create_table_with_rollup()
+
+    groups = tables.get_rollup(table_id, "by_city")
+
+    assert [group["city"] for group in groups] == ["Cracow", "Gdansk", "Warsaw"]
+    assert groups == _group_by(table_id)
+
+
+@pytest.mark.django_db
+def test_rollup_follows_inserts():
+    table_id = _create_table_with_rollup(rows=[])
+
+    for row in ROWS:
+        assert tables.add_table_row(table_id, row)
+        assert tables.get_rollup(table_id, "by_city") == _group_by(table_id)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "predicate, values",
+    [
+        ({"name": "Anna"}, {"age": 99}),
+        ({"name": "Matt"}, {"age": 1, "score": -1.0}),
+        ({"name": "Olga"}, {"city": "Warsaw"}),
+        ({"name": "Ewa"}, {"city": "Poznan"}),
+        ({"age__gte": 0}, {"city": "Lodz"}),
+    ],
+)
+def test_rollup_follows_updates(predicate, values):
+    table_id = _create_table_with_rollup()
+
+    assert tables.update_table_rows(table_id, predicate, values)
+
+    assert tables.get_rollup(table_id, "by_city") == _group_by(table_id)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "predicate",
+    [{"name": "Piotr"}, {"name": "Olga"}, {"city": "Gdansk"}, {"age__gte": 0}],
+)
+def test_rollup_follows_deletes(predicate):
+    table_id = _create_table_with_rollup()
+
+    assert tables.delete_table_rows(table_id, predicate)
+
+    assert tables.get_rollup(table_id, "by_city") == _group_by(table_id)
+
+
+@pytest.mark.django_db
+def test_rollup_follows_upserts():
+    table_id = _create_table_with_rollup()
+
+    rows = [
+        {"name": "Anna", "city": "Cracow", "age": 60, "score": 9.0},
+        {"name": "Jan", "city": "Warsaw", "age": 10, "score": 0.0},
+    ]
+    assert tables.upsert_table_rows(table_id, rows) == 2
+
+    assert tables.get_rollup(table_id, "by_city") == _group_by(table_id)
+
+
+@pytest.mark.django_db
+def test_rollup_of_partitioned_table():
+    fields = [{"name": "city", "type": "string"}, {"name": "age", "type": "integer"}]
+    table_id = tables.create_table(fields, partition_size=2)
+
+    assert tables.create_rollup(table_id, "by_city", ["city"], {"age": ["max"]})
+
+    for row in ROWS:
+        assert tables.add_table_row(table_id, {"city": row["city"], "age": row["age"]})
+
+    assert tables.delete_table_rows(table_id, {"age": 52})
+
+    assert tables.get_rollup(table_id, "by_city") == [
+        {"city": "Cracow", "count": 1, "age__max": 25},
+        {"city": "Gdansk", "count": 1, "age__max": 19},
+        {"city": "Warsaw", "count": 2, "age__max": 41},
+    ]
+
+
+@pytest.mark.django_db
+def test_update_table_keeps_rollups():
+    table_id = _create_table_with_rollup()
+
+    assert tables.update_table(table_id, FIELDS + [{"name": "email", "type": "string"}])
+
+    row = dict(ROWS[0], email="anna@example.com")
+    assert tables.add_table_row(table_id, row)
+
+    assert tables.get_rollup(table_id, "by_city") == _group_by(table_id)
+
+
+@pytest.mark.django_db
+def test_update_table_fails_when_rolled_up_column_is_not_numeric():
+    table_id = _create_table_with_rollup()
+
+    assert tables.update_table(table_id, [{"name": "age", "type": "string"}]) is None
+
+    DynamicModel = get_dynamic_model(table_id)
+    assert DynamicModel._meta.get_field("age").get_internal_type() == "IntegerField"
+
+    assert tables.add_table_row(table_id, dict(ROWS[0], name="Ola"))
+    assert tables.get_rollup(table_id, "by_city") == _group_by(table_id)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "name, group_by, aggregates",
+    [
+        ("By City", ["city"], {"age": ["sum"]}),
+        ("by_city", [], {"age": ["sum"]}),
+        ("by_city", ["town"], {"age": ["sum"]}),
+        ("by_city", ["id"], {"age": ["sum"]}),
+        ("by_city", ["city"], {}),
+        ("by_city", ["city"], {"name": ["max"]}),
+        ("by_city", ["city"], {"age": ["avg"]}),
+    ],
+)
+def test_create_rollup_rejects_invalid_rollups(name, group_by, aggregates):
+    table_id = tables.create_table(FIELDS)
+
+    assert tables.create_rollup(table_id, name, group_by, aggregates) is None
+    assert not rollups.has_rollup(table_id, name)
+
+
+@pytest.mark.django_db
+def test_create_rollup_rejects_duplicate_name():
+    table_id = _create_table_with_rollup()
+
+    assert tables.create_rollup(table_id, "by_city", ["city"], {"age": ["sum"]}) is None
+
+
+@pytest.mark.django_db
+def test_get_rollup_returns_none_for_unknown_rollup():
+    table_id = tables.create_table(FIELDS)
+
+    assert tables.get_rollup(table_id, "by_city") is None
+    assert tables.get_rollup("Unknown", "by_city") is None
+
+
+@pytest.mark.django_db
+def test_rollup_endpoints():
+    client = APIClient()
+    table_id = tables.create_table(FIELDS)
+
+    for row in ROWS:
+        assert tables.add_table_row(table_id, row)
+
+    response = client.post(
+        f"/api/table/{table_id}/rollups",
+        {"name": "by_city", "group_by": ["city"], "aggregates": {"age": ["sum"]}},
+        format="json",
+    )
+    assert response.status_code == 201
+    assert response.data == {"table_id": table_id, "name": "by_city"}
+
+    response = client.get(f"/api/table/{table_id}/rollups/by_city")
+    assert response.status_code == 200
+    assert response.json()["groups"][0] == {
+        "city": "Cracow",
+        "count": 2,
+        "age__sum": 77,
+    }
+
+    response = client.post(
+        f"/api/table/{table_id}/rollups",
+        {"name": "by_city", "group_by": ["city"], "aggregates": {"age": ["avg"]}},
+        format="json",
+    )
+    assert response.status_code == 400
+
+    response = client.get(f"/api/table/{table_id}/rollups/unknown")
+    assert response.status_code == 404
@@ -0,0 +1,85 @@
+import pytest
+import shortuuid
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory
+from dynatablebackend.db import util
+from dynatablebackend.middleware import PIN_COOKIE, ReplicaPinMiddleware
+from dynatablebackend.routers import ReplicaRouter, pinned_to_primary
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_SHARDS = ["default"]
+    settings.DATABASE_REPLICAS = ["replica1", "replica2"]
+    token = pinned_to_primary.set(False)
+    yield settings.DATABASE_REPLICAS
+    pinned_to_primary.reset(token)
+
+
+@pytest.fixture
+def DynamicModel():
+    fields = [{"name": "name", "type": "string"}]
+    return util.create_dynamic_model(shortuuid.uuid(), util.to_model_types(fields))
+
+
+def test_replica_router_reads_from_replicas_round_robin(replicas, DynamicModel):
+    router = ReplicaRouter()
+
+    assert [router.db_for_read(DynamicModel) for _ in range(4)] == replicas * 2
+
+
+def test_replica_router_does_not_route_other_models(replicas):
+    router = ReplicaRouter()
+
+    assert router.db_for_read(User) is None
+    assert router.db_for_write(User) is None
+
+
+def test_replica_router_reads_from_primary_after_write(replicas, DynamicModel):
+    router = ReplicaRouter()
+
+    assert router.db_for_write(DynamicModel) == "default"
+    assert router.db_for_read(DynamicModel) == "default"
+
+
+def test_replica_router_reads_from_primary_without_replicas(settings, DynamicModel):
+    settings.DATABASE_SHARDS = ["default"]
+    settings.DATABASE_REPLICAS = []
+
+    assert ReplicaRouter().db_for_read(DynamicModel) == "default"
+
+
+def test_replica_router_does_not_migrate_replicas(replicas):
+    router = ReplicaRouter()
+
+    assert router.allow_migrate("replica1", "dynatablebackend") is False
+    assert router.allow_migrate("default", "dynatablebackend") is None
+
+
+@pytest.mark.parametrize(
+    "method, cookies, pinned, sets_cookie",
+    [
+        ("get", {}, False, False),
+        ("get", {PIN_COOKIE: "1"}, True, False),
+        ("post", {}, True, True),
+        ("delete", {}, True, True),
+    ],
+)
+def test_replica_pin_middleware_pins_writing_clients(
+    replicas, method, cookies, pinned, sets_cookie
+):
+    seen = []
+
+    def get_response(request):
+        seen.append(pinned_to_primary.get())
+        return HttpResponse()
+
+    request = getattr(RequestFactory(), method)("/api/table")
+    request.COOKIES.update(cookies)
+
+    response = ReplicaPinMiddleware(get_response)(request)
+
+    assert seen == [pinned]
+    assert (PIN_COOKIE in response.cookies) is sets_cookie
+    assert pinned_to_primary.get() is False
@@ -0,0 +1,95 @@
+import pytest
+from drf_yasg.generators import OpenAPISchemaGenerator
+from dynatablebackend import schema
+from dynatablebackend.db import tables, util
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def generations(monkeypatch):
+    count = {"value": 0}
+    get_schema = OpenAPISchemaGenerator.get_schema
+
+    def counting_get_schema(self, request=None, public=False):
+        count["value"] += 1
+        return get_schema(self, request, public)
+
+    monkeypatch.setattr(OpenAPISchemaGenerator, "get_schema", counting_get_schema)
+    monkeypatch.setattr(schema, "_api_schemas", {})
+    return count
+
+
+@pytest.mark.django_db
+def test_api_schema_is_generated_once(generations):
+    client = APIClient()
+
+    for _ in range(3):
+        response = client.get("/swagger.json")
+        assert response.status_code == 200
+        assert "/api/table" in response.json()["paths"]
+
+    assert generations["value"] == 1
+
+    # Tables come and go without changing the document, their rows have their own schema
+    table_id = tables.create_table([{"name": "name", "type": "string"}])
+    util.unregister_dynamic_model(table_id)
+
+    definitions = client.get("/swagger.json").json().get("definitions", {})
+    assert not any(name.startswith("Row_") for name in definitions)
+
+    client.get("/swagger.json?format=openapi")
+    assert generations["value"] == 1
+
+
+@pytest.mark.django_db
+def test_table_schema_endpoint_describes_rows():
+    client = APIClient()
+    fields = [
+        {"name": "email", "type": "varchar", "max_length": 64, "key": True},
+        {"name": "age", "type": "smallint"},
+        {"name": "active", "type": "boolean"},
+        {"name": "born", "type": "date"},
+        {"name": "balance", "type": "decimal", "max_digits": 8, "decimal_places": 2},
+        {"name": "profile", "type": "jsonb"},
+    ]
+    table_id = tables.create_table(fields)
+
+    response = client.get(f"/api/table/{table_id}/schema")
+
+    assert response.status_code == 200
+    assert response.data["key"] == ["email"]
+    assert response.data["schema"] == {
+        "title": table_id,
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer", "format": "int32", "readOnly": True},
+            "email": {"type": "string", "maxLength": 64},
+            "age": {"type": "integer", "format": "int32"},
+            "active": {"type": "boolean"},
+            "born": {"type": "string", "format": "date"},
+            "balance": {"type": "number", "format": "decimal"},
+            "profile": {},
+        },
+        "required": ["email", "age", "active", "born", "balance", "profile"],
+    }
+
+
+@pytest.mark.django_db
+def test_row_schema_is_memoized_until_table_changes():
+    table_id = tables.create_table([{"name": "name", "type": "string"}])
+    DynamicModel = util.get_dynamic_model(table_id)
+
+    first = schema.row_schema(table_id, DynamicModel)
+    assert schema.row_schema(table_id, DynamicModel) is first
+
+    assert tables.update_table(table_id, [{"name": "age", "type": "integer"}])
+
+    response = APIClient().get(f"/api/table/{table_id}/schema")
+    assert set(response.data["schema"]["properties"]) == {"id", "name", "age"}
+
+
+@pytest.mark.django_db
+def test_table_schema_endpoint_returns_404_for_unknown_table():
+    response = APIClient().get("/api/table/Unknown/schema")
+
+    assert response.status_code == 404
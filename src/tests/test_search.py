@@ -0,0 +1,111 @@
+import pytest
+from django.db import connection
+from dynatablebackend.db import search, tables
+
+
+def _table_name(table_id: str):
+    return f"dynatablebackend_{table_id.lower()}"
+
+
+FIELDS = [
+    {"name": "title", "type": "string", "search": True},
+    {"name": "author", "type": "string", "search": True},
+    {"name": "year", "type": "number"},
+]
+
+ROWS = [
+    {"title": "Solaris", "author": "Stanislaw Lem", "year": 1961},
+    {"title": "The Cyberiad", "author": "Stanislaw Lem", "year": 1965},
+    {"title": "Dune", "author": "Frank Herbert", "year": 1965},
+    {"title": "Lem", "author": "Lem", "year": 2000},
+]
+
+
+@pytest.mark.django_db
+def test_create_table_creates_search_index():
+    table_id = tables.create_table(FIELDS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s",
+            [_table_name(table_id)],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+
+    assert any("USING gin (_search)" in index for index in indexes)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query, titles",
+    [
+        ("lem", ["Lem", "Solaris", "The Cyberiad"]),
+        ("lem -solaris", ["Lem", "The Cyberiad"]),
+        ('"frank herbert"', ["Dune"]),
+        ("asimov", []),
+    ],
+)
+def test_get_table_rows_searches_rows_by_relevance(query, titles):
+    table_id = tables.create_table(FIELDS)
+
+    for row in ROWS:
+        assert tables.add_table_row(table_id, row)
+
+    rows = tables.get_table_rows(table_id, query)
+
+    assert sorted(row["title"] for row in rows) == titles
+    assert all("_search" not in row for row in rows)
+
+
+@pytest.mark.django_db
+def test_get_table_rows_orders_search_results_by_rank():
+    table_id = tables.create_table(FIELDS)
+
+    for row in ROWS:
+        assert tables.add_table_row(table_id, row)
+
+    rows = tables.get_table_rows(table_id, "lem")
+
+    assert rows[0]["title"] == "Lem"
+
+
+@pytest.mark.django_db
+def test_create_table_does_not_search_non_string_columns():
+    fields = [{"name": "year", "type": "number", "search": True}]
+
+    assert tables.create_table(fields) is None
+
+
+@pytest.mark.django_db
+def test_update_table_keeps_table_searchable():
+    table_id = tables.create_table(FIELDS[:1])
+
+    assert tables.update_table(table_id, FIELDS[1:])
+
+    for row in ROWS:
+        assert tables.add_table_row(table_id, row)
+
+    assert [row["title"] for row in tables.get_table_rows(table_id, "solaris")] == [
+        "Solaris"
+    ]
+    assert [row["title"] for row in tables.get_table_rows(table_id, "herbert")] == [
+        "Dune"
+    ]
+
+
+@pytest.mark.django_db
+def test_update_table_keeps_table_unsearchable_when_it_fails():
+    table_id = tables.create_table(
+        [{"name": "city", "type": "string"}, {"name": "age", "type": "integer"}]
+    )
+    assert tables.create_rollup(table_id, "by_city", ["city"], {"age": ["sum"]})
+
+    columns = [
+        {"name": "title", "type": "string", "search": True},
+        {"name": "age", "type": "string"},
+    ]
+    assert tables.update_table(table_id, columns) is None
+
+    assert not search.is_searchable(table_id)
+    with pytest.raises(ValueError, match="not searchable"):
+        tables.get_table_rows(table_id, "solaris")
@@ -61,3 +61,30 @@ def test_column_list_serializer_detects_errors(fields):
     column_list_serializer = ColumnListSerializer(data=incorrect_data)
 
     assert not column_list_serializer.is_valid()
+
+
+@pytest.mark.parametrize(
+    "column, is_valid",
+    [
+        ({"name": "code", "type": "varchar", "max_length": 3}, True),
+        ({"name": "code", "type": "varchar"}, False),
+        (
+            {"name": "price", "type": "decimal", "max_digits": 8, "decimal_places": 2},
+            True,
+        ),
+        ({"name": "price", "type": "decimal", "max_digits": 8}, False),
+        (
+            {"name": "price", "type": "decimal", "max_digits": 2, "decimal_places": 3},
+            False,
+        ),
+        ({"name": "count", "type": "integer"}, True),
+        ({"name": "count", "type": "integer", "search": True}, False),
+        ({"name": "code", "type": "varchar", "max_length": 3, "search": True}, True),
+        ({"name": "author", "type": "reference", "table": "Person"}, True),
+        ({"name": "author", "type": "reference"}, False),
+    ],
+)
+def test_column_serializer_validates_type_options(column, is_valid):
+    column_serializer = ColumnSerializer(data=column)
+
+    assert column_serializer.is_valid() == is_valid
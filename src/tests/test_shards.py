@@ -0,0 +1,284 @@
+import asyncio
+import zlib
+
+import pytest
+import shortuuid
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.utils import InternalError
+from dynatablebackend.db import feeds, partitions, search, shards, tables, util
+
+requires_shards = pytest.mark.skipif(
+    len(settings.DATABASE_SHARDS) < 2,
+    reason="requires DATABASE_SHARDS to configure a second database",
+)
+
+
+@pytest.fixture(autouse=True)
+def shard_map(settings):
+    # Moves do not wait for the shard lookups cached by other workers to expire
+    settings.DYNATABLE_SHARD_MAP_TTL = 0
+    shards.shard_map.clear()
+    yield shards.shard_map
+    shards.shard_map.clear()
+
+
+def _table_id_on(shard):
+    while True:
+        table_id = shortuuid.uuid()
+        if shards.hash_shard(table_id) == shard:
+            return table_id
+
+
+def _table_exists(shard, table_id):
+    with connections[shard].cursor() as cursor:
+        cursor.execute(
+            "SELECT to_regclass(%s)", [f"{util.APP_LABEL}_{table_id.lower()}"]
+        )
+        return cursor.fetchone()[0] is not None
+
+
+def test_hash_shard_places_tables_on_configured_shards(settings):
+    settings.DATABASE_SHARDS = ["default", "shard1", "shard2"]
+    table_ids = [shortuuid.uuid() for _ in range(100)]
+
+    placements = [shards.hash_shard(table_id) for table_id in table_ids]
+
+    assert set(placements) == set(settings.DATABASE_SHARDS)
+    assert placements == [shards.hash_shard(table_id) for table_id in table_ids]
+
+
+def test_get_shard_uses_default_database_without_shards(settings):
+    settings.DATABASE_SHARDS = ["default"]
+
+    assert shards.get_shard(shortuuid.uuid()) == "default"
+
+
+@requires_shards
+@pytest.mark.django_db(databases=settings.DATABASE_SHARDS)
+def test_create_table_creates_table_on_its_shard():
+    fields = [{"name": "name", "type": "string"}]
+    table_id = tables.create_table(fields, table_id=_table_id_on("shard1"))
+
+    assert tables.add_table_row(table_id, {"name": "Anna"})
+
+    assert _table_exists("shard1", table_id)
+    assert not _table_exists("default", table_id)
+    assert [row["name"] for row in tables.get_table_rows(table_id)] == ["Anna"]
+
+
+@requires_shards
+@pytest.mark.django_db(databases=settings.DATABASE_SHARDS)
+@pytest.mark.parametrize("batch_size", [1, 2, 100])
+def test_move_table_moves_table_to_another_shard(batch_size):
+    fields = [
+        {"name": "email", "type": "string", "search": True},
+        {"name": "age", "type": "integer"},
+    ]
+    table_id = tables.create_table(
+        fields, table_id=_table_id_on("default"), partition_size=2
+    )
+    assert tables.enable_change_feed(table_id)
+
+    for name in "abcde":
+        assert tables.add_table_row(
+            table_id, {"email": f"{name}@example.com", "age": 30}
+        )
+    assert tables.delete_table_rows(table_id, {"email": "b@example.com"}) == 1
+    assert tables.create_rollup(table_id, "by_age", ["age"], {"age": ["count"]})
+
+    assert tables.move_table(table_id, "shard1", batch_size=batch_size) == table_id
+
+    assert shards.get_shard(table_id) == "shard1"
+    assert not _table_exists("default", table_id)
+    assert _table_exists("shard1", table_id)
+
+    assert tables.add_table_row(table_id, {"email": "f@example.com", "age": 40})
+
+    db_rows = tables.get_table_rows(table_id)
+    assert [row["id"] for row in db_rows] == [1, 3, 4, 5, 6]
+    assert [
+        row["email"] for row in tables.get_table_rows(table_id, "f@example.com")
+    ] == ["f@example.com"]
+    assert tables.get_rollup(table_id, "by_age") == [
+        {"age": 30, "count": 4, "age__count": 4},
+        {"age": 40, "count": 1, "age__count": 1},
+    ]
+
+    changes, cursor = feeds.read_changes(table_id, util.get_dynamic_model(table_id), 5)
+    assert [(change["op"], change["row"]["id"]) for change in changes] == [
+        ("delete", 2),
+        ("insert", 6),
+    ]
+    assert cursor == 7
+
+
+@requires_shards
+@pytest.mark.django_db(databases=settings.DATABASE_SHARDS)
+def test_get_dynamic_model_rebuilds_moved_table_with_its_options():
+    fields = [{"name": "name", "type": "string", "search": True}]
+    table_id = tables.create_table(fields, table_id=_table_id_on("default"))
+
+    assert tables.move_table(table_id, "shard1") == table_id
+
+    util.unregister_dynamic_model(table_id)
+    search.unregister(table_id)
+    partitions.unregister(table_id)
+    shards.shard_map.clear()
+
+    assert util.get_dynamic_model(table_id) is not None
+    assert search.searchable_tables[table_id] == ["name"]
+    assert tables.add_table_row(table_id, {"name": "Anna"})
+    assert len(tables.get_table_rows(table_id, "anna")) == 1
+
+
+@requires_shards
+@pytest.mark.django_db(databases=settings.DATABASE_SHARDS, transaction=True)
+def test_stream_changes_outlives_shard_map_ttl(settings):
+    settings.DYNATABLE_SHARD_MAP_TTL = 1
+    settings.DYNATABLE_CHANGE_FEED_HEARTBEAT = 1
+    fields = [{"name": "name", "type": "string"}]
+    table_id = tables.create_table(fields, table_id=_table_id_on("shard1"))
+    assert tables.enable_change_feed(table_id)
+    DynamicModel = util.get_dynamic_model(table_id)
+
+    async def follow():
+        stream = feeds.stream_changes(table_id, DynamicModel, 0)
+        try:
+            # Each heartbeat outlasts the cached lookup of the table's shard
+            heartbeats = [await asyncio.wait_for(anext(stream), 5) for _ in range(2)]
+
+            await sync_to_async(tables.add_table_row)(table_id, {"name": "Anna"})
+            pushed = await asyncio.wait_for(anext(stream), 5)
+        finally:
+            await stream.aclose()
+
+        return heartbeats, pushed
+
+    heartbeats, pushed = async_to_sync(follow)()
+
+    assert heartbeats == [None, None]
+    assert pushed == {"seq": 1, "op": "insert", "row": {"id": 1, "name": "Anna"}}
+
+
+@requires_shards
+@pytest.mark.django_db(databases=settings.DATABASE_SHARDS)
+def test_get_shard_keeps_tables_on_their_shard_when_shards_are_added():
+    fields = [{"name": "name", "type": "string"}]
+    shard_ids = settings.DATABASE_SHARDS + ["shard9"]
+
+    while True:
+        table_id = _table_id_on("shard1")
+        shard_count = len(shard_ids)
+        if shard_ids[zlib.crc32(table_id.encode()) % shard_count] != "shard1":
+            break
+
+    assert tables.create_table(fields, table_id=table_id) == table_id
+    assert tables.add_table_row(table_id, {"name": "Anna"})
+
+    settings.DATABASE_SHARDS = shard_ids
+    try:
+        shards.shard_map.clear()
+        assert shards.hash_shard(table_id) != "shard1"
+        assert shards.get_shard(table_id) == "shard1"
+    finally:
+        settings.DATABASE_SHARDS = shard_ids[:-1]
+
+    util.unregister_dynamic_model(table_id)
+    assert [row["name"] for row in tables.get_table_rows(table_id)] == ["Anna"]
+
+
+@requires_shards
+@pytest.mark.django_db(databases=settings.DATABASE_SHARDS)
+def test_get_shard_records_tables_missing_from_the_shard_map():
+    fields = [{"name": "name", "type": "string"}]
+    table_id = tables.create_table(fields, table_id=_table_id_on("shard1"))
+
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {shards.SHARD_MAP_TABLE} WHERE table_id = %s", [table_id]
+        )
+    shards.shard_map.clear()
+
+    assert shards.get_shard(table_id) == "shard1"
+    assert shards._read_shard_map(table_id) == "shard1"
+    assert shards.get_shard(shortuuid.uuid()) == "default"
+
+
+@requires_shards
+@pytest.mark.django_db(databases=settings.DATABASE_SHARDS)
+def test_move_table_keeps_source_readable_until_lookups_expire(monkeypatch):
+    fields = [{"name": "name", "type": "string"}]
+    table_id = tables.create_table(fields, table_id=_table_id_on("default"))
+    assert tables.add_table_row(table_id, {"name": "Anna"})
+    DynamicModel = util.get_dynamic_model(table_id)
+    stale = []
+
+    def wait(seconds):
+        # A worker whose lookup has not expired yet still uses the source table
+        stale.append(list(DynamicModel.objects.using("default").values("name")))
+
+        with pytest.raises(InternalError, match="moved to another shard"):
+            with transaction.atomic(using="default"):
+                DynamicModel.objects.using("default").create(name="Matt")
+
+    monkeypatch.setattr(tables.time, "sleep", wait)
+
+    assert tables.move_table(table_id, "shard1") == table_id
+
+    assert stale == [[{"name": "Anna"}]]
+    assert not _table_exists("default", table_id)
+    assert [row["name"] for row in tables.get_table_rows(table_id)] == ["Anna"]
+
+
+@requires_shards
+@pytest.mark.django_db(databases=settings.DATABASE_SHARDS)
+def test_move_table_rejects_tables_related_by_references():
+    person_id = tables.create_table(
+        [{"name": "name", "type": "string"}], table_id=_table_id_on("default")
+    )
+    book_id = tables.create_table(
+        [{"name": "author", "type": "reference", "table": person_id}]
+    )
+
+    assert tables.move_table(person_id, "shard1") is None
+    assert tables.move_table(book_id, "shard1") is None
+
+    assert shards.get_shard(person_id) == shards.get_shard(book_id) == "default"
+    assert _table_exists("default", person_id) and _table_exists("default", book_id)
+
+
+@requires_shards
+@pytest.mark.django_db(databases=settings.DATABASE_SHARDS)
+def test_move_table_keeps_snapshots_read_only():
+    fields = [{"name": "name", "type": "string"}]
+    table_id = tables.create_table(fields, table_id=_table_id_on("default"))
+    assert tables.add_table_row(table_id, {"name": "Anna"})
+
+    snapshot_id = tables.clone_table(table_id, snapshot=True)["table_id"]
+    assert shards.get_shard(snapshot_id) == "default"
+
+    assert tables.move_table(snapshot_id, "shard1") == snapshot_id
+
+    assert [row["name"] for row in tables.get_table_rows(snapshot_id)] == ["Anna"]
+    DynamicModel = util.get_dynamic_model(snapshot_id)
+    with pytest.raises(InternalError, match="read-only snapshot"):
+        DynamicModel.objects.using("shard1").create(name="Matt")
+
+
+@requires_shards
+@pytest.mark.django_db(databases=settings.DATABASE_SHARDS)
+def test_update_table_rejects_references_to_other_shards():
+    fields = [{"name": "name", "type": "string"}]
+    person_id = tables.create_table(fields, table_id=_table_id_on("default"))
+    book_id = tables.create_table(fields, table_id=_table_id_on("shard1"))
+
+    columns = [{"name": "author", "type": "reference", "table": person_id}]
+    assert tables.update_table(book_id, columns) is None
+
+    DynamicModel = util.get_dynamic_model(book_id)
+    assert [field.name for field in DynamicModel._meta.concrete_fields] == [
+        "id",
+        "name",
+    ]
@@ -1,6 +1,10 @@
+import datetime
+import decimal
+import uuid
+
 import pytest
-from django.db import connection
-from dynatablebackend.db import tables
+from django.db import DatabaseError, connection
+from dynatablebackend.db import shards, tables, util
 
 from tests.generator import generator
 
@@ -183,3 +187,402 @@ def test_get_table_rows_returns_table_rows(fields):
     for row, db_row in zip(rows, db_rows):
         for field in row:
             assert row[field] == db_row[field]
+
+
+@pytest.mark.django_db
+def test_update_table_rows_updates_matching_rows():
+    fields = [{"name": "name", "type": "string"}, {"name": "age", "type": "number"}]
+    table_id = tables.create_table(fields)
+
+    for age in (10, 20, 30, 40):
+        assert tables.add_table_row(table_id, {"name": "Matt", "age": age})
+
+    count = tables.update_table_rows(table_id, {"age__gte": 25}, {"name": "Anna"})
+
+    assert count == 2
+    assert sorted(row["name"] for row in tables.get_table_rows(table_id)) == [
+        "Anna",
+        "Anna",
+        "Matt",
+        "Matt",
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "predicate, values",
+    [
+        ({"phone": "123"}, {"name": "Anna"}),
+        ({"age__regex": ".*"}, {"name": "Anna"}),
+        ({"age": 10}, {"phone": "123"}),
+        ({"age": 10}, {"id": 1}),
+        ({"age": 10}, {}),
+        ({"age": "ten"}, {"name": "Anna"}),
+    ],
+)
+def test_update_table_rows_rejects_invalid_requests(predicate, values):
+    fields = [{"name": "name", "type": "string"}, {"name": "age", "type": "number"}]
+    table_id = tables.create_table(fields)
+
+    assert tables.add_table_row(table_id, {"name": "Matt", "age": 10})
+
+    assert tables.update_table_rows(table_id, predicate, values) is None
+
+
+@pytest.mark.django_db
+def test_delete_table_rows_deletes_matching_rows():
+    fields = [{"name": "name", "type": "string"}, {"name": "age", "type": "number"}]
+    table_id = tables.create_table(fields)
+
+    for age in (10, 20, 30, 40):
+        assert tables.add_table_row(table_id, {"name": "Matt", "age": age})
+
+    assert tables.delete_table_rows(table_id, {"age__in": [10, 40]}) == 2
+    assert [row["age"] for row in tables.get_table_rows(table_id)] == [20, 30]
+
+    assert tables.delete_table_rows(table_id, {}) == 2
+    assert tables.get_table_rows(table_id) == []
+
+
+@pytest.mark.django_db
+def test_upsert_table_rows_updates_rows_with_existing_keys():
+    fields = [
+        {"name": "email", "type": "string", "key": True},
+        {"name": "age", "type": "number"},
+    ]
+    table_id = tables.create_table(fields)
+
+    rows = [{"email": "a@b.c", "age": 1}, {"email": "d@e.f", "age": 2}]
+    assert tables.upsert_table_rows(table_id, rows) == 2
+
+    rows = [
+        {"email": "a@b.c", "age": 3},
+        {"email": "g@h.i", "age": 4},
+        {"email": "g@h.i", "age": 5},
+    ]
+    assert tables.upsert_table_rows(table_id, rows, batch_size=1) == 2
+
+    db_rows = {row["email"]: row["age"] for row in tables.get_table_rows(table_id)}
+    assert db_rows == {"a@b.c": 3, "d@e.f": 2, "g@h.i": 5}
+
+
+@pytest.mark.django_db
+def test_upsert_table_rows_counts_only_written_rows():
+    table_id = tables.create_table([{"name": "email", "type": "string", "key": True}])
+
+    rows = [{"email": "a@b.c"}, {"email": "d@e.f"}]
+    assert tables.upsert_table_rows(table_id, rows) == 2
+
+    rows = [{"email": "a@b.c"}, {"email": "g@h.i"}]
+    assert tables.upsert_table_rows(table_id, rows, batch_size=1) == 1
+    assert tables.upsert_table_rows(table_id, rows) == 0
+
+    assert len(tables.get_table_rows(table_id)) == 3
+
+
+@pytest.mark.django_db
+def test_upsert_table_rows_requires_key_columns():
+    fields = [{"name": "email", "type": "string"}]
+    table_id = tables.create_table(fields)
+
+    assert tables.upsert_table_rows(table_id, [{"email": "a@b.c"}]) is None
+
+
+@pytest.mark.django_db
+def test_update_table_keeps_key_columns():
+    fields = [{"name": "email", "type": "string", "key": True}]
+    table_id = tables.create_table(fields)
+
+    assert tables.update_table(table_id, [{"name": "age", "type": "number"}])
+
+    rows = [{"email": "a@b.c", "age": 1}, {"email": "a@b.c", "age": 2}]
+    assert tables.upsert_table_rows(table_id, rows[:1]) == 1
+    assert tables.upsert_table_rows(table_id, rows[1:]) == 1
+
+    assert len(tables.get_table_rows(table_id)) == 1
+
+
+@pytest.mark.django_db
+def test_add_table_row_stores_compact_types():
+    fields = [
+        {"name": "count", "type": "smallint"},
+        {"name": "views", "type": "bigint"},
+        {"name": "price", "type": "decimal", "max_digits": 8, "decimal_places": 2},
+        {"name": "code", "type": "varchar", "max_length": 3},
+        {"name": "created", "type": "timestamp"},
+        {"name": "day", "type": "date"},
+        {"name": "uid", "type": "uuid"},
+        {"name": "meta", "type": "jsonb"},
+    ]
+    table_id = tables.create_table(fields)
+
+    row = {
+        "count": 7,
+        "views": 2**40,
+        "price": decimal.Decimal("19.99"),
+        "code": "PLN",
+        "created": datetime.datetime(2024, 4, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        "day": datetime.date(2024, 4, 1),
+        "uid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "meta": {"tags": ["a", "b"]},
+    }
+    assert tables.add_table_row(table_id, row)
+
+    db_row = tables.get_table_rows(table_id)[0]
+    for field in row:
+        assert row[field] == db_row[field]
+
+    assert not tables.add_table_row(table_id, {**row, "code": "TOO LONG"})
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("partition_size", [None, 2])
+def test_count_table_rows_counts_rows(settings, partition_size):
+    fields = [{"name": "name", "type": "string"}]
+    table_id = tables.create_table(fields, partition_size=partition_size)
+
+    for name in ("Matt", "Anna", "John", "Kate", "Mark"):
+        assert tables.add_table_row(table_id, {"name": name})
+
+    assert tables.count_table_rows(table_id, "exact") == {"count": 5, "exact": True}
+
+    db_table = tables.get_rows_queryset(table_id).model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE "{db_table}"')
+
+    assert tables.count_table_rows(table_id, "estimate") == {
+        "count": 5,
+        "exact": False,
+    }
+
+    settings.DYNATABLE_COUNT_ESTIMATE_THRESHOLD = 5
+    assert tables.count_table_rows(table_id, "auto") == {"count": 5, "exact": False}
+
+    settings.DYNATABLE_COUNT_ESTIMATE_THRESHOLD = 6
+    assert tables.count_table_rows(table_id, "auto") == {"count": 5, "exact": True}
+
+
+@pytest.mark.django_db
+def test_count_table_rows_estimates_filtered_rows():
+    fields = [{"name": "name", "type": "string", "search": True}]
+    table_id = tables.create_table(fields)
+
+    for name in ("Matt", "Anna", "John"):
+        assert tables.add_table_row(table_id, {"name": name})
+
+    result = tables.count_table_rows(table_id, "estimate", query="anna")
+    assert result["exact"] is False
+    assert result["count"] >= 0
+
+    assert tables.count_table_rows(table_id, "exact", query="anna") == {
+        "count": 1,
+        "exact": True,
+    }
+
+    with pytest.raises(ValueError):
+        tables.count_table_rows(table_id, "precise")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("partition_size", [None, 2])
+def test_clone_table_copies_structure_and_rows(partition_size):
+    fields = [
+        # Partitioned tables cannot have a natural key without the partition key
+        {
+            "name": "email",
+            "type": "varchar",
+            "max_length": 32,
+            "key": not partition_size,
+        },
+        {"name": "name", "type": "string", "search": True},
+        {"name": "age", "type": "integer"},
+    ]
+    table_id = tables.create_table(fields, partition_size=partition_size)
+
+    for age in (10, 20, 30, 40, 50):
+        row = {"email": f"{age}@b.c", "name": f"Matt {age}", "age": age}
+        assert tables.add_table_row(table_id, row)
+
+    result = tables.clone_table(table_id)
+
+    assert result["count"] == 5
+    assert tables.get_table_rows(result["table_id"]) == tables.get_table_rows(table_id)
+    assert [row["age"] for row in tables.get_table_rows(result["table_id"], "50")] == [
+        50
+    ]
+
+    # The clone continues the ids of the table
+    assert tables.add_table_row(result["table_id"], {**row, "email": "a@b.c"})
+    assert tables.get_table_rows(result["table_id"])[-1]["id"] == 6
+
+    if not partition_size:
+        assert tables.upsert_table_rows(result["table_id"], [{**row, "age": 1}]) == 1
+        assert tables.count_table_rows(result["table_id"], "exact")["count"] == 6
+
+
+@pytest.mark.django_db
+def test_clone_table_projects_and_filters_rows():
+    fields = [
+        {"name": "email", "type": "string", "key": True},
+        {"name": "age", "type": "integer"},
+    ]
+    table_id = tables.create_table(fields)
+
+    for age in (10, 20, 30, 40):
+        assert tables.add_table_row(table_id, {"email": f"{age}@b.c", "age": age})
+
+    result = tables.clone_table(table_id, ["age"], {"age__gte": 25})
+
+    assert result["count"] == 2
+    assert tables.get_table_rows(result["table_id"]) == [
+        {"id": 3, "age": 30},
+        {"id": 4, "age": 40},
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "columns, predicate",
+    [(["phone"], None), (None, {"age__regex": ".*"}), (None, {"phone": 1})],
+)
+def test_clone_table_rejects_invalid_requests(columns, predicate):
+    fields = [{"name": "age", "type": "integer"}]
+    table_id = tables.create_table(fields)
+
+    assert tables.clone_table(table_id, columns, predicate) is None
+    assert tables.clone_table("Unknown") is None
+
+
+def _create_library():
+    person_id = tables.create_table([{"name": "name", "type": "string"}])
+    book_id = tables.create_table(
+        [
+            {"name": "title", "type": "string"},
+            {"name": "author", "type": "reference", "table": person_id},
+        ]
+    )
+
+    for name in ("Anna", "Matt"):
+        assert tables.add_table_row(person_id, {"name": name})
+
+    for title, author in [("Poems", 2), ("Songs", 1), ("Tales", 2)]:
+        assert tables.add_table_row(book_id, {"title": title, "author": author})
+
+    return person_id, book_id
+
+
+@pytest.mark.django_db
+def test_get_table_rows_expands_references_in_one_query(django_assert_num_queries):
+    person_id, book_id = _create_library()
+
+    assert sorted(row["author"] for row in tables.get_table_rows(book_id)) == [1, 2, 2]
+
+    with django_assert_num_queries(1):
+        rows = tables.get_table_rows(book_id, expand=["author"])
+
+    rows.sort(key=lambda row: row["id"])
+    assert rows[:2] == [
+        {"id": 1, "title": "Poems", "author": {"id": 2, "name": "Matt"}},
+        {"id": 2, "title": "Songs", "author": {"id": 1, "name": "Anna"}},
+    ]
+    streamed = tables.iter_table_rows(book_id, expand=["author"])
+    assert sorted(streamed, key=lambda row: row["id"]) == rows
+    assert {"id": 1, "title": "Poems", "author": 2} in tables.iter_table_rows(book_id)
+
+    with pytest.raises(ValueError):
+        tables.get_table_rows(book_id, expand=["title"])
+
+
+@pytest.mark.django_db
+def test_reference_columns_survive_model_rebuilds():
+    person_id, book_id = _create_library()
+
+    util.unregister_dynamic_model(book_id)
+    util.unregister_dynamic_model(person_id)
+
+    assert util.to_columns(util.get_dynamic_model(book_id)) == [
+        {"name": "title", "type": "string"},
+        {"name": "author", "type": "reference", "table": person_id},
+    ]
+    rows = tables.get_table_rows(book_id, expand=["author"])
+    assert {"id": 2, "title": "Songs", "author": {"id": 1, "name": "Anna"}} in rows
+
+
+@pytest.mark.django_db
+def test_update_table_keeps_references_to_the_table():
+    person_id = tables.create_table([{"name": "name", "type": "string"}])
+    book_id = tables.create_table(
+        [{"name": "author", "type": "reference", "table": person_id}]
+    )
+
+    # Updating the referenced table rebuilds the models referencing it
+    assert tables.update_table(person_id, [{"name": "age", "type": "integer"}])
+    assert tables.add_table_row(person_id, {"name": "Anna", "age": 30})
+    assert tables.add_table_row(book_id, {"author": 1})
+
+    rows = tables.get_table_rows(book_id, expand=["author"])
+    assert rows == [{"id": 1, "author": {"id": 1, "name": "Anna", "age": 30}}]
+
+    assert not tables.add_table_row(book_id, {"author": 2})
+
+
+@pytest.mark.django_db
+def test_create_table_rejects_invalid_references():
+    person_id, book_id = _create_library()
+
+    for table in ("Unknown", book_id):
+        columns = [{"name": "book", "type": "reference", "table": table}]
+        assert tables.update_table(book_id, columns) is None
+
+    columns = [{"name": "favourite", "type": "reference", "table": book_id}]
+    assert tables.update_table(person_id, columns) is None
+
+    columns = [{"name": "author", "type": "reference", "table": "Unknown"}]
+    assert tables.create_table(columns) is None
+
+
+@pytest.mark.django_db
+def test_reference_columns_reject_missing_rows():
+    _, book_id = _create_library()
+
+    assert not tables.add_table_row(book_id, {"title": "Lost", "author": 3})
+
+
+@pytest.mark.django_db
+def test_create_table_forgets_shard_of_failed_table(monkeypatch):
+    def fail(schema_editor, table_id, DynamicModel):
+        raise DatabaseError("disk full")
+
+    monkeypatch.setattr(tables.partitions, "create_model", fail)
+    table_id = "FailedTable"
+
+    assert tables.create_table([{"name": "a", "type": "string"}], table_id) is None
+
+    assert table_id not in shards.shard_map
+    assert shards._read_shard_map(table_id) is None
+
+
+@pytest.mark.django_db
+def test_clone_table_forgets_shard_of_failed_clone(monkeypatch):
+    table_id = tables.create_table([{"name": "a", "type": "string"}])
+
+    def fail(clone_id, CloneModel, DynamicModel, shard):
+        raise DatabaseError("disk full")
+
+    monkeypatch.setattr(tables.partitions, "clone_partitions", fail)
+    monkeypatch.setattr(tables.shortuuid, "uuid", lambda: "FailedClone")
+
+    assert tables.clone_table(table_id) is None
+
+    assert "FailedClone" not in shards.shard_map
+    assert shards._read_shard_map("FailedClone") is None
+
+
+@pytest.mark.django_db
+def test_create_table_rejects_existing_table_id():
+    table_id = tables.create_table([{"name": "a", "type": "string"}])
+
+    assert tables.create_table([{"name": "b", "type": "string"}], table_id) is None
+
+    assert shards._read_shard_map(table_id) == "default"
+    assert tables.add_table_row(table_id, {"a": "Anna"})
@@ -2,8 +2,9 @@ import random
 
 import pytest
 import shortuuid
+from django.apps import apps
 from django.db import models
-from dynatablebackend.db import util
+from dynatablebackend.db import tables, util
 
 from tests.generator import generator
 
@@ -83,6 +84,7 @@ def test_get_dynamic_model_returns_dynamic_model(fields):
     assert DynamicModel1 is DynamicModel2
 
 
+@pytest.mark.django_db
 def test_get_dynamic_model_returns_none_if_model_not_exists():
     table_id = shortuuid.uuid()
     DynamicModel = util.get_dynamic_model(table_id)
@@ -119,3 +121,137 @@ def test_get_combined_fields_returns_combined_fields(fields):
     random_field = random.choice(fields)
     assert random_field["name"] in combined_fields
     assert isinstance(combined_fields["phone"], models.CharField)
+
+
+@pytest.mark.parametrize(
+    "column, field_type, options",
+    [
+        ({"name": "a", "type": "smallint"}, models.SmallIntegerField, {}),
+        ({"name": "a", "type": "integer"}, models.IntegerField, {}),
+        ({"name": "a", "type": "bigint"}, models.BigIntegerField, {}),
+        (
+            {"name": "a", "type": "decimal", "max_digits": 10, "decimal_places": 2},
+            models.DecimalField,
+            {"max_digits": 10, "decimal_places": 2},
+        ),
+        (
+            {"name": "a", "type": "varchar", "max_length": 12},
+            models.CharField,
+            {"max_length": 12},
+        ),
+        ({"name": "a", "type": "timestamp"}, models.DateTimeField, {}),
+        ({"name": "a", "type": "date"}, models.DateField, {}),
+        ({"name": "a", "type": "uuid"}, models.UUIDField, {}),
+        ({"name": "a", "type": "jsonb"}, models.JSONField, {}),
+    ],
+)
+def test_to_model_types_converts_compact_types(column, field_type, options):
+    model_types = util.to_model_types([column])
+
+    assert type(model_types["a"]) is field_type
+
+    for option, value in options.items():
+        assert getattr(model_types["a"], option) == value
+
+
+def test_get_combined_fields_keeps_field_options():
+    table_id = shortuuid.uuid()
+
+    fields = [{"name": "code", "type": "varchar", "max_length": 3}]
+    util.create_dynamic_model(table_id, util.to_model_types(fields))
+
+    combined_fields = util.get_combined_fields(
+        table_id, [{"name": "a", "type": "date"}]
+    )
+
+    assert combined_fields["code"].max_length == 3
+
+
+@pytest.mark.parametrize(
+    "columns",
+    [
+        [{"name": "a", "type": "string"}, {"name": "b", "type": "number"}],
+        [
+            {"name": "a", "type": "varchar", "max_length": 12, "key": True},
+            {"name": "b", "type": "decimal", "max_digits": 10, "decimal_places": 2},
+            {"name": "c", "type": "boolean"},
+        ],
+        [{"name": t, "type": t} for t in ["smallint", "integer", "bigint"]],
+        [{"name": t, "type": t} for t in ["timestamp", "date", "uuid", "jsonb"]],
+    ],
+)
+def test_to_columns_converts_model_back_to_columns(columns):
+    unique_keys = [column["name"] for column in columns if column.get("key")]
+    DynamicModel = util.create_dynamic_model(
+        shortuuid.uuid(), util.to_model_types(columns), unique_keys
+    )
+
+    assert util.to_columns(DynamicModel) == columns
+
+
+def test_create_dynamic_model_unregisters_superseded_model():
+    table_id = shortuuid.uuid()
+    fields = [{"name": "a", "type": "string"}]
+
+    DynamicModel1 = util.create_dynamic_model(table_id, util.to_model_types(fields))
+    DynamicModel2 = util.create_dynamic_model(table_id, util.to_model_types(fields))
+
+    app_models = apps.all_models[util.APP_LABEL]
+    assert app_models[DynamicModel2._meta.model_name] is DynamicModel2
+    assert DynamicModel1 not in app_models.values()
+
+
+def test_create_dynamic_model_evicts_least_recently_used_models(settings):
+    settings.DYNATABLE_MAX_RESIDENT_MODELS = 2
+    table_ids = [shortuuid.uuid() for _ in range(3)]
+    fields = [{"name": "a", "type": "string"}]
+
+    for table_id in table_ids[:2]:
+        util.create_dynamic_model(table_id, util.to_model_types(fields))
+
+    util.get_dynamic_model(table_ids[0])
+    util.create_dynamic_model(table_ids[2], util.to_model_types(fields))
+
+    assert list(util.dynamic_models) == [table_ids[0], table_ids[2]]
+    assert table_ids[1].lower() not in apps.all_models[util.APP_LABEL]
+
+
+@pytest.mark.django_db
+def test_get_dynamic_model_rebuilds_evicted_model():
+    fields = [
+        {"name": "email", "type": "varchar", "max_length": 32, "key": True},
+        {"name": "name", "type": "string", "search": True},
+        {"name": "price", "type": "decimal", "max_digits": 8, "decimal_places": 2},
+        {"name": "day", "type": "date"},
+    ]
+    table_id = tables.create_table(fields)
+    DynamicModel = util.get_dynamic_model(table_id)
+
+    assert util.unregister_dynamic_model(table_id) is DynamicModel
+
+    RebuiltModel = util.get_dynamic_model(table_id)
+
+    assert RebuiltModel is not DynamicModel
+    assert [field.name for field in RebuiltModel._meta.concrete_fields] == [
+        "id",
+        "email",
+        "name",
+        "price",
+        "day",
+    ]
+    for field in DynamicModel._meta.concrete_fields:
+        rebuilt_field = RebuiltModel._meta.get_field(field.name)
+        assert type(rebuilt_field) is type(field)
+        assert rebuilt_field.deconstruct()[3] == field.deconstruct()[3]
+
+    assert util.get_unique_keys(RebuiltModel) == ["email"]
+    row = {"email": "a@b.c", "name": "Anna", "price": "9.99", "day": "2024-04-01"}
+    assert tables.upsert_table_rows(table_id, [row]) == 1
+
+
+def test_memory_report_reports_resident_models():
+    report = util.memory_report()
+
+    assert report["resident_models"] == len(util.dynamic_models)
+    assert report["registered_models"] >= report["resident_models"]
+    assert {"pid", "rss_bytes", "evictions", "rebuilds"} <= set(report)